@@ -19,12 +19,23 @@ This file is Copyright (c) 2023 Guransh Singh, Nauhar Kapur, Shahbaz Nanda,
 and Raunak Madan.
 """
 # Importing libraries
+from typing import Callable, Optional
 import json
 import requests
 import python_ta
+import tracing
 
 
-def run_api(search_title: str, api_key: str = "", api_host: str = "") -> list[str]:
+# Program constants
+API_URL = "https://streaming-availability.p.rapidapi.com/v2/search/title"
+BACKUP_API_KEYS = ["9b0499a6d0msha5373448155f126p1dbc86jsne6e5da63ee3b",
+                   "45dfa9c982msh748b72a3ace08f7p1f4c84jsn30c598f9d44e",
+                   "eff08fa849msh2a5ea7560fe2dfdp118e8bjsnfa6525831061"]
+EMPTY_LINKS = ["", "", "", ""]
+API_TIMEOUT = 10.0
+
+
+def run_api(search_title: str, api_key: str = "", api_host: str = "", api_url: str = "") -> list[str]:
     """Run the movie API and return the corresponding rent, trailer and poster links for the given title,
     along with the IMDb rating.
 
@@ -32,9 +43,10 @@ def run_api(search_title: str, api_key: str = "", api_host: str = "") -> list[st
         - search_title != ""
         - api_key == "" or api_key is a valid API key
         - api_host == "" or api_host is a valid API host server
+        - api_url == "" or api_url is a valid search endpoint (e.g. a local fake provider)
         """
     # Running API query
-    url = "https://streaming-availability.p.rapidapi.com/v2/search/title"
+    url = API_URL if api_url == "" else api_url
     querystring = {"title": search_title, "country": "us", "show_type": "movie", "output_language": "en"}
     if api_key == "":
         key = "6a537661b7mshff9369efe0cc380p15d036jsn2812fda7b6bf"
@@ -45,7 +57,9 @@ def run_api(search_title: str, api_key: str = "", api_host: str = "") -> list[st
     else:
         host = api_host
     headers = {"X-RapidAPI-Key": key, "X-RapidAPI-Host": host}
-    response = requests.request("GET", url, headers=headers, params=querystring)
+    with tracing.span("run_api", title=search_title) as span:
+        response = requests.request("GET", url, headers=headers, params=querystring, timeout=API_TIMEOUT)
+        span.set("status", response.status_code)
 
     # Parsing data into dictionaries
     data = json.loads(response.text)
@@ -54,6 +68,8 @@ def run_api(search_title: str, api_key: str = "", api_host: str = "") -> list[st
 
     # Finding movie title match
     all_titles = [i["title"] for i in data_dict["result"]]
+    if not all_titles:
+        return list(EMPTY_LINKS)
     best_match_title = find_best_title(search_title, all_titles)
 
     # Returning link info
@@ -61,6 +77,28 @@ def run_api(search_title: str, api_key: str = "", api_host: str = "") -> list[st
     return links
 
 
+def fetch_links(search_title: str, api_url: str = "",
+                throttle: Optional[Callable[[], None]] = None) -> Optional[list[str]]:
+    """Return the rent, trailer and poster links and the IMDb rating for the given title, retrying with
+    each backup API key when a key is rejected or the server fails (the response then has no "result" entry).
+
+    If throttle is given, it is called before every request so callers can enforce a request budget.
+    Return None if every key is rejected, so that callers can tell a failed lookup from a title the API does
+    not know (for which EMPTY_LINKS is returned). Network errors, including timeouts, are raised.
+
+    Preconditions:
+        - search_title != ""
+    """
+    for api_key in [""] + BACKUP_API_KEYS:
+        if throttle is not None:
+            throttle()
+        try:
+            return run_api(search_title, api_key, api_url=api_url)
+        except KeyError:
+            continue
+    return None
+
+
 def parse_string(given_string: str) -> str:
     """Return a lowercase version of the given string, without punctuation or
     special characters - with some exceptions."""
@@ -189,7 +227,7 @@ def find_info_from_title(results: list[dict], search_title: str) -> list[str]:
 # Testing code
 if __name__ == "__main__":
     python_ta.check_all(config={
-        'extra-imports': ["json", "requests"],
+        'extra-imports': ["typing", "json", "requests", "tracing"],
         'allowed-io': [],
         'max-line-length': 120
     })
@@ -0,0 +1,188 @@
+"""
+CSC111 Final Project - Phase 2: Data Parsing - Recommendation Benchmark Suite
+
+Description
+===============================
+
+This Python module benchmarks graph_traversal.run_search_on_all on seeded
+synthetic networks (see synthetic_data) from the size of the bundled
+dataset up to 100 times larger, with a fixed query mix. Each size runs in
+a fresh process so its peak memory is measured on its own. Results are
+written as JSON and can be compared with a stored baseline to catch
+regressions. BASELINE_FILE holds the results of the default cases on the
+interpreter and machine recorded in it; a baseline from a different
+interpreter or machine is not compared, since its timings say nothing
+about this one.
+
+    python -c "import sys, benchmark_graph_traversal as b; b.main(sys.argv[1:])" --scales 1 10 --output out.json
+    python -c "import sys, benchmark_graph_traversal as b; b.main(sys.argv[1:])" --baseline out.json
+    python -c "import sys, benchmark_graph_traversal as b; b.main(sys.argv[1:])" --baseline benchmark_baseline.json
+
+Copyright and Usage Information
+===============================
+
+This file is provided solely for the TA's and Computer Science Professors
+at the University of Toronto St. George campus. All forms of distribution
+of this code, whether as given or with any changes, are expressly prohibited.
+
+This file is Copyright (c) 2023 Guransh Singh, Nauhar Kapur, Shahbaz Nanda,
+and Raunak Madan.
+"""
+# Importing libraries
+from __future__ import annotations
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, replace
+from typing import Optional
+import argparse
+import json
+import multiprocessing
+import platform
+import sys
+import time
+import python_ta
+import graph_traversal
+import network_versions
+import synthetic_data
+
+
+# Program constants
+DEFAULT_SCALES = [1.0, 10.0]
+DEFAULT_QUERIES = 300
+WARMUP_QUERIES = 10
+DEFAULT_TOLERANCE = 0.2
+BASELINE_FILE = "benchmark_baseline.json"
+
+# Metrics compared with the baseline, and whether a larger value is better
+COMPARED_METRICS = {"p50_ms": False, "p95_ms": False, "p99_ms": False, "throughput_qps": True}
+
+
+def percentile(ordered: list[float], fraction: float) -> float:
+    """Return the value at the given fraction of the sorted list ordered (nearest-rank).
+
+    Preconditions:
+    - ordered != []
+    - 0 < fraction <= 1
+    """
+    return ordered[min(len(ordered) - 1, max(0, round(fraction * len(ordered)) - 1))]
+
+
+def run_case(spec: synthetic_data.SyntheticSpec, num_queries: int, num_rec: int = 10) -> dict:
+    """Build the synthetic network for spec, run the query mix on it, and return the measurements.
+
+    Meant to run in a fresh process, since the peak memory reported is that of the whole process."""
+    start = time.perf_counter()
+    review_network = synthetic_data.generate_network(spec)
+    build_seconds = time.perf_counter() - start
+    queries = synthetic_data.make_queries(review_network, num_queries + WARMUP_QUERIES, seed=spec.seed)
+
+    for user_movies in queries[:WARMUP_QUERIES]:
+        graph_traversal.run_search_on_all(user_movies, num_rec, review_network)
+    latencies = []
+    start = time.perf_counter()
+    for user_movies in queries[WARMUP_QUERIES:]:
+        query_start = time.perf_counter()
+        graph_traversal.run_search_on_all(user_movies, num_rec, review_network)
+        latencies.append(time.perf_counter() - query_start)
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {"spec": asdict(spec),
+            "label": spec.label(),
+            "ratings": sum(len(user.movies_rated) for user in review_network.users.values()),
+            "build_s": build_seconds,
+            "queries": len(latencies),
+            "p50_ms": percentile(latencies, 0.5) * 1000,
+            "p95_ms": percentile(latencies, 0.95) * 1000,
+            "p99_ms": percentile(latencies, 0.99) * 1000,
+            "max_ms": latencies[-1] * 1000,
+            "throughput_qps": len(latencies) / elapsed,
+            "peak_rss_mb": network_versions.peak_rss_bytes() / 2 ** 20}
+
+
+def run_suite(specs: list[synthetic_data.SyntheticSpec], num_queries: int) -> dict:
+    """Run every case in its own fresh process, one after another, and return the results document."""
+    results = []
+    context = multiprocessing.get_context("spawn")
+    for spec in specs:
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+            results.append(executor.submit(run_case, spec, num_queries).result())
+    return {"python": platform.python_version(), "machine": platform.machine(), "cases": results}
+
+
+def compare(results: dict, baseline: dict, tolerance: float = DEFAULT_TOLERANCE) -> list[str]:
+    """Return a description of every metric in results that is worse than in baseline by more than tolerance (a
+    fraction), for the cases that appear in both."""
+    baseline_cases = {case["label"]: case for case in baseline["cases"]}
+    regressions = []
+    for case in results["cases"]:
+        old = baseline_cases.get(case["label"])
+        if old is None:
+            continue
+        for metric, higher_is_better in COMPARED_METRICS.items():
+            change = (case[metric] - old[metric]) / old[metric] if old[metric] else 0.0
+            if (-change if higher_is_better else change) > tolerance:
+                regressions.append(f"{case['label']}: {metric} {old[metric]:.3f} -> {case[metric]:.3f} "
+                                   f"({change:+.0%})")
+    return regressions
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    """Run the suite from the command line, print a table, and exit with status 1 on a regression."""
+    parser = argparse.ArgumentParser(description="Benchmark run_search_on_all on synthetic review networks.")
+    parser.add_argument("--scales", type=float, nargs="+", default=DEFAULT_SCALES,
+                        help="sizes to run, as multiples of the bundled dataset (up to 100)")
+    parser.add_argument("--ratings-per-user", type=float, default=None, help="average ratings per user")
+    parser.add_argument("--skew", type=float, nargs="+", default=None, help="popularity skews to run")
+    parser.add_argument("--seed", type=int, default=111, help="seed of the synthetic data and query mix")
+    parser.add_argument("--queries", type=int, default=DEFAULT_QUERIES, help="queries per case")
+    parser.add_argument("--output", default=None, help="file to write the JSON results to")
+    parser.add_argument("--baseline", default=None,
+                        help=f"JSON results to compare against, such as {BASELINE_FILE}")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="fraction by which a metric may be worse than the baseline")
+    args = parser.parse_args(argv)
+
+    base = synthetic_data.SyntheticSpec(seed=args.seed)
+    if args.ratings_per_user is not None:
+        base = replace(base, ratings_per_user=args.ratings_per_user)
+    skews = [base.skew] if args.skew is None else args.skew
+    specs = [replace(base, skew=skew).scaled(scale) for scale in args.scales for skew in skews]
+
+    results = run_suite(specs, args.queries)
+    print(f"{'case':<44}{'ratings':>10}{'build':>8}{'p50':>9}{'p95':>9}{'p99':>9}{'qps':>8}{'peak':>9}")
+    for case in results["cases"]:
+        print(f"{case['label']:<44}{case['ratings']:>10}{case['build_s']:>7.1f}s{case['p50_ms']:>7.2f}ms"
+              f"{case['p95_ms']:>7.2f}ms{case['p99_ms']:>7.2f}ms{case['throughput_qps']:>8.1f}"
+              f"{case['peak_rss_mb']:>7.0f}MB")
+
+    if args.output is not None:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2)
+            file.write("\n")
+
+    if args.baseline is not None:
+        with open(args.baseline, encoding="utf-8") as file:
+            baseline = json.load(file)
+        if (baseline.get("python"), baseline.get("machine")) != (results["python"], results["machine"]):
+            print(f"WARNING: not comparing with {args.baseline}, recorded with Python {baseline.get('python')} "
+                  f"on {baseline.get('machine')}", file=sys.stderr)
+            return
+        regressions = compare(results, baseline, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions beyond {args.tolerance:.0%} of the baseline")
+
+
+# Testing code
+if __name__ == "__main__":
+    python_ta.check_all(config={
+        'extra-imports': ["annotations", "concurrent.futures", "dataclasses", "typing", "argparse", "json",
+                          "multiprocessing", "platform", "sys", "time", "graph_traversal", "network_versions",
+                          "synthetic_data"],
+        'allowed-io': ["main"],
+        'max-line-length': 120
+    })
+
+    main()
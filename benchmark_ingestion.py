@@ -0,0 +1,209 @@
+"""
+CSC111 Final Project - Phase 2: Data Parsing - Ingestion Benchmark
+
+Description
+===============================
+
+This Python module compares every way the project can turn a ratings file
+into a network that answers queries: parsing the CSV, loading its pickled
+snapshot, streaming a gzip, bz2 or xz copy, tailing it with a CsvTailer,
+converting it to a rating file or opening an existing one, and exporting
+it to shared memory. The CSV is synthetic (see synthetic_data) with any
+number of rows and popularity skew, or an existing file.
+
+Each path runs in a fresh process and reports rows per second, the time
+until the first recommendation can be returned, and the process's memory
+before loading, at its peak, and once loading is over.
+
+    python -c "import sys, benchmark_ingestion as b; b.main(sys.argv[1:])" --rows 50000 500000 --output out.json
+
+Copyright and Usage Information
+===============================
+
+This file is provided solely for the TA's and Computer Science Professors
+at the University of Toronto St. George campus. All forms of distribution
+of this code, whether as given or with any changes, are expressly prohibited.
+
+This file is Copyright (c) 2023 Guransh Singh, Nauhar Kapur, Shahbaz Nanda,
+and Raunak Madan.
+"""
+# Importing libraries
+from __future__ import annotations
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Optional
+import argparse
+import csv
+import gc
+import json
+import multiprocessing
+import os
+import platform
+import tempfile
+import time
+import python_ta
+import compressed_ingest
+import data_parsing
+import graph_traversal
+import movie_classes
+import network_versions
+import rating_file
+import rating_ingest
+import shared_network
+import synthetic_data
+
+
+# Program constants
+DEFAULT_ROWS = [50000, 500000]
+PATHS = ["csv", "snapshot", "gzip", "bz2", "xz", "tail", "rating_file_convert", "rating_file", "shared_memory"]
+QUERY_TITLES = 3
+MB = 2 ** 20
+
+
+def _load(path_name: str, files: dict[str, str]) -> tuple[Any, Any]:
+    """Build the network for path_name from the prepared files, and return it with the object keeping it alive
+    (a rating file or shared block to close afterwards, or None).
+
+    The returned network is a ReviewNetwork or a shared_network.ArrayNetwork."""
+    if path_name == "csv":
+        return data_parsing.create_review_network(files["csv"]), None
+    if path_name == "snapshot":
+        return data_parsing.load_review_network(files["csv"]), None
+    if path_name in compressed_ingest.CODECS:
+        return compressed_ingest.create_review_network(files[path_name])[0], None
+    if path_name == "tail":
+        ingestor = rating_ingest.RatingIngestor(movie_classes.ReviewNetwork())
+        rating_ingest.CsvTailer(files["csv"], ingestor).poll()
+        return ingestor.network, None
+    if path_name == "rating_file_convert":
+        rating_file.convert_csv(files["csv"], files["rating_file_convert"])
+        opened = rating_file.RatingFile(files["rating_file_convert"])
+        return opened.network, opened
+    if path_name == "rating_file":
+        opened = rating_file.RatingFile(files["rating_file"])
+        return opened.network, opened
+    shared = shared_network.SharedNetwork.create(data_parsing.create_review_network(files["csv"]))
+    return shared.network, shared
+
+
+def run_path(path_name: str, files: dict[str, str], rows: int, query: dict[str, float]) -> dict:
+    """Load the network with path_name, answer query on it, and return the measurements.
+
+    Meant to run in a fresh process, since the memory reported is that of the whole process."""
+    gc.collect()
+    base_rss = network_versions.current_rss_bytes()
+    start = time.perf_counter()
+    network, handle = _load(path_name, files)
+    load_seconds = time.perf_counter() - start
+    if isinstance(network, movie_classes.ReviewNetwork):
+        graph_traversal.run_search_on_all(query, 10, network)
+    else:
+        shared_network.run_search_on_all(network, query)
+    first_result_seconds = time.perf_counter() - start
+
+    gc.collect()
+    steady_rss = network_versions.current_rss_bytes()
+    peak_rss = network_versions.peak_rss_bytes()
+    if handle is not None:
+        handle.close()
+    return {"path": path_name,
+            "rows": rows,
+            "load_s": load_seconds,
+            "first_result_s": first_result_seconds,
+            "rows_per_s": rows / load_seconds if load_seconds else 0.0,
+            "base_rss_mb": base_rss / MB,
+            "steady_rss_mb": steady_rss / MB,
+            "peak_rss_mb": peak_rss / MB}
+
+
+def prepare_files(csv_file: str, path_names: list[str], directory: str) -> dict[str, str]:
+    """Write into directory the inputs that path_names need besides csv_file itself (compressed copies, a rating
+    file, a snapshot), and return the file used by each path."""
+    files = {"csv": csv_file, "rating_file_convert": os.path.join(directory, "converted.flick")}
+    for codec in compressed_ingest.CODECS:
+        if codec in path_names:
+            files[codec] = compressed_ingest.compress_copy(csv_file, codec, directory)
+    if "rating_file" in path_names:
+        files["rating_file"] = os.path.join(directory, "ratings" + rating_file.RATING_FILE_SUFFIX)
+        rating_file.convert_csv(csv_file, files["rating_file"])
+    if "snapshot" in path_names:
+        data_parsing.load_review_network(csv_file)
+    return files
+
+
+def read_query(csv_file: str) -> tuple[int, dict[str, float]]:
+    """Return the number of rows of csv_file and a watch history of the first QUERY_TITLES titles in it."""
+    rows = 0
+    query = {}
+    with open(csv_file, newline="", encoding="utf-8-sig") as file:
+        reader = csv.reader(file)
+        next(reader, None)
+        for row in reader:
+            if row:
+                rows += 1
+                if len(query) < QUERY_TITLES:
+                    query.setdefault(row[3], 5.0 - len(query))
+    return rows, query
+
+
+def run_suite(csv_file: str, path_names: list[str], directory: str) -> list[dict]:
+    """Run every path in path_names on csv_file, each in its own fresh process, and return the results."""
+    rows, query = read_query(csv_file)
+    files = prepare_files(csv_file, path_names, directory)
+    results = []
+    context = multiprocessing.get_context("spawn")
+    for path_name in path_names:
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+            results.append(executor.submit(run_path, path_name, files, rows, query).result())
+    return results
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    """Run the benchmark from the command line and print a table per dataset."""
+    parser = argparse.ArgumentParser(description="Benchmark every way of loading a ratings file.")
+    parser.add_argument("--rows", type=int, nargs="+", default=DEFAULT_ROWS, help="sizes of the synthetic CSVs")
+    parser.add_argument("--skew", type=float, default=0.7, help="popularity skew of the synthetic CSVs")
+    parser.add_argument("--seed", type=int, default=111, help="seed of the synthetic CSVs")
+    parser.add_argument("--csv", default=None, help="benchmark this ratings file instead of synthetic ones")
+    parser.add_argument("--paths", nargs="+", choices=PATHS, default=PATHS, help="ingestion paths to run")
+    parser.add_argument("--output", default=None, help="file to write the JSON results to")
+    args = parser.parse_args(argv)
+
+    document = {"python": platform.python_version(), "machine": platform.machine(), "datasets": []}
+    with tempfile.TemporaryDirectory() as directory:
+        if args.csv is not None:
+            datasets = [(os.path.basename(args.csv), args.csv)]
+        else:
+            datasets = []
+            for rows in args.rows:
+                spec = synthetic_data.SyntheticSpec.for_rows(rows, args.skew, args.seed)
+                csv_file = os.path.join(directory, f"synthetic-{rows}.csv")
+                synthetic_data.write_csv(spec, csv_file)
+                datasets.append((spec.label(), csv_file))
+
+        for label, csv_file in datasets:
+            results = run_suite(csv_file, args.paths, directory)
+            document["datasets"].append({"label": label, "bytes": os.path.getsize(csv_file), "paths": results})
+            print(f"{label}: {results[0]['rows']} rows, {os.path.getsize(csv_file) / MB:.1f} MB")
+            print(f"  {'path':<21}{'load':>9}{'first':>9}{'rows/s':>15}{'base':>8}{'steady':>8}{'peak':>8}")
+            for result in results:
+                print(f"  {result['path']:<21}{result['load_s']:>8.2f}s{result['first_result_s']:>8.2f}s"
+                      f"{result['rows_per_s']:>15,.0f}{result['base_rss_mb']:>6.0f}MB"
+                      f"{result['steady_rss_mb']:>6.0f}MB{result['peak_rss_mb']:>6.0f}MB")
+
+    if args.output is not None:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(document, file, indent=2)
+
+
+# Testing code
+if __name__ == "__main__":
+    python_ta.check_all(config={
+        'extra-imports': ["annotations", "concurrent.futures", "typing", "argparse", "csv", "gc", "json",
+                          "multiprocessing", "os", "platform", "tempfile", "time", "compressed_ingest",
+                          "data_parsing", "graph_traversal", "movie_classes", "network_versions", "rating_file",
+                          "rating_ingest", "shared_network", "synthetic_data"],
+        'allowed-io': ["read_query", "main"],
+        'max-line-length': 120
+    })
+
+    main()
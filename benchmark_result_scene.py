@@ -0,0 +1,231 @@
+"""
+CSC111 Final Project - Phase 3: UI Design and Implementation - Result Screen Latency Benchmark
+
+Description
+===============================
+
+This Python module measures what users feel after pressing GO: the time
+until the ResultScene shows its first poster and until it is complete. It
+runs the real loading path (the search, api_parser.run_api through the
+metadata store, and the poster pipeline) against a local fake_provider
+with configurable latency, error rate and share of titles it does not know,
+under SDL's dummy video driver and at the main loop's frame rate.
+
+Every watch history is loaded three times: cold (empty metadata store and
+poster cache), warm from disk (as after restarting the program) and warm
+in memory (as when the same results are shown again in one session).
+
+    python -c "import sys, benchmark_result_scene as b; b.main(sys.argv[1:])" \
+        --runs 5 --search-latency-ms 150 --poster-latency-ms 80 --error-rate 0.05
+
+Copyright and Usage Information
+===============================
+
+This file is provided solely for the TA's and Computer Science Professors
+at the University of Toronto St. George campus. All forms of distribution
+of this code, whether as given or with any changes, are expressly prohibited.
+
+This file is Copyright (c) 2023 Guransh Singh, Nauhar Kapur, Shahbaz Nanda,
+and Raunak Madan.
+"""
+# Importing libraries
+from __future__ import annotations
+from typing import Optional
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame  # pylint: disable=wrong-import-position
+import requests  # pylint: disable=wrong-import-position
+import python_ta  # pylint: disable=wrong-import-position
+import api_parser  # pylint: disable=wrong-import-position
+import benchmark_graph_traversal  # pylint: disable=wrong-import-position
+import data_parsing  # pylint: disable=wrong-import-position
+import fake_provider  # pylint: disable=wrong-import-position
+import graph_traversal  # pylint: disable=wrong-import-position
+import metadata_store  # pylint: disable=wrong-import-position
+import movie_classes  # pylint: disable=wrong-import-position
+import poster_cache  # pylint: disable=wrong-import-position
+import result_scene  # pylint: disable=wrong-import-position
+import synthetic_data  # pylint: disable=wrong-import-position
+
+
+# Program constants
+FRAME_RATE = 60
+RESULT_TIMEOUT = 30.0
+MODES = ["cold", "warm_disk", "warm_memory"]
+
+
+def show_results(user_movies: dict[str, float], review_network: movie_classes.ReviewNetwork) -> dict[str, float]:
+    """Search for user_movies as pressing GO does, then draw the ResultScene at the main loop's frame rate until
+    it is complete, and return its timings in milliseconds since GO was pressed."""
+    clock = pygame.time.Clock()
+    pressed = time.perf_counter()
+    titles = [movie.title for movie, _ in graph_traversal.run_search_on_all(user_movies, 10, review_network)]
+    searched = time.perf_counter()
+    scene = result_scene.ResultScene(titles)
+
+    first_poster = None
+    while not scene.posters_drawn and time.perf_counter() - pressed < RESULT_TIMEOUT:
+        scene.draw()
+        scene.handle_event([])
+        scene.take_dirty_rects()
+        if first_poster is None and any(drawn and result_scene.POSTER_PIPELINE.get(result_scene.get_poster_url(links))
+                                        is not None for drawn, links in zip(scene.poster_drawn, scene.link_results)):
+            first_poster = time.perf_counter()
+        clock.tick(FRAME_RATE)
+
+    urls = [result_scene.get_poster_url(links) for links in scene.link_results]
+    return {"search_ms": (searched - pressed) * 1000,
+            "first_paint_ms": (searched - pressed + scene.first_paint_time) * 1000,
+            "first_poster_ms": (first_poster - pressed) * 1000 if first_poster is not None else None,
+            "complete_ms": (searched - pressed + scene.complete_time) * 1000 if scene.posters_drawn else None,
+            "posters_shown": sum(result_scene.POSTER_PIPELINE.get(url) is not None for url in urls)}
+
+
+def run_history(user_movies: dict[str, float], review_network: movie_classes.ReviewNetwork,
+                directory: str) -> dict[str, dict[str, float]]:
+    """Show the results of user_movies cold, warm from disk and warm in memory, keeping the metadata store and
+    poster cache in directory, and return the timings of each by mode.
+
+    The default metadata store and result_scene.POSTER_PIPELINE are restored afterwards."""
+    store_path = os.path.join(directory, "metadata_store.json")
+    cache_dir = os.path.join(directory, "posters")
+    timings = {}
+    old_store, old_pipeline = metadata_store.get_default_store(), result_scene.POSTER_PIPELINE
+    pipeline = None
+    try:
+        for mode in MODES:
+            if mode != "warm_memory":
+                if pipeline is not None:
+                    pipeline.shutdown()
+                pipeline = poster_cache.PosterPipeline(result_scene.DEFAULT_SIZE, cache_dir)
+                result_scene.POSTER_PIPELINE = pipeline
+                metadata_store.set_default_store(metadata_store.MetadataStore(store_path))
+            timings[mode] = show_results(user_movies, review_network)
+    finally:
+        if pipeline is not None:
+            pipeline.shutdown()
+        result_scene.POSTER_PIPELINE = old_pipeline
+        metadata_store.set_default_store(old_store)
+    return timings
+
+
+def time_run_api(titles: list[str], api_url: str) -> dict[str, float]:
+    """Call api_parser.run_api for every title in turn and return the latency distribution, in milliseconds, of
+    the calls that got an answer, and the number that failed (including those that timed out or could not
+    connect)."""
+    latencies, failures = [], 0
+    for title in titles:
+        start = time.perf_counter()
+        try:
+            api_parser.run_api(title, api_url=api_url)
+        except (KeyError, requests.RequestException):
+            failures += 1
+            continue
+        latencies.append((time.perf_counter() - start) * 1000)
+    latencies.sort()
+    if not latencies:
+        return {"failed": failures}
+    return {"p50_ms": benchmark_graph_traversal.percentile(latencies, 0.5),
+            "p95_ms": benchmark_graph_traversal.percentile(latencies, 0.95), "max_ms": latencies[-1],
+            "failed": failures}
+
+
+def summarize_modes(runs: list[dict[str, dict[str, float]]]) -> dict[str, dict[str, float]]:
+    """Return, for each mode, the median and 95th percentile of every timing over runs (ignoring runs that did
+    not reach it) and the number of runs that timed out."""
+    summary = {}
+    for mode in MODES:
+        timings = [run[mode] for run in runs]
+        summary[mode] = {"runs": len(timings), "timed_out": sum(t["complete_ms"] is None for t in timings),
+                         "posters_shown_mean": sum(t["posters_shown"] for t in timings) / len(timings)}
+        for key in ["search_ms", "first_paint_ms", "first_poster_ms", "complete_ms"]:
+            values = sorted(t[key] for t in timings if t[key] is not None)
+            if values:
+                summary[mode][f"{key[:-3]}_p50_ms"] = benchmark_graph_traversal.percentile(values, 0.5)
+                summary[mode][f"{key[:-3]}_p95_ms"] = benchmark_graph_traversal.percentile(values, 0.95)
+    return summary
+
+
+def run(num_runs: int, provider: fake_provider.FakeProvider, missing: float, seed: int) -> dict:
+    """Start provider, show the results of num_runs watch histories through it in every mode, and return the
+    summary. A share missing of the network's titles are unknown to the provider."""
+    pygame.init()
+    review_network = data_parsing.create_review_network(graph_traversal.DATA_FILE)
+    rng = random.Random(seed)
+    all_titles = sorted(review_network.movies)
+    provider.missing_titles = set(rng.sample(all_titles, round(missing * len(all_titles))))
+    histories = [history for history in synthetic_data.make_queries(review_network, num_runs * 3, seed)
+                 if len(graph_traversal.run_search_on_all(history, 10, review_network)) == 10][:num_runs]
+
+    old_store, old_pipeline, old_api_url = (metadata_store.get_default_store(), result_scene.POSTER_PIPELINE,
+                                            result_scene.API_URL)
+    runs = []
+    with provider:
+        result_scene.API_URL = provider.search_url
+        try:
+            api_latency = time_run_api(rng.sample(all_titles, 20), provider.search_url)
+            for history in histories:
+                with tempfile.TemporaryDirectory(ignore_cleanup_errors=True) as directory:
+                    runs.append(run_history(history, review_network, directory))
+        finally:
+            result_scene.POSTER_PIPELINE = old_pipeline
+            result_scene.API_URL = old_api_url
+            metadata_store.set_default_store(old_store)
+
+    return {"run_api": api_latency, "modes": summarize_modes(runs), "runs": runs,
+            "provider": {"searches": provider.search_count, "posters": provider.poster_count,
+                         "errors": provider.error_count}}
+
+
+def format_value(value: float) -> str:
+    """Return value as printed in the results: counts in full, and timings to one decimal place."""
+    return str(value) if isinstance(value, int) else f"{value:.1f}"
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    """Run the benchmark from the command line and print its results."""
+    parser = argparse.ArgumentParser(description="Measure the time from GO to a complete result screen.")
+    parser.add_argument("--runs", type=int, default=5, help="watch histories to show")
+    parser.add_argument("--search-latency-ms", type=float, default=100.0, help="latency of every title search")
+    parser.add_argument("--poster-latency-ms", type=float, default=50.0, help="latency of every poster download")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests that fail")
+    parser.add_argument("--missing", type=float, default=0.0, help="share of titles the provider does not know")
+    parser.add_argument("--seed", type=int, default=111, help="seed of the histories, failures and missing titles")
+    parser.add_argument("--output", default=None, help="file to write the JSON results to")
+    args = parser.parse_args(argv)
+
+    provider = fake_provider.FakeProvider(search_latency=args.search_latency_ms / 1000,
+                                          poster_latency=args.poster_latency_ms / 1000,
+                                          error_rate=args.error_rate, seed=args.seed)
+    results = run(args.runs, provider, args.missing, args.seed)
+
+    print("run_api: " + ", ".join(f"{key} {format_value(value)}" for key, value in results["run_api"].items()))
+    for mode, summary in results["modes"].items():
+        print(f"{mode}: " + ", ".join(f"{key} {format_value(value)}" for key, value in summary.items()))
+    print("provider: " + ", ".join(f"{key} {value}" for key, value in results["provider"].items()))
+    if args.output is not None:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2)
+
+
+# Testing code
+if __name__ == "__main__":
+    python_ta.check_all(config={
+        'extra-imports': ["annotations", "typing", "argparse", "json", "os", "random", "tempfile", "time", "pygame",
+                          "requests", "api_parser", "benchmark_graph_traversal", "data_parsing", "fake_provider",
+                          "graph_traversal", "metadata_store", "movie_classes", "poster_cache", "result_scene",
+                          "synthetic_data"],
+        'allowed-io': ["main"],
+        'generated-members': ['pygame.*'],
+        'max-line-length': 120
+    })
+
+    main()
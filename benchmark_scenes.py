@@ -0,0 +1,327 @@
+"""
+CSC111 Final Project - Phase 3: UI Design and Implementation - Headless Scene Benchmark
+
+Description
+===============================
+
+This Python module times MenuScene start-up and per-frame drawing under
+SDL's dummy video driver, so UI performance can be measured without a
+display. Fixture posters are generated in a temporary folder.
+
+It also replays scripted input, frame by frame, the way the main loop runs
+it (handle_event, then draw): typing movie titles and ratings, opening the
+drop-down menu and picking from it on the MenuScene, and hovering over the
+posters and rent buttons of a ResultScene whose links and posters come from
+a temporary metadata store and poster cache. Each script is run once to
+time its frames and once more under tracemalloc to measure how much memory
+each frame allocates.
+
+    python -c "import sys, benchmark_scenes as b; b.main_cli(sys.argv[1:])" --frames 300 --compare
+    python -c "import sys, benchmark_scenes as b; b.main_cli(sys.argv[1:])" --scripts menu result --repeat 5
+
+The entry point is main_cli rather than main because this module imports
+the menu scene's module, main.
+
+Copyright and Usage Information
+===============================
+
+This file is provided solely for the TA's and Computer Science Professors
+at the University of Toronto St. George campus. All forms of distribution
+of this code, whether as given or with any changes, are expressly prohibited.
+
+This file is Copyright (c) 2023 Guransh Singh, Nauhar Kapur, Shahbaz Nanda,
+and Raunak Madan.
+"""
+# Importing libraries
+from __future__ import annotations
+from typing import Callable, Optional
+import argparse
+import gc
+import os
+import statistics
+import tempfile
+import time
+import tracemalloc
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame  # pylint: disable=wrong-import-position
+import python_ta  # pylint: disable=wrong-import-position
+import benchmark_graph_traversal  # pylint: disable=wrong-import-position
+import graph_traversal  # pylint: disable=wrong-import-position
+import main  # pylint: disable=wrong-import-position
+import metadata_store  # pylint: disable=wrong-import-position
+import network_loader  # pylint: disable=wrong-import-position
+import poster_cache  # pylint: disable=wrong-import-position
+import result_scene  # pylint: disable=wrong-import-position
+import speculative_prefetch  # pylint: disable=wrong-import-position
+import text_cache  # pylint: disable=wrong-import-position
+
+
+# Program constants
+# Keeps the speculative prefetcher from searching (and calling the movie API) while scripts run
+NO_SPECULATION_DEBOUNCE = 24 * 60 * 60
+RESULT_LOAD_TIMEOUT = 10.0
+RESULT_TITLES = [f"Fixture Movie {i}" for i in range(10)]
+
+
+def make_fixture_posters(directory: str) -> None:
+    """Save a plain placeholder poster for every "Today's Hit Flicks" title in directory."""
+    for i, title in enumerate(main.HIT_FLICKS):
+        surface = pygame.Surface((200, 300))
+        surface.fill((30 + 20 * i, 60, 120))
+        pygame.image.save(surface, os.path.join(directory, f"{title}.png"))
+
+
+def summarize(times: list[float]) -> dict[str, float]:
+    """Return the mean, median, 95th percentile and maximum of times, in milliseconds."""
+    ordered = sorted(times)
+    return {"mean_ms": statistics.fmean(ordered) * 1000,
+            "p50_ms": benchmark_graph_traversal.percentile(ordered, 0.5) * 1000,
+            "p95_ms": benchmark_graph_traversal.percentile(ordered, 0.95) * 1000,
+            "max_ms": ordered[-1] * 1000}
+
+
+def benchmark_menu_scene(frames: int) -> dict[str, float]:
+    """Return the start-up time and per-frame draw time statistics of a MenuScene over the given number of
+    frames. Every frame is a full redraw."""
+    loader = network_loader.NetworkLoader(graph_traversal.DATA_FILE).start()
+    loader.wait()
+    start = time.perf_counter()
+    scene = main.MenuScene(loader)
+    scene.check_network()
+    scene.load_posters()
+    result = {"startup_ms": (time.perf_counter() - start) * 1000}
+
+    scene.user_texts[0] = "The Dark Knight"
+    scene.rating_texts[0] = "4.5"
+    frame_times = []
+    for _ in range(frames):
+        scene.invalidate()
+        start = time.perf_counter()
+        scene.draw()
+        frame_times.append(time.perf_counter() - start)
+    result.update(summarize(frame_times))
+    return result
+
+
+def key_events(text: str) -> list[list[pygame.event.Event]]:
+    """Return one frame per character of text, each with the key press that types it."""
+    return [[pygame.event.Event(pygame.KEYDOWN, key=ord(char.lower()), unicode=char, mod=0, scancode=0)]
+            for char in text]
+
+
+def press(key: int) -> list[pygame.event.Event]:
+    """Return a frame's events for pressing a key that types nothing (like return)."""
+    return [pygame.event.Event(pygame.KEYDOWN, key=key, unicode="", mod=0, scancode=0)]
+
+
+def click(pos: tuple[int, int]) -> list[pygame.event.Event]:
+    """Return a frame's events for a left click at pos."""
+    return [pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=pos, button=1)]
+
+
+def motion(pos: tuple[int, int]) -> list[pygame.event.Event]:
+    """Return a frame's events for moving the mouse to pos."""
+    return [pygame.event.Event(pygame.MOUSEMOTION, pos=pos, rel=(0, 0), buttons=(0, 0, 0))]
+
+
+def menu_script(scene: main.MenuScene, repeat: int) -> list[list[pygame.event.Event]]:
+    """Return the events of every frame of the MenuScene script: filling in two rows (one by accepting a title
+    suggestion), then opening the drop-down menu, hovering over its options and picking one, repeat times."""
+    frames = [click(scene.user_text_rects[0].center)] + key_events("The Dark Knight") + [press(pygame.K_RETURN)]
+    frames += key_events("4.5") + [click(scene.user_text_rects[1].center)] + key_events("Matri")
+    frames += [press(pygame.K_TAB), click(scene.rating_rects[1].center)] + key_events("3")
+
+    dropdown = scene.dropdown.rect
+    for _ in range(repeat):
+        frames.append(click(scene.user_text_rects[2].center))
+        frames.append(click(dropdown.center))
+        for i in range(len(scene.dropdown.options)):
+            frames.append(motion((dropdown.centerx, dropdown.centery + (i + 1) * dropdown.height)))
+        frames.append(click((dropdown.centerx, dropdown.centery + 3 * dropdown.height)))
+        frames += [press(pygame.K_BACKSPACE)] * 3 + [[]] * 5
+    return frames
+
+
+def result_script(repeat: int) -> list[list[pygame.event.Event]]:
+    """Return the events of every frame of the ResultScene script: moving over each poster and rent button in
+    turn and off them again, repeat times."""
+    frames = []
+    for _ in range(repeat):
+        for x, y in result_scene.POSTER_LOCATIONS:
+            frames.append(motion((x + result_scene.DEFAULT_SIZE[0] // 2, y + result_scene.DEFAULT_SIZE[1] // 2)))
+            frames.append(motion((x + 35, y + result_scene.DEFAULT_SIZE[1] + 25)))
+            frames.append(motion((5, 5)))
+    return frames
+
+
+def play(scene: main.MenuScene | result_scene.ResultScene, frames: list[list[pygame.event.Event]],
+         track_allocations: bool = False) -> dict[str, float]:
+    """Run handle_event and draw on scene once per frame with the frame's events, as the main loop does, and
+    return the frame time statistics, or allocation statistics if track_allocations is True.
+
+    Allocations are the memory allocated at the peak of a frame and the memory still held after it, measured
+    with tracemalloc (which slows the frames down, so they are timed separately)."""
+    frame_times, peaks, retained = [], [], []
+    if track_allocations:
+        tracemalloc.start()
+    for events in frames:
+        if track_allocations:
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        if isinstance(scene, main.MenuScene):
+            scene.handle_event(events)
+            scene.draw()
+        else:
+            scene.draw()
+            scene.handle_event(events)
+        scene.take_dirty_rects()
+        frame_times.append(time.perf_counter() - start)
+        if track_allocations:
+            current, peak = tracemalloc.get_traced_memory()
+            peaks.append(peak - before)
+            retained.append(current - before)
+    if not track_allocations:
+        return summarize(frame_times)
+    tracemalloc.stop()
+    return {"alloc_peak_kb_mean": statistics.fmean(peaks) / 1024, "alloc_peak_kb_max": max(peaks) / 1024,
+            "retained_b_mean": statistics.fmean(retained)}
+
+
+def scripted_menu_scene(loader: network_loader.NetworkLoader) -> main.MenuScene:
+    """Return a MenuScene with its network and posters loaded, and speculative searches held back."""
+    scene = main.MenuScene(loader)
+    scene.speculator = speculative_prefetch.SpeculativePrefetcher(debounce=NO_SPECULATION_DEBOUNCE)
+    scene.check_network()
+    scene.load_posters()
+    scene.draw()
+    return scene
+
+
+def make_fixture_results(directory: str) -> tuple[metadata_store.MetadataStore, poster_cache.PosterPipeline]:
+    """Return a metadata store with links for every title in RESULT_TITLES, and a poster pipeline whose disk
+    cache in directory already holds their posters."""
+    store = metadata_store.MetadataStore(os.path.join(directory, "metadata_store.json"))
+    pipeline = poster_cache.PosterPipeline(result_scene.DEFAULT_SIZE, os.path.join(directory, "posters"))
+    os.makedirs(pipeline.cache_dir, exist_ok=True)
+    for i, title in enumerate(RESULT_TITLES):
+        links = [f"https://fixtures.invalid/rent/{i}", f"https://fixtures.invalid/trailer/{i}",
+                 f"https://fixtures.invalid/posters/{i}.png", f"{60 + 3 * i}%"]
+        store.put(title, links)
+        surface = pygame.Surface(result_scene.DEFAULT_SIZE)
+        surface.fill((120, 40 + 15 * i, 60))
+        pygame.image.save(surface, pipeline.cache_path(result_scene.get_poster_url(links)))
+    return store, pipeline
+
+
+def loaded_result_scene() -> tuple[result_scene.ResultScene, dict[str, float]]:
+    """Return a ResultScene of RESULT_TITLES drawn until every poster is shown, and the frame time statistics
+    of the frames this took along with its first paint and completion times."""
+    scene = result_scene.ResultScene(RESULT_TITLES)
+    frame_times = []
+    deadline = time.perf_counter() + RESULT_LOAD_TIMEOUT
+    while not scene.posters_drawn and time.perf_counter() < deadline:
+        start = time.perf_counter()
+        scene.draw()
+        scene.handle_event([])
+        scene.take_dirty_rects()
+        frame_times.append(time.perf_counter() - start)
+    result = {"frames": len(frame_times), "first_paint_ms": scene.first_paint_time * 1000,
+              "complete_ms": (scene.complete_time or RESULT_LOAD_TIMEOUT) * 1000}
+    result.update(summarize(frame_times))
+    return scene, result
+
+
+def run_scripts(scripts: list[str], repeat: int) -> dict[str, dict[str, float]]:
+    """Run the named scripted benchmarks ("menu" and "result"), and return their statistics by name."""
+    results = {}
+    scenes = {}
+    if "menu" in scripts:
+        loader = network_loader.NetworkLoader(graph_traversal.DATA_FILE).start()
+        loader.wait()
+        scenes["menu"] = lambda: scripted_menu_scene(loader)
+    if "result" in scripts:
+        scenes["result"] = lambda: loaded_result_scene()[0]
+
+    with tempfile.TemporaryDirectory() as directory:
+        old_store, old_pipeline = metadata_store.get_default_store(), result_scene.POSTER_PIPELINE
+        store, result_scene.POSTER_PIPELINE = make_fixture_results(directory)
+        metadata_store.set_default_store(store)
+        try:
+            for name, make_scene in scenes.items():
+                results.update(_run_script(name, make_scene, repeat))
+        finally:
+            result_scene.POSTER_PIPELINE.shutdown()
+            result_scene.POSTER_PIPELINE = old_pipeline
+            metadata_store.set_default_store(old_store)
+    return results
+
+
+def _run_script(name: str, make_scene: Callable[[], main.MenuScene | result_scene.ResultScene],
+                repeat: int) -> dict[str, dict[str, float]]:
+    """Time the frames of the named script on a fresh scene, then measure its allocations on another."""
+    results = {}
+    if name == "result":
+        _, results["ResultScene loading"] = loaded_result_scene()
+    scene = make_scene()
+    frames = menu_script(scene, repeat) if name == "menu" else result_script(repeat)
+    gc.collect()
+    label = "MenuScene script" if name == "menu" else "ResultScene hover"
+    results[label] = {"frames": len(frames), **play(scene, frames)}
+
+    scene = make_scene()
+    gc.collect()
+    results[label].update(play(scene, frames, track_allocations=True))
+    return results
+
+
+def run(frames: int, compare: bool) -> dict[str, dict[str, float]]:
+    """Run the benchmark with the text cache enabled and, if compare is True, disabled as well."""
+    results = {}
+    with tempfile.TemporaryDirectory() as poster_dir:
+        make_fixture_posters(poster_dir)
+        main.POSTER_DIR = poster_dir
+        settings = [False, True] if compare else [text_cache.CACHE_ENABLED]
+        for enabled in settings:
+            text_cache.CACHE_ENABLED = enabled
+            results["cached" if enabled else "uncached"] = benchmark_menu_scene(frames)
+    return results
+
+
+def main_cli(argv: Optional[list[str]] = None) -> None:
+    """Run the benchmark from the command line and print its results."""
+    parser = argparse.ArgumentParser(description="Benchmark MenuScene start-up and frame times headlessly.")
+    parser.add_argument("--frames", type=int, default=300, help="number of frames to draw")
+    parser.add_argument("--compare", action="store_true", help="also run with the font and text cache disabled")
+    parser.add_argument("--scripts", nargs="*", choices=["menu", "result"], default=["menu", "result"],
+                        help="scripted input to replay")
+    parser.add_argument("--repeat", type=int, default=3, help="times the drop-down and hover parts of the "
+                                                                 "scripts are repeated")
+    args = parser.parse_args(argv)
+
+    for name, result in run(args.frames, args.compare).items():
+        print(f"MenuScene ({name}): " + ", ".join(f"{key} {value:.3f}" for key, value in result.items()))
+    if args.scripts:
+        with tempfile.TemporaryDirectory() as poster_dir:
+            make_fixture_posters(poster_dir)
+            main.POSTER_DIR = poster_dir
+            for name, result in run_scripts(args.scripts, args.repeat).items():
+                print(f"{name}: " + ", ".join(f"{key} {value:.3f}" for key, value in result.items()))
+
+
+# Testing code
+if __name__ == "__main__":
+    python_ta.check_all(config={
+        'extra-imports': ["annotations", "typing", "argparse", "gc", "os", "statistics", "tempfile", "time",
+                          "tracemalloc", "pygame", "benchmark_graph_traversal", "graph_traversal", "main",
+                          "metadata_store", "network_loader", "poster_cache", "result_scene", "speculative_prefetch",
+                          "text_cache"],
+        'allowed-io': ["main_cli"],
+        'generated-members': ['pygame.*'],
+        'max-line-length': 120
+    })
+
+    main_cli()
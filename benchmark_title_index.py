@@ -0,0 +1,118 @@
+"""
+CSC111 Final Project - Phase 3: UI Design and Implementation - Title Index Benchmark
+
+Description
+===============================
+
+This Python module measures how long the TitleIndex takes to build and to
+answer each keystroke, for the real ratings file and for a synthetic
+catalog of any size (100,000 titles by default).
+
+    python -c "import sys, benchmark_title_index as b; b.main(sys.argv[1:])" --titles 100000
+
+Copyright and Usage Information
+===============================
+
+This file is provided solely for the TA's and Computer Science Professors
+at the University of Toronto St. George campus. All forms of distribution
+of this code, whether as given or with any changes, are expressly prohibited.
+
+This file is Copyright (c) 2023 Guransh Singh, Nauhar Kapur, Shahbaz Nanda,
+and Raunak Madan.
+"""
+# Importing libraries
+from __future__ import annotations
+from typing import Optional
+import argparse
+import random
+import time
+import python_ta
+import benchmark_graph_traversal
+import data_parsing
+import graph_traversal
+import title_index
+
+
+# Program constants
+SYLLABLES = ["ka", "lo", "ren", "ta", "mi", "sor", "vel", "an", "dre", "qu", "ix", "bel", "mar", "to", "ne", "gal"]
+NUM_QUERIES = 200
+
+
+def make_titles(n: int, seed: int = 111) -> list[str]:
+    """Return n distinct made-up movie titles of one to five words."""
+    rng = random.Random(seed)
+    titles = set()
+    while len(titles) < n:
+        words = ["".join(rng.choices(SYLLABLES, k=rng.randint(1, 4))).capitalize()
+                 for _ in range(rng.randint(1, 5))]
+        titles.add(" ".join(words))
+    return sorted(titles)
+
+
+def add_typo(text: str, rng: random.Random) -> str:
+    """Return text with two neighbouring characters swapped, if it has any to swap."""
+    if len(text) < 4:
+        return text
+    i = rng.randrange(1, len(text) - 2)
+    return text[:i] + text[i + 1] + text[i] + text[i + 2:]
+
+
+def percentiles(times: list[float]) -> dict[str, float]:
+    """Return the median, 99th percentile and maximum of times, in microseconds."""
+    ordered = sorted(times)
+    return {"p50_us": benchmark_graph_traversal.percentile(ordered, 0.5) * 1e6,
+            "p99_us": benchmark_graph_traversal.percentile(ordered, 0.99) * 1e6,
+            "max_us": ordered[-1] * 1e6}
+
+
+def benchmark_index(titles: list[str], popularity: Optional[dict[str, int]] = None,
+                    seed: int = 111) -> dict[str, dict[str, float]]:
+    """Return the build time of a TitleIndex over titles, and its suggest latency for every keystroke of
+    NUM_QUERIES titles typed correctly and with a typo."""
+    start = time.perf_counter()
+    index = title_index.TitleIndex(titles, popularity)
+    results = {"build": {"seconds": time.perf_counter() - start, "titles": len(index)}}
+
+    rng = random.Random(seed)
+    queries = rng.sample(titles, min(NUM_QUERIES, len(titles)))
+    for name, typed in [("typing", queries), ("typo", [add_typo(title, rng) for title in queries])]:
+        times = []
+        for text in typed:
+            for end in range(1, len(text) + 1):
+                start = time.perf_counter()
+                index.suggest(text[:end])
+                times.append(time.perf_counter() - start)
+        results[name] = percentiles(times)
+        results[name]["keystrokes"] = len(times)
+    return results
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    """Run the benchmark from the command line and print its results."""
+    parser = argparse.ArgumentParser(description="Benchmark TitleIndex build time and per-keystroke latency.")
+    parser.add_argument("--titles", type=int, default=100000, help="number of synthetic titles to index")
+    parser.add_argument("--skip-dataset", action="store_true", help="do not benchmark the real ratings file")
+    args = parser.parse_args(argv)
+
+    catalogs = {}
+    if not args.skip_dataset:
+        network = data_parsing.load_review_network(graph_traversal.DATA_FILE)
+        catalogs["dataset"] = (list(network.movies),
+                               {title: len(movie.users_rated_by) for title, movie in network.movies.items()})
+    catalogs[f"synthetic {args.titles}"] = (make_titles(args.titles), None)
+
+    for name, (titles, popularity) in catalogs.items():
+        for measure, result in benchmark_index(titles, popularity).items():
+            print(f"{name} {measure}: " + ", ".join(f"{key} {value:.3f}" for key, value in result.items()))
+
+
+# Testing code
+if __name__ == "__main__":
+    python_ta.check_all(config={
+        'extra-imports': ["annotations", "typing", "argparse", "random", "time", "benchmark_graph_traversal",
+                          "data_parsing", "graph_traversal", "title_index"],
+        'allowed-io': ["main"],
+        'max-line-length': 120
+    })
+
+    main()
@@ -0,0 +1,181 @@
+"""
+CSC111 Final Project - Phase 2: Data Parsing - Bulk Recommendations
+
+Description
+===============================
+
+This Python module computes recommendations for many users at once without
+the GUI. It reads one user history per line, as a JSON object mapping movie
+titles to ratings (the same format as MenuScene.user_submissions), and
+writes one JSON line of recommendations per input line, in input order:
+
+    {"line": 1, "recommendations": [{"title": "Heat", "score": 5.2}, ...]}
+    {"line": 2, "error": "unknown titles: ['Not A Movie']"}
+
+    python -c "import sys, bulk_recommend; bulk_recommend.main(sys.argv[1:])" histories.jsonl -o out.jsonl
+
+Lines are read lazily and at most --window of them are in flight at once,
+so memory stays the same whatever the size of the input. With --workers
+above 1, searches run in that many worker processes, each of which loads
+the ReviewNetwork once (from its snapshot) when it starts.
+
+Copyright and Usage Information
+===============================
+
+This file is provided solely for the TA's and Computer Science Professors
+at the University of Toronto St. George campus. All forms of distribution
+of this code, whether as given or with any changes, are expressly prohibited.
+
+This file is Copyright (c) 2023 Guransh Singh, Nauhar Kapur, Shahbaz Nanda,
+and Raunak Madan.
+"""
+# Importing libraries
+from __future__ import annotations
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Iterable, Iterator, Optional, TextIO
+import argparse
+import json
+import sys
+import time
+import python_ta
+import data_parsing
+import graph_traversal
+
+
+# Program constants
+DEFAULT_NUM_REC = 10
+WINDOW_PER_WORKER = 8
+
+
+def recommend_line(line: str, num_rec: int) -> dict:
+    """Return the output record (without its line number) for one input line."""
+    try:
+        ratings = json.loads(line)
+    except ValueError as error:
+        return {"error": f"invalid JSON: {error}"}
+    if not isinstance(ratings, dict) or not ratings:
+        return {"error": "expected a non-empty JSON object mapping titles to ratings"}
+
+    movies = graph_traversal.get_review_network().movies
+    unknown = [title for title in ratings if title not in movies]
+    if unknown:
+        return {"error": f"unknown titles: {unknown}"}
+    if not all(isinstance(r, (int, float)) and not isinstance(r, bool) and 0 <= r <= 5 for r in ratings.values()):
+        return {"error": "ratings must be numbers from 0.0 to 5.0"}
+
+    results = graph_traversal.run_search_on_all({title: float(r) for title, r in ratings.items()}, num_rec)
+    return {"recommendations": [{"title": movie.title, "score": score} for movie, score in results]}
+
+
+def _init_worker(csv_file: str) -> None:
+    """Load the review network in a new worker process."""
+    graph_traversal.set_review_network(data_parsing.load_review_network(csv_file))
+
+
+def _recommend_batch(lines: list[tuple[int, str]], num_rec: int) -> list[str]:
+    """Return the serialized output records for a batch of numbered input lines (run in a worker)."""
+    return [json.dumps({"line": number, **recommend_line(line, num_rec)}) for number, line in lines]
+
+
+def numbered_lines(lines: Iterable[str]) -> Iterator[tuple[int, str]]:
+    """Yield (line number, line) for the non-blank lines, numbering from 1 and counting blank lines."""
+    for number, line in enumerate(lines, start=1):
+        if line.strip():
+            yield number, line
+
+
+def batched(items: Iterator[tuple[int, str]], size: int) -> Iterator[list[tuple[int, str]]]:
+    """Yield consecutive lists of up to size items."""
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def stream_recommendations(lines: Iterable[str], output: TextIO, num_rec: int = DEFAULT_NUM_REC,
+                           workers: int = 1, window: Optional[int] = None, batch_size: int = 16,
+                           csv_file: str = graph_traversal.DATA_FILE) -> int:
+    """Write one output record per non-blank line of lines to output, in input order, and return the number of
+    records written.
+
+    With workers == 1 every search runs in this process, on graph_traversal's review network. Otherwise batches
+    of batch_size lines go to a pool of worker processes that each load csv_file, with at most window batches
+    in flight at once (by default WINDOW_PER_WORKER per worker).
+
+    Preconditions:
+    - num_rec > 0
+    - workers > 0
+    - window is None or window > 0
+    - batch_size > 0
+    """
+    written = 0
+    if workers == 1:
+        graph_traversal.get_review_network()
+        for number, line in numbered_lines(lines):
+            output.write(json.dumps({"line": number, **recommend_line(line, num_rec)}) + "\n")
+            written += 1
+        return written
+
+    window = WINDOW_PER_WORKER * workers if window is None else window
+    in_flight: deque[Future] = deque()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(csv_file,)) as executor:
+        for batch in batched(numbered_lines(lines), batch_size):
+            if len(in_flight) >= window:
+                written += _write_records(in_flight.popleft().result(), output)
+            in_flight.append(executor.submit(_recommend_batch, batch, num_rec))
+        while in_flight:
+            written += _write_records(in_flight.popleft().result(), output)
+    return written
+
+
+def _write_records(records: list[str], output: TextIO) -> int:
+    """Write serialized records to output, one per line, and return how many there were."""
+    for record in records:
+        output.write(record + "\n")
+    return len(records)
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    """Run bulk recommendations from the command line."""
+    parser = argparse.ArgumentParser(description="Stream recommendations for JSON-lines user histories.")
+    parser.add_argument("input", nargs="?", default="-", help="JSON-lines file of histories (default: stdin)")
+    parser.add_argument("-o", "--output", default="-", help="file to write results to (default: stdout)")
+    parser.add_argument("--num-rec", type=int, default=DEFAULT_NUM_REC, help="recommendations per user")
+    parser.add_argument("--workers", type=int, default=1, help="worker processes to search with")
+    parser.add_argument("--window", type=int, default=None, help="batches in flight at once")
+    parser.add_argument("--batch-size", type=int, default=16, help="lines sent to a worker at a time")
+    parser.add_argument("--csv", default=graph_traversal.DATA_FILE, help="ratings file to load")
+    args = parser.parse_args(argv)
+
+    graph_traversal.set_review_network(data_parsing.load_review_network(args.csv))
+    source = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+    sink = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    start = time.perf_counter()
+    try:
+        written = stream_recommendations(source, sink, args.num_rec, args.workers, args.window, args.batch_size,
+                                         args.csv)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if sink is not sys.stdout:
+            sink.close()
+    elapsed = time.perf_counter() - start
+    print(f"Wrote {written} results in {elapsed:.2f}s ({written / elapsed if elapsed else 0:.1f} users/s)",
+          file=sys.stderr)
+
+
+# Testing code
+if __name__ == "__main__":
+    python_ta.check_all(config={
+        'extra-imports': ["annotations", "collections", "concurrent.futures", "typing", "argparse", "json", "sys",
+                          "time", "data_parsing", "graph_traversal"],
+        'allowed-io': ["main"],
+        'max-line-length': 120
+    })
+
+    main()
@@ -0,0 +1,182 @@
+"""
+CSC111 Final Project - Phase 3: UI Design and Implementation - Bulk Catalog Prefetcher
+
+Description
+===============================
+
+This Python module walks every movie in a ReviewNetwork and saves its rent,
+trailer and poster links and IMDb rating in the local metadata store, so
+that interactive sessions almost never need to query the movie API.
+
+The job respects a requests-per-second budget and can be interrupted at any
+time: titles that are already in the store are skipped, so running it again
+resumes where it stopped.
+
+    python -c "import sys, catalog_prefetch; catalog_prefetch.main(sys.argv[1:])" --rps 2
+
+Copyright and Usage Information
+===============================
+
+This file is provided solely for the TA's and Computer Science Professors
+at the University of Toronto St. George campus. All forms of distribution
+of this code, whether as given or with any changes, are expressly prohibited.
+
+This file is Copyright (c) 2023 Guransh Singh, Nauhar Kapur, Shahbaz Nanda,
+and Raunak Madan.
+"""
+# Importing libraries
+from __future__ import annotations
+from dataclasses import dataclass, field
+from typing import Callable, Iterable, Optional
+import argparse
+import threading
+import time
+import requests
+import python_ta
+import api_parser
+import data_parsing
+import graph_traversal
+import metadata_store
+
+
+# Program constants
+DEFAULT_REQUESTS_PER_SECOND = 2.0
+FLUSH_INTERVAL = 25
+
+
+class RateLimiter:
+    """
+    Spaces out calls to wait() so that at most requests_per_second of them return each second.
+
+    Instance Attributes:
+    - requests_per_second: the request budget, or 0 for no limit
+
+    Representation Invariants:
+    - self.requests_per_second >= 0
+    """
+    requests_per_second: float
+    _next_time: float
+    _lock: threading.Lock
+
+    def __init__(self, requests_per_second: float) -> None:
+        """Initialize a limiter with the given budget."""
+        self.requests_per_second = requests_per_second
+        self._next_time = time.monotonic()
+        self._lock = threading.Lock()
+
+    def wait(self) -> None:
+        """Block until another request fits in the budget."""
+        if self.requests_per_second <= 0:
+            return
+        with self._lock:
+            now = time.monotonic()
+            delay = self._next_time - now
+            self._next_time = max(now, self._next_time) + 1 / self.requests_per_second
+        if delay > 0:
+            time.sleep(delay)
+
+
+@dataclass
+class PrefetchReport:
+    """
+    Summary of a prefetch run.
+
+    Instance Attributes:
+    - fetched: number of titles fetched from the API and stored
+    - skipped: number of titles that were already in the store
+    - failed: titles whose request failed and should be retried by a later run
+    - elapsed: wall-clock seconds taken by the run
+    """
+    fetched: int = 0
+    skipped: int = 0
+    failed: list[str] = field(default_factory=list)
+    elapsed: float = 0.0
+
+
+def prefetch_catalog(titles: Iterable[str], store: metadata_store.MetadataStore,
+                     requests_per_second: float = DEFAULT_REQUESTS_PER_SECOND, api_url: str = "",
+                     limit: Optional[int] = None,
+                     progress: Optional[Callable[[str, PrefetchReport], None]] = None) -> PrefetchReport:
+    """Fetch and store the API result of every title that is not in store yet, and return a summary.
+
+    The store is saved every FLUSH_INTERVAL fetched titles and again when the run ends, including when it is
+    interrupted, so at most FLUSH_INTERVAL titles are fetched twice across an interruption. Titles whose request
+    raises a network error, or that every API key failed for, are not stored, so the next run retries them.
+
+    If limit is given, stop after that many titles have been fetched. If progress is given, it is called after
+    every fetched title.
+
+    Preconditions:
+    - requests_per_second >= 0
+    - limit is None or limit >= 0
+    """
+    report = PrefetchReport()
+    limiter = RateLimiter(requests_per_second)
+    start = time.perf_counter()
+    try:
+        for title in titles:
+            if limit is not None and report.fetched >= limit:
+                break
+            if title in store:
+                report.skipped += 1
+                continue
+
+            try:
+                links = api_parser.fetch_links(title, api_url, throttle=limiter.wait)
+            except (requests.RequestException, ValueError):
+                links = None
+            if links is None:
+                report.failed.append(title)
+                continue
+
+            store.put(title, links)
+            report.fetched += 1
+            if report.fetched % FLUSH_INTERVAL == 0:
+                store.save()
+            if progress is not None:
+                progress(title, report)
+    finally:
+        store.save()
+        report.elapsed = time.perf_counter() - start
+
+    return report
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    """Run the prefetcher from the command line."""
+    parser = argparse.ArgumentParser(description="Prefetch movie API results for every title in the dataset.")
+    parser.add_argument("--csv", default=graph_traversal.DATA_FILE, help="ratings file to take titles from")
+    parser.add_argument("--store", default=metadata_store.DEFAULT_STORE_PATH, help="metadata store to fill")
+    parser.add_argument("--rps", type=float, default=DEFAULT_REQUESTS_PER_SECOND,
+                        help="maximum API requests per second (0 for no limit)")
+    parser.add_argument("--api-url", default="", help="search endpoint to use instead of the real API")
+    parser.add_argument("--limit", type=int, default=None, help="stop after fetching this many titles")
+    args = parser.parse_args(argv)
+
+    titles = list(data_parsing.create_review_network(args.csv).movies)
+    store = metadata_store.MetadataStore(args.store)
+    print(f"{len(store)} of {len(titles)} titles already stored")
+
+    def show_progress(title: str, report: PrefetchReport) -> None:
+        print(f"[{report.fetched + report.skipped}/{len(titles)}] {title}")
+
+    try:
+        report = prefetch_catalog(titles, store, args.rps, args.api_url, args.limit, show_progress)
+    except KeyboardInterrupt:
+        print(f"Interrupted; {len(store)} titles stored. Run again to resume.")
+        return
+
+    print(f"Fetched {report.fetched}, skipped {report.skipped}, failed {len(report.failed)} "
+          f"in {report.elapsed:.1f}s")
+
+
+# Testing code
+if __name__ == "__main__":
+    python_ta.check_all(config={
+        'extra-imports': ["annotations", "dataclasses", "typing", "argparse", "threading", "time", "requests",
+                          "api_parser", "data_parsing", "graph_traversal", "metadata_store"],
+        'allowed-io': ["main"],
+        'max-line-length': 120
+    })
+
+    main()
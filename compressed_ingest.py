@@ -0,0 +1,241 @@
+"""
+CSC111 Final Project - Phase 2: Data Parsing - Compressed Rating Files
+
+Description
+===============================
+
+This Python module builds a ReviewNetwork straight from a gzip-, bz2- or
+xz-compressed ratings file, without decompressing it to disk first. The
+compression is detected from the file's first bytes. One thread
+decompresses the file in blocks while the calling thread parses them; the
+standard library codecs release the GIL while they work, so the two
+overlap. At most MAX_QUEUED_BLOCKS decompressed blocks wait at once, so
+memory use stays small whatever the size of the file.
+
+    python -c "import sys, compressed_ingest; compressed_ingest.main(sys.argv[1:])" --benchmark
+
+Copyright and Usage Information
+===============================
+
+This file is provided solely for the TA's and Computer Science Professors
+at the University of Toronto St. George campus. All forms of distribution
+of this code, whether as given or with any changes, are expressly prohibited.
+
+This file is Copyright (c) 2023 Guransh Singh, Nauhar Kapur, Shahbaz Nanda,
+and Raunak Madan.
+"""
+# Importing libraries
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import BinaryIO, Iterator, Optional
+import argparse
+import bz2
+import codecs
+import csv
+import gzip
+import lzma
+import os
+import queue
+import shutil
+import tempfile
+import threading
+import time
+import python_ta
+import data_parsing
+import graph_traversal
+import movie_classes
+
+
+# Program constants
+BLOCK_SIZE = 1 << 20
+MAX_QUEUED_BLOCKS = 8
+
+# The leading bytes of each compressed format, and the function opening it as a binary stream
+CODECS = {"gzip": (b"\x1f\x8b", gzip.open),
+          "bz2": (b"BZh", bz2.open),
+          "xz": (b"\xfd7zXZ\x00", lzma.open)}
+EXTENSIONS = {"gzip": ".gz", "bz2": ".bz2", "xz": ".xz"}
+
+
+def detect_codec(path: str) -> str:
+    """Return the compression of the file at path: "gzip", "bz2", "xz", or "none" for an uncompressed file."""
+    with open(path, "rb") as file:
+        start = file.read(6)
+    for codec, (magic, _) in CODECS.items():
+        if start.startswith(magic):
+            return codec
+    return "none"
+
+
+def open_binary(path: str, codec: str) -> BinaryIO:
+    """Return a binary stream of the decompressed contents of the file at path."""
+    if codec == "none":
+        return open(path, "rb")
+    return CODECS[codec][1](path, "rb")
+
+
+@dataclass
+class IngestReport:
+    """
+    Statistics of building a network from one file.
+
+    Instance Attributes:
+    - codec: the compression of the file
+    - compressed_bytes: size of the file on disk
+    - decompressed_bytes: size of its decompressed contents
+    - rows: number of ratings read
+    - seconds: time taken to build the network
+    - threaded: whether decompression ran on its own thread
+    """
+    codec: str
+    compressed_bytes: int
+    decompressed_bytes: int = 0
+    rows: int = 0
+    seconds: float = 0.0
+    threaded: bool = True
+
+    def summary(self) -> str:
+        """Return a one-line description of the run, with its throughput."""
+        mb = 2 ** -20
+        rate = self.decompressed_bytes * mb / self.seconds if self.seconds else 0.0
+        row_rate = self.rows / self.seconds if self.seconds else 0.0
+        return (f"{self.codec:<5} {'threaded' if self.threaded else 'inline':<9} {self.rows} rows in "
+                f"{self.seconds:.2f}s: {rate:.1f} MB/s decompressed, {row_rate:,.0f} rows/s "
+                f"({self.compressed_bytes * mb:.2f} MB on disk)")
+
+
+def _read_blocks(stream: BinaryIO, blocks: queue.Queue, stop: threading.Event) -> None:
+    """Decompress stream block by block into blocks, then put None (run on the decompression thread).
+
+    Any exception raised while reading (such as zlib.error for a corrupt gzip file) is put in blocks in place of
+    the remaining blocks. None is always put last, so the consumer never waits forever."""
+    try:
+        while not stop.is_set():
+            block = stream.read(BLOCK_SIZE)
+            if not block:
+                break
+            blocks.put(block)
+    except Exception as error:  # pylint: disable=broad-exception-caught
+        blocks.put(error)
+    finally:
+        blocks.put(None)
+
+
+def iter_blocks(stream: BinaryIO, threaded: bool = True) -> Iterator[bytes]:
+    """Yield the blocks of stream, read on a separate thread ahead of the consumer if threaded is True."""
+    if not threaded:
+        while True:
+            block = stream.read(BLOCK_SIZE)
+            if not block:
+                return
+            yield block
+
+    blocks = queue.Queue(maxsize=MAX_QUEUED_BLOCKS)
+    stop = threading.Event()
+    reader = threading.Thread(target=_read_blocks, args=(stream, blocks, stop), daemon=True, name="decompress")
+    reader.start()
+    try:
+        while True:
+            block = blocks.get()
+            if block is None:
+                return
+            if isinstance(block, Exception):
+                raise block
+            yield block
+    finally:
+        # letting the reader finish if the consumer stopped early, before the stream can be closed
+        stop.set()
+        while reader.is_alive():
+            try:
+                blocks.get(timeout=0.1)
+            except queue.Empty:
+                pass
+        reader.join()
+
+
+def iter_lines(blocks: Iterator[bytes]) -> Iterator[str]:
+    """Yield the lines of UTF-8 text split into blocks, decoding characters that straddle two blocks correctly."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    remainder = ""
+    for block in blocks:
+        text = remainder + decoder.decode(block)
+        lines = text.split("\n")
+        remainder = lines.pop()
+        yield from lines
+    remainder += decoder.decode(b"", final=True)
+    if remainder:
+        yield remainder
+
+
+def create_review_network(path: str, threaded: bool = True) -> tuple[movie_classes.ReviewNetwork, IngestReport]:
+    """Return the review network of the (possibly compressed) ratings file at path, and statistics of the run.
+
+    The result is the same as data_parsing.create_review_network on the decompressed file."""
+    report = IngestReport(detect_codec(path), os.path.getsize(path), threaded=threaded)
+    review_network = movie_classes.ReviewNetwork()
+    start = time.perf_counter()
+
+    with open_binary(path, report.codec) as stream:
+        def counted(blocks: Iterator[bytes]) -> Iterator[bytes]:
+            for block in blocks:
+                report.decompressed_bytes += len(block)
+                yield block
+
+        blocks = iter_blocks(stream, threaded)
+        try:
+            reader = csv.reader(iter_lines(counted(blocks)))
+            next(reader, None)
+            for row in reader:
+                if not row:
+                    continue
+                user_id, rating_score, movie_title, movie_genres = data_parsing.parse_row(row)
+                review_network.add_rating(user_id, movie_title, movie_genres, rating_score)
+                report.rows += 1
+        finally:
+            # stopping the decompression thread before the stream is closed, even if parsing failed
+            blocks.close()
+
+    report.seconds = time.perf_counter() - start
+    return review_network, report
+
+
+def compress_copy(csv_file: str, codec: str, directory: str) -> str:
+    """Write a copy of csv_file compressed with codec into directory, and return its path."""
+    path = os.path.join(directory, os.path.basename(csv_file) + EXTENSIONS[codec])
+    with open(csv_file, "rb") as source, CODECS[codec][1](path, "wb") as target:
+        shutil.copyfileobj(source, target, BLOCK_SIZE)
+    return path
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    """Build networks from the given ratings files, or from compressed copies of the bundled one with
+    --benchmark, and print the throughput of each."""
+    parser = argparse.ArgumentParser(description="Build review networks from compressed ratings files.")
+    parser.add_argument("files", nargs="*", help="ratings files, compressed or not")
+    parser.add_argument("--benchmark", action="store_true",
+                        help="compress the bundled ratings file with every codec and load each copy")
+    parser.add_argument("--inline", action="store_true", help="also decompress on the parsing thread to compare")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as directory:
+        files = list(args.files)
+        if args.benchmark:
+            files.append(graph_traversal.DATA_FILE)
+            files.extend(compress_copy(graph_traversal.DATA_FILE, codec, directory) for codec in CODECS)
+        for path in files:
+            for threaded in ([True, False] if args.inline else [True]):
+                _, report = create_review_network(path, threaded)
+                print(report.summary())
+
+
+# Testing code
+if __name__ == "__main__":
+    python_ta.check_all(config={
+        'extra-imports': ["annotations", "dataclasses", "typing", "argparse", "bz2", "codecs", "csv", "gzip",
+                          "lzma", "os", "queue", "shutil", "tempfile", "threading", "time", "data_parsing",
+                          "graph_traversal", "movie_classes"],
+        'allowed-io': ["detect_codec", "open_binary", "compress_copy", "main"],
+        'max-line-length': 120
+    })
+
+    main()
@@ -18,9 +18,30 @@ This file is Copyright (c) 2023 Guransh Singh, Nauhar Kapur, Shahbaz Nanda,
 and Raunak Madan.
 """
 # Importing libraries
+from typing import Optional
 import csv
+import os
+import pickle
+import tempfile
 import python_ta
 import movie_classes
+import tracing
+
+
+# Program constants
+SNAPSHOT_SUFFIX = ".snapshot"
+SNAPSHOT_VERSION = 1
+
+
+def parse_row(row: list[str]) -> tuple[int, float, str, list[str]]:
+    """Return the user id, rating, movie title and genres of a row of the ratings file (after the header).
+
+    Raise ValueError or IndexError if the row is malformed.
+
+    >>> parse_row(['10', '1', '2.5', 'Rocky III', 'Drama'])
+    (1, 2.5, 'Rocky III', ['Drama'])
+    """
+    return int(row[1]), float(row[2]), row[3], row[4].split('-')
 
 
 def create_review_network(csv_file: str) -> movie_classes.ReviewNetwork:
@@ -29,7 +50,7 @@ def create_review_network(csv_file: str) -> movie_classes.ReviewNetwork:
     review_network = movie_classes.ReviewNetwork()
 
     # Reading file
-    with open(csv_file) as file:
+    with open(csv_file) as file, tracing.span("csv_load", file=csv_file) as span:
         header = True
         reader = csv.reader(file)
 
@@ -38,41 +59,111 @@ def create_review_network(csv_file: str) -> movie_classes.ReviewNetwork:
                 header = False
             else:
                 # Typecasting
-                user_id = int(row[1])
-                rating_score = float(row[2])
-                movie_title = row[3]
-                movie_genres = row[4].split('-')
-
-                # Creating user object
-                if not review_network.user_exists(user_id):
-                    new_user = movie_classes.User(user_id)
-                    review_network.add_user(new_user)
-                else:
-                    new_user = review_network.users[user_id]
-
-                # Creating movie object
-                if not review_network.movie_exists(movie_title):
-                    new_movie = movie_classes.Movie(movie_title, movie_genres)
-                    review_network.add_movie(new_movie)
-                else:
-                    new_movie = review_network.movies[movie_title]
-
-                # Creating rating
-                new_rating = movie_classes.Rating(new_user, new_movie, rating_score)
-
-                # Updating user and movie to include new rating
-                new_user.add_movie_rated(new_movie, new_rating)
-                new_movie.add_user(new_user)
+                user_id, rating_score, movie_title, movie_genres = parse_row(row)
+
+                # Creating the user, movie and rating, and linking them together
+                review_network.add_rating(user_id, movie_title, movie_genres, rating_score)
+        span.set("rows", reader.line_num - 1)
 
     # Returning fully parsed network
     return review_network
 
 
+def save_snapshot(review_network: movie_classes.ReviewNetwork, snapshot_file: str, csv_file: str) -> None:
+    """Save review_network to snapshot_file in a compact form that loads faster than csv_file parses.
+
+    The snapshot records the size and modification time of csv_file, so that load_snapshot can tell when it is
+    out of date. It is written to a uniquely named temporary file first and then moved into place, so processes
+    saving the same snapshot at once never write the same file."""
+    movie_indices = {}
+    movies = []
+    for title, movie in review_network.movies.items():
+        movie_indices[title] = len(movies)
+        movies.append((title, movie.genre))
+
+    ratings = []
+    for user in review_network.users.values():
+        for movie, rating in user.movies_rated.items():
+            ratings.append((user.user_id, movie_indices[movie.title], rating.rating))
+
+    source = os.stat(csv_file)
+    snapshot = {"version": SNAPSHOT_VERSION, "source_size": source.st_size, "source_mtime": source.st_mtime,
+                "movies": movies, "ratings": ratings}
+    descriptor, temp_file = tempfile.mkstemp(suffix=".tmp", dir=os.path.dirname(snapshot_file) or ".")
+    try:
+        with os.fdopen(descriptor, "wb") as file:
+            pickle.dump(snapshot, file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_file, snapshot_file)
+    except BaseException:
+        os.remove(temp_file)
+        raise
+
+
+def load_snapshot(snapshot_file: str, csv_file: str) -> Optional[movie_classes.ReviewNetwork]:
+    """Return the review network saved in snapshot_file, or None if there is no snapshot or if csv_file has
+    changed since the snapshot was saved.
+
+    The snapshot is a pickle, and is unpickled without any check of where it came from. Unpickling can run
+    arbitrary code, so snapshot_file must only ever be written by save_snapshot: a tampered snapshot is as
+    dangerous as a tampered Python file."""
+    if not os.path.exists(snapshot_file):
+        return None
+    with open(snapshot_file, "rb") as file:
+        snapshot = pickle.load(file)
+
+    source = os.stat(csv_file)
+    if snapshot.get("version") != SNAPSHOT_VERSION or snapshot["source_size"] != source.st_size \
+            or snapshot["source_mtime"] != source.st_mtime:
+        return None
+
+    review_network = movie_classes.ReviewNetwork()
+    movies = []
+    for title, genres in snapshot["movies"]:
+        movie = movie_classes.Movie(title, genres)
+        review_network.add_movie(movie)
+        movies.append(movie)
+
+    for user_id, movie_index, rating_score in snapshot["ratings"]:
+        user = review_network.users.get(user_id)
+        if user is None:
+            user = movie_classes.User(user_id)
+            review_network.add_user(user)
+        movie = movies[movie_index]
+        user.add_movie_rated(movie, movie_classes.Rating(user, movie, rating_score))
+        movie.add_user(user)
+
+    return review_network
+
+
+def load_review_network(csv_file: str) -> movie_classes.ReviewNetwork:
+    """Return the review network for csv_file, loading it from its snapshot when the snapshot is up to date
+    and otherwise parsing csv_file and saving a new snapshot for next time.
+
+    The snapshot is a pickle written next to csv_file (csv_file + SNAPSHOT_SUFFIX) and unpickled on the next
+    load without any check (see load_snapshot), so csv_file must be in a directory no one else can write to."""
+    snapshot_file = csv_file + SNAPSHOT_SUFFIX
+    try:
+        with tracing.span("snapshot_load", file=snapshot_file) as span:
+            review_network = load_snapshot(snapshot_file, csv_file)
+            span.set("hit", review_network is not None)
+    except (OSError, pickle.UnpicklingError, EOFError, KeyError, IndexError, TypeError, ValueError):
+        review_network = None
+    if review_network is not None:
+        return review_network
+
+    review_network = create_review_network(csv_file)
+    try:
+        save_snapshot(review_network, snapshot_file, csv_file)
+    except OSError:
+        pass
+    return review_network
+
+
 # Testing code
 if __name__ == "__main__":
     python_ta.check_all(config={
-        'extra-imports': ["csv", "movie_classes"],
-        'allowed-io': ["create_review_network"],
+        'extra-imports': ["typing", "csv", "os", "pickle", "tempfile", "movie_classes", "tracing"],
+        'allowed-io': ["create_review_network", "save_snapshot", "load_snapshot"],
         'max-line-length': 120
     })
 
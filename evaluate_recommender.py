@@ -0,0 +1,237 @@
+"""
+CSC111 Final Project - Phase 2: Data Parsing - Offline Evaluation
+
+Description
+===============================
+
+This Python module measures how good recommendations are with a
+leave-k-out evaluation. For every user with enough ratings, k of their
+ratings are held out and removed from the network; a query is built from
+up to query_size of the user's remaining ratings (the menu screen takes at
+most five), and the held-out movies the user liked (rated at least
+graph_traversal.MOVIE_THRESHOLD) are the ones a good recommender should
+find. Precision@n, recall@n and catalog coverage are reported for each
+engine, with its throughput, so quality and speed come from the same run.
+
+Queries are spread over worker processes, each of which rebuilds the same
+split from the ratings file. The graph search breaks ties between equally
+close neighbours in set order, which differs between processes, so its
+metrics vary slightly from run to run.
+
+    python -c "import sys, evaluate_recommender as e; e.main(sys.argv[1:])" --held-out 5 --top 10
+
+Copyright and Usage Information
+===============================
+
+This file is provided solely for the TA's and Computer Science Professors
+at the University of Toronto St. George campus. All forms of distribution
+of this code, whether as given or with any changes, are expressly prohibited.
+
+This file is Copyright (c) 2023 Guransh Singh, Nauhar Kapur, Shahbaz Nanda,
+and Raunak Madan.
+"""
+# Importing libraries
+from __future__ import annotations
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Optional
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import time
+import python_ta
+import data_parsing
+import graph_traversal
+import movie_classes
+import user_similarity
+
+
+# Program constants
+DEFAULT_HELD_OUT = 5
+DEFAULT_TOP = 10
+DEFAULT_QUERY_SIZE = 5
+DEFAULT_MIN_RATINGS = 15
+BATCH_SIZE = 16
+
+# The recommenders that can be evaluated, each called as engine(user_movies, num_rec, review_network)
+ENGINES: dict[str, Callable[[dict[str, float], int, movie_classes.ReviewNetwork],
+                            list[tuple[movie_classes.Movie, float]]]] = {
+    "graph": graph_traversal.run_search_on_all,
+    "pearson": user_similarity.run_search_on_all,
+    "cosine": lambda user_movies, num_rec, review_network: user_similarity.run_search_on_all(
+        user_movies, num_rec, review_network, "cosine")
+}
+
+# The training network and evaluation cases of a worker process (see _init_worker)
+_WORKER_SPLIT = None
+
+
+@dataclass
+class EvaluationCase:
+    """
+    One user's query and held-out ratings.
+
+    Instance Attributes:
+    - user_id: the user
+    - query: the ratings the recommender is given, by title
+    - held_out: the ratings removed from the network, by title
+
+    Representation Invariants:
+    - self.query != {} and self.held_out != {}
+    - not (self.query.keys() & self.held_out.keys())
+    """
+    user_id: int
+    query: dict[str, float]
+    held_out: dict[str, float]
+
+    def relevant(self) -> set[str]:
+        """Return the held-out titles the user liked."""
+        return {title for title, rating in self.held_out.items() if rating >= graph_traversal.MOVIE_THRESHOLD}
+
+
+def split_ratings(review_network: movie_classes.ReviewNetwork, held_out: int = DEFAULT_HELD_OUT,
+                  query_size: int = DEFAULT_QUERY_SIZE, min_ratings: int = DEFAULT_MIN_RATINGS,
+                  seed: int = 111) -> tuple[movie_classes.ReviewNetwork, list[EvaluationCase]]:
+    """Return the training network (review_network without the held-out ratings) and the evaluation case of
+    every user with at least min_ratings ratings. A query_size of 0 puts all remaining ratings in the query.
+
+    The split depends only on the ratings and seed, so every process computes the same one.
+
+    Preconditions:
+    - 0 < held_out < min_ratings
+    - query_size >= 0
+    """
+    training = movie_classes.ReviewNetwork()
+    cases = []
+    for user_id in sorted(review_network.users):
+        ratings = {movie.title: rating.rating for movie, rating in review_network.users[user_id].movies_rated.items()}
+        titles = sorted(ratings)
+        removed = set()
+        if len(titles) >= min_ratings:
+            rng = random.Random(f"{seed}:{user_id}")
+            removed = set(rng.sample(titles, held_out))
+            remaining = [title for title in titles if title not in removed]
+            query = remaining if query_size == 0 else rng.sample(remaining, min(query_size, len(remaining)))
+            cases.append(EvaluationCase(user_id, {title: ratings[title] for title in sorted(query)},
+                                        {title: ratings[title] for title in sorted(removed)}))
+        for title in titles:
+            if title not in removed:
+                training.add_rating(user_id, title, review_network.movies[title].genre, ratings[title])
+    return training, cases
+
+
+def _init_worker(csv_file: str, held_out: int, query_size: int, min_ratings: int, seed: int) -> None:
+    """Build the training network and evaluation cases in a new worker process."""
+    global _WORKER_SPLIT
+    _WORKER_SPLIT = split_ratings(data_parsing.create_review_network(csv_file), held_out, query_size, min_ratings,
+                                  seed)
+
+
+def _warm_up(_: int) -> int:
+    """Return once the worker has built its split, keeping it busy long enough for the others to start too."""
+    time.sleep(0.05)
+    return os.getpid()
+
+
+def _evaluate_batch(engine: str, indices: list[int], top: int) -> list[list[str]]:
+    """Return the titles recommended by engine for each of the given evaluation cases (run in a worker)."""
+    training, cases = _WORKER_SPLIT
+    recommend = ENGINES[engine]
+    return [[movie.title for movie, _ in recommend(cases[i].query, top, training)] for i in indices]
+
+
+def score(cases: list[EvaluationCase], recommended: list[list[str]], top: int, catalog_size: int) -> dict:
+    """Return precision@top and recall@top averaged over the cases with a relevant held-out movie, and the share
+    of the catalog_size movies that were recommended to anyone."""
+    precisions, recalls = [], []
+    for case, titles in zip(cases, recommended):
+        relevant = case.relevant()
+        if not relevant:
+            continue
+        hits = len(relevant.intersection(titles[:top]))
+        precisions.append(hits / top)
+        recalls.append(hits / len(relevant))
+    distinct = set().union(*recommended) if recommended else set()
+    return {"users": len(cases), "users_with_relevant": len(precisions),
+            f"precision@{top}": sum(precisions) / len(precisions) if precisions else 0.0,
+            f"recall@{top}": sum(recalls) / len(recalls) if recalls else 0.0,
+            "coverage": len(distinct) / catalog_size,
+            "empty_results": sum(not titles for titles in recommended)}
+
+
+def evaluate(csv_file: str, engines: list[str], top: int = DEFAULT_TOP, held_out: int = DEFAULT_HELD_OUT,
+             query_size: int = DEFAULT_QUERY_SIZE, min_ratings: int = DEFAULT_MIN_RATINGS, seed: int = 111,
+             workers: Optional[int] = None, max_users: Optional[int] = None) -> dict:
+    """Evaluate every engine on the same split of csv_file, using workers processes (default: one per core),
+    and return the metrics and throughput of each by name."""
+    workers = (os.cpu_count() or 1) if workers is None else workers
+    training, cases = split_ratings(data_parsing.create_review_network(csv_file), held_out, query_size,
+                                    min_ratings, seed)
+    indices = list(range(len(cases)))
+    if max_users is not None:
+        indices = sorted(random.Random(seed).sample(indices, min(max_users, len(indices))))
+    batches = [indices[start:start + BATCH_SIZE] for start in range(0, len(indices), BATCH_SIZE)]
+
+    results = {}
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_init_worker,
+                             initargs=(csv_file, held_out, query_size, min_ratings, seed)) as executor:
+        list(executor.map(_warm_up, range(workers)))
+        for engine in engines:
+            start = time.perf_counter()
+            futures = [executor.submit(_evaluate_batch, engine, batch, top) for batch in batches]
+            recommended = [titles for future in futures for titles in future.result()]
+            elapsed = time.perf_counter() - start
+            results[engine] = {**score([cases[i] for i in indices], recommended, top, len(training.movies)),
+                               "seconds": elapsed, "queries_per_second": len(indices) / elapsed}
+    return {"workers": workers, "held_out": held_out, "query_size": query_size, "min_ratings": min_ratings,
+            "seed": seed, "engines": results}
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    """Run the evaluation from the command line and print a table of the engines."""
+    parser = argparse.ArgumentParser(description="Leave-k-out evaluation of the recommenders.")
+    parser.add_argument("--csv", default=graph_traversal.DATA_FILE, help="ratings file to evaluate on")
+    parser.add_argument("--engines", nargs="+", choices=sorted(ENGINES), default=sorted(ENGINES),
+                        help="recommenders to evaluate")
+    parser.add_argument("--top", type=int, default=DEFAULT_TOP, help="n of precision@n and recall@n")
+    parser.add_argument("--held-out", type=int, default=DEFAULT_HELD_OUT, help="ratings held out per user")
+    parser.add_argument("--query-size", type=int, default=DEFAULT_QUERY_SIZE,
+                        help="ratings per query (0 for all of the user's remaining ratings)")
+    parser.add_argument("--min-ratings", type=int, default=DEFAULT_MIN_RATINGS,
+                        help="ratings a user needs to be evaluated")
+    parser.add_argument("--users", type=int, default=None, help="evaluate a sample of this many users")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: one per core)")
+    parser.add_argument("--seed", type=int, default=111, help="seed of the split")
+    parser.add_argument("--output", default=None, help="file to write the JSON results to")
+    args = parser.parse_args(argv)
+
+    results = evaluate(args.csv, args.engines, args.top, args.held_out, args.query_size, args.min_ratings,
+                       args.seed, args.workers, args.users)
+    top = args.top
+    print(f"{results['workers']} workers, {args.held_out} held out per user, queries of {args.query_size or 'all'} "
+          f"ratings")
+    print(f"{'engine':<12}{'users':>7}{f'P@{top}':>9}{f'R@{top}':>9}{'coverage':>10}{'empty':>7}{'qps':>9}")
+    for engine, metrics in results["engines"].items():
+        print(f"{engine:<12}{metrics['users_with_relevant']:>7}{metrics[f'precision@{top}']:>9.4f}"
+              f"{metrics[f'recall@{top}']:>9.4f}{metrics['coverage']:>10.1%}{metrics['empty_results']:>7}"
+              f"{metrics['queries_per_second']:>9.1f}")
+    if args.output is not None:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2)
+
+
+# Testing code
+if __name__ == "__main__":
+    python_ta.check_all(config={
+        'extra-imports': ["annotations", "concurrent.futures", "dataclasses", "typing", "argparse", "json",
+                          "multiprocessing", "os", "random", "time", "data_parsing", "graph_traversal",
+                          "movie_classes", "user_similarity"],
+        'allowed-io': ["main"],
+        'disable': ["global-statement"],
+        'max-line-length': 120
+    })
+
+    main()
@@ -0,0 +1,211 @@
+"""
+CSC111 Final Project - Phase 3: UI Design and Implementation - Local Fake Movie Provider
+
+Description
+===============================
+
+This Python module contains a local stand-in for the streaming availability
+API and its poster server, so that the code that fetches movie metadata and
+posters can be exercised end to end without touching the network. Slow
+responses, server errors and titles without results can be simulated.
+
+Copyright and Usage Information
+===============================
+
+This file is provided solely for the TA's and Computer Science Professors
+at the University of Toronto St. George campus. All forms of distribution
+of this code, whether as given or with any changes, are expressly prohibited.
+
+This file is Copyright (c) 2023 Guransh Singh, Nauhar Kapur, Shahbaz Nanda,
+and Raunak Madan.
+"""
+# Importing libraries
+from __future__ import annotations
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+from urllib.parse import parse_qs, quote, unquote, urlparse
+import json
+import random
+import struct
+import threading
+import time
+import zlib
+import python_ta
+
+
+# Program constants
+SEARCH_PATH = "/v2/search/title"
+POSTER_PATH = "/posters/"
+POSTER_SIZE = (40, 66)
+
+
+def make_png(width: int, height: int, color: tuple[int, int, int]) -> bytes:
+    """Return the bytes of a PNG image of the given size filled with a single RGB color."""
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        body = kind + data
+        return struct.pack(">I", len(data)) + body + struct.pack(">I", zlib.crc32(body) & 0xffffffff)
+
+    row = b"\x00" + bytes(color) * width
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return (b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header) + chunk(b"IDAT", zlib.compress(row * height))
+            + chunk(b"IEND", b""))
+
+
+class FakeProvider:
+    """
+    A local HTTP server that answers title searches in the same JSON format as the streaming availability API,
+    and serves a generated poster for every title it knows.
+
+    Poster links are reported with an "https" scheme even though the server only speaks plain HTTP, because
+    ResultScene rewrites every poster link to "http" before downloading it.
+
+    Instance Attributes:
+    - missing_titles: titles for which searches return no results
+    - search_latency: seconds every search waits before it is answered
+    - poster_latency: seconds every poster request waits before it is answered
+    - error_rate: fraction of searches and poster requests answered with a server error
+    - search_count: number of title searches answered so far
+    - poster_count: number of posters served so far
+    - error_count: number of requests answered with a server error so far
+
+    Representation Invariants:
+    - self.search_latency >= 0 and self.poster_latency >= 0
+    - 0 <= self.error_rate <= 1
+    - self.search_count >= 0
+    - self.poster_count >= 0
+    - self.error_count >= 0
+    """
+    missing_titles: set[str]
+    search_latency: float
+    poster_latency: float
+    error_rate: float
+    search_count: int
+    poster_count: int
+    error_count: int
+    _server: Optional[ThreadingHTTPServer]
+    _thread: Optional[threading.Thread]
+    _random: random.Random
+    _lock: threading.Lock
+
+    def __init__(self, missing_titles: Optional[set[str]] = None, search_latency: float = 0.0,
+                 poster_latency: float = 0.0, error_rate: float = 0.0, seed: int = 111) -> None:
+        """Initialize a provider that has not been started yet. Which requests fail depends only on seed and
+        the order requests arrive in."""
+        self.missing_titles = set() if missing_titles is None else missing_titles
+        self.search_latency = search_latency
+        self.poster_latency = poster_latency
+        self.error_rate = error_rate
+        self.search_count = 0
+        self.poster_count = 0
+        self.error_count = 0
+        self._server = None
+        self._thread = None
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> FakeProvider:
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.stop()
+
+    @property
+    def base_url(self) -> str:
+        """Return the URL the running server can be reached at."""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def search_url(self) -> str:
+        """Return the search endpoint to pass to api_parser as api_url."""
+        return self.base_url + SEARCH_PATH
+
+    def start(self) -> None:
+        """Start serving on a free local port in a background thread."""
+        provider = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                """Answer a search or poster request."""
+                provider.handle_request(self)
+
+            def log_message(self, *args: object) -> None:
+                """Keep the server quiet."""
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the server if it is running."""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def search_result(self, title: str) -> dict:
+        """Return the API result entry for the given title."""
+        https_base = "https" + self.base_url[4:]
+        return {
+            "title": title,
+            "streamingInfo": {"us": {"prime": [{"link": f"https://example.com/rent/{quote(title)}"}]}},
+            "youtubeTrailerVideoLink": f"https://example.com/trailer/{quote(title)}",
+            "posterURLs": {"original": f"{https_base}{POSTER_PATH}{quote(title)}.png"},
+            "imdbRating": zlib.crc32(title.encode()) % 50 + 50
+        }
+
+    def _fails(self) -> bool:
+        """Return whether the current request should be answered with a server error, and count it if so."""
+        with self._lock:
+            failed = self._random.random() < self.error_rate
+            self.error_count += failed
+        return failed
+
+    def handle_request(self, handler: BaseHTTPRequestHandler) -> None:
+        """Write the response for the request held by handler, after the configured latency.
+
+        A failed search is answered like the real API answers a rejected key (with no "result" entry)."""
+        parsed = urlparse(handler.path)
+        if parsed.path == SEARCH_PATH:
+            time.sleep(self.search_latency)
+            if self._fails():
+                self.send(handler, 500, "application/json", json.dumps({"message": "Internal error"}).encode())
+                return
+            with self._lock:
+                self.search_count += 1
+            title = parse_qs(parsed.query).get("title", [""])[0]
+            results = [] if title in self.missing_titles else [self.search_result(title)]
+            self.send(handler, 200, "application/json", json.dumps({"result": results}).encode())
+        elif parsed.path.startswith(POSTER_PATH) and parsed.path.endswith(".png"):
+            time.sleep(self.poster_latency)
+            if self._fails():
+                self.send(handler, 500, "text/plain", b"internal error")
+                return
+            with self._lock:
+                self.poster_count += 1
+            title = unquote(parsed.path[len(POSTER_PATH):-4])
+            color = tuple(zlib.crc32(title.encode()).to_bytes(4, "big")[:3])
+            self.send(handler, 200, "image/png", make_png(POSTER_SIZE[0], POSTER_SIZE[1], color))
+        else:
+            self.send(handler, 404, "text/plain", b"not found")
+
+    @staticmethod
+    def send(handler: BaseHTTPRequestHandler, status: int, content_type: str, body: bytes) -> None:
+        """Write a complete HTTP response through handler."""
+        handler.send_response(status)
+        handler.send_header("Content-Type", content_type)
+        handler.send_header("Content-Length", str(len(body)))
+        handler.end_headers()
+        handler.wfile.write(body)
+
+
+# Testing code
+if __name__ == "__main__":
+    python_ta.check_all(config={
+        'extra-imports': ["annotations", "http.server", "typing", "urllib.parse", "json", "random", "struct",
+                          "threading", "time", "zlib"],
+        'allowed-io': [],
+        'max-line-length': 120
+    })
@@ -19,44 +19,154 @@ This file is Copyright (c) 2023 Guransh Singh, Nauhar Kapur, Shahbaz Nanda,
 and Raunak Madan.
 """
 # Importing libraries
+from dataclasses import asdict, dataclass, field
+from typing import TYPE_CHECKING, Callable, Optional
+import time
 import python_ta
 import data_parsing
 import movie_classes
+import tracing
 
+if TYPE_CHECKING:
+    import movie_stats
 
 # Program constants
-REVIEW_NETWORK = data_parsing.create_review_network("CSC111 Final Data.csv")
+DATA_FILE = "CSC111 Final Data.csv"
 MOVIE_THRESHOLD = 4.0
 SCORE_THRESHOLD = 4.0
 GENRE_THRESHOLD = 3.0
 ADJUSTMENT_FACTOR = 0.5
 
 
+# The network searched by run_search, loaded on first use unless set_review_network is called first
+_REVIEW_NETWORK = None
+
+# Called with the QueryStats of every run_search_on_all call, if set (see set_query_observer)
+_QUERY_OBSERVER = None
+
+# Statistics of the searched network used to skip searches that cannot help, if set (see set_movie_stats)
+_MOVIE_STATS = None
+
+
+@dataclass
+class QueryStats:
+    """
+    The work done by one call of run_search_on_all, to find out why some watch histories are slow.
+
+    Instance Attributes:
+    - user_movies: the watch history searched
+    - num_rec: the number of recommendations asked for
+    - raters_scanned: the number of users compared for each input movie (everyone who rated it)
+    - neighbours: the number of closest raters chosen for each input movie
+    - candidates: the number of candidate movies found for each input movie
+    - accumulator_entries: the number of distinct movies scored
+    - phase_seconds: the time spent in each phase of the search, summed over the input movies
+    - total_seconds: the time the whole call took
+    - skipped_search: whether the graph was not searched because it could not find anything (see set_movie_stats)
+
+    Representation Invariants:
+    - self.raters_scanned.keys() == self.neighbours.keys() == self.candidates.keys()
+    - all(seconds >= 0 for seconds in self.phase_seconds.values())
+    """
+    user_movies: dict[str, float]
+    num_rec: int
+    raters_scanned: dict[str, int] = field(default_factory=dict)
+    neighbours: dict[str, int] = field(default_factory=dict)
+    candidates: dict[str, int] = field(default_factory=dict)
+    accumulator_entries: int = 0
+    phase_seconds: dict[str, float] = field(
+        default_factory=lambda: {"neighbours": 0.0, "candidates": 0.0, "accumulate": 0.0, "score": 0.0})
+    total_seconds: float = 0.0
+    skipped_search: bool = False
+
+    def record_search(self, title: str, raters: int, neighbours: int, candidates: int,
+                      phase_seconds: tuple[float, float, float]) -> None:
+        """Record the counters of run_search for title, and add the time of its neighbours, candidates and
+        accumulate phases."""
+        self.raters_scanned[title] = raters
+        self.neighbours[title] = neighbours
+        self.candidates[title] = candidates
+        self.phase_seconds["neighbours"] += phase_seconds[0]
+        self.phase_seconds["candidates"] += phase_seconds[1]
+        self.phase_seconds["accumulate"] += phase_seconds[2]
+
+    def to_json(self) -> dict:
+        """Return the statistics as a JSON-compatible dictionary."""
+        return asdict(self)
+
+    def summary(self) -> str:
+        """Return a one-line description of the query's cost."""
+        phases = ", ".join(f"{phase} {seconds * 1000:.2f}" for phase, seconds in self.phase_seconds.items())
+        return (f"{self.total_seconds * 1000:.1f} ms for {len(self.user_movies)} movies: "
+                f"{sum(self.raters_scanned.values())} raters scanned, {sum(self.neighbours.values())} neighbours, "
+                f"{sum(self.candidates.values())} candidates, {self.accumulator_entries} scored ({phases} ms)")
+
+
+def get_review_network() -> movie_classes.ReviewNetwork:
+    """Return the review network that searches run on, loading it from DATA_FILE if it has not been set."""
+    global _REVIEW_NETWORK
+    if _REVIEW_NETWORK is None:
+        _REVIEW_NETWORK = data_parsing.load_review_network(DATA_FILE)
+    return _REVIEW_NETWORK
+
+
+def set_review_network(review_network: movie_classes.ReviewNetwork) -> None:
+    """Make searches run on the given review network (e.g. one loaded in the background)."""
+    global _REVIEW_NETWORK
+    _REVIEW_NETWORK = review_network
+
+
+def set_query_observer(observer: Optional[Callable[[QueryStats], None]]) -> None:
+    """Make every call of run_search_on_all collect its QueryStats and pass them to observer, or stop doing so
+    if observer is None. The observer may be called from several threads at once."""
+    global _QUERY_OBSERVER
+    _QUERY_OBSERVER = observer
+
+
+def set_movie_stats(stats: Optional["movie_stats.MovieStats"]) -> None:
+    """Make run_search_on_all use stats, the movie statistics of the network it searches, or stop doing so if
+    stats is None.
+
+    Watch histories the search cannot find anything for are then answered with stats.cold_start without
+    searching, and results shorter than asked for are topped up from it. Searches on any other network are
+    unaffected."""
+    global _MOVIE_STATS
+    _MOVIE_STATS = stats
+
+
 # Helper function to run a search on a singular rating
-def run_search(title: str, rating: float, accumulator: dict[movie_classes.Movie, list]) -> None:
-    """Run a search for good movie recommendations for this review."""
+def run_search(title: str, rating: float, accumulator: dict[movie_classes.Movie, list],
+               review_network: Optional[movie_classes.ReviewNetwork] = None,
+               stats: Optional[QueryStats] = None) -> None:
+    """Run a search for good movie recommendations for this review, on review_network if it is given and on
+    get_review_network() otherwise. The work done is recorded in stats if it is given."""
     # Finding 10 closest people
-    movie = REVIEW_NETWORK.movies[title]
+    start = time.perf_counter()
+    if review_network is None:
+        review_network = get_review_network()
+    movie = review_network.movies[title]
     user_and_diff = []
     for user in movie.users_rated_by:
         user_rating = user.movies_rated[movie].rating
         user_and_diff.append((user, abs(user_rating - rating)))
     user_and_diff.sort(key=lambda x: x[1])
     top_10_user_ids = [q[0].user_id for q in user_and_diff[:10]]
+    neighbours_found = time.perf_counter()
 
     # Finding all possible movies
     possible_movies = set()
     for user_id in top_10_user_ids:
-        user = REVIEW_NETWORK.users[user_id]
+        user = review_network.users[user_id]
         possible_recs = [w for w in user.movies_rated if user.movies_rated[w].rating >= MOVIE_THRESHOLD]
         possible_movies = possible_movies.union(set(possible_recs))
 
     if movie in possible_movies:
         possible_movies.remove(movie)
+    candidates_found = time.perf_counter()
 
     # Updating accumulator table
     for user_id in top_10_user_ids:
-        user = REVIEW_NETWORK.users[user_id]
+        user = review_network.users[user_id]
         for i in user.movies_rated:
             if i == movie or i not in possible_movies:
                 continue
@@ -71,18 +181,55 @@ def run_search(title: str, rating: float, accumulator: dict[movie_classes.Movie,
                 genre_score = 1 - genre_score if rating < GENRE_THRESHOLD else genre_score
                 accumulator[i] = [1, genre_score, user.movies_rated[i].rating]
 
+    if stats is not None:
+        stats.record_search(title, len(user_and_diff), len(top_10_user_ids), len(possible_movies),
+                            (neighbours_found - start, candidates_found - neighbours_found,
+                             time.perf_counter() - candidates_found))
+
 
 # Helper function to run search on all the user's watch history
-def run_search_on_all(user_movies: dict[str, float], num_rec: int = 10) -> list[tuple[movie_classes.Movie, float]]:
-    """Return the best num_rec recommendations for the user, given their watch history."""
+def run_search_on_all(user_movies: dict[str, float], num_rec: int = 10,
+                      review_network: Optional[movie_classes.ReviewNetwork] = None,
+                      stats: Optional[QueryStats] = None) \
+        -> list[tuple[movie_classes.Movie, float]]:
+    """Return the best num_rec recommendations for the user, given their watch history.
+
+    The search runs on review_network if it is given, and on get_review_network() otherwise. Its counters are
+    recorded in stats if it is given; they are also collected and passed to the query observer if one is set."""
+    start = time.perf_counter()
+    observer = _QUERY_OBSERVER
+    if stats is None and observer is not None:
+        stats = QueryStats(dict(user_movies), num_rec)
+
+    # Using the movie statistics only if they describe the network searched
+    network_stats = _MOVIE_STATS
+    if network_stats is not None and network_stats.network is not (
+            get_review_network() if review_network is None else review_network):
+        network_stats = None
+
+    # Answering from the genre lists if the search cannot find anything
+    if network_stats is not None and not network_stats.can_help(user_movies):
+        with tracing.span("cold_start", movies=len(user_movies), num_rec=num_rec):
+            results = network_stats.cold_start(user_movies, num_rec)
+        if stats is not None:
+            stats.skipped_search = True
+            stats.total_seconds = time.perf_counter() - start
+            if observer is not None:
+                observer(stats)
+        return results
+
     # Defining accumulator to store search results
     accumulator = {}
 
     # Running search on all recommendations
-    for movie_title in user_movies:
-        run_search(movie_title, user_movies[movie_title], accumulator)
+    with tracing.span("run_search_on_all", movies=len(user_movies), num_rec=num_rec) as span:
+        for movie_title in user_movies:
+            with tracing.span("run_search", title=movie_title):
+                run_search(movie_title, user_movies[movie_title], accumulator, review_network, stats)
+        span.set("candidates", len(accumulator))
 
     # Computing final scores
+    scoring_start = time.perf_counter()
     final_scores = []
     for i in accumulator:
         frequency = accumulator[i][0]
@@ -93,16 +240,32 @@ def run_search_on_all(user_movies: dict[str, float], num_rec: int = 10) -> list[
         final_score = new_avg_score * genre_score
         final_scores.append((i, final_score))
 
-    # Sorting list and returning top num_rec recommendations
+    # Sorting list and returning top num_rec recommendations, topped up from the genre lists if there are fewer.
+    # The genre lists are scored by Bayesian average, which is not on the scale of the search scores, so the
+    # extra movies are scored no higher than the lowest search score to keep the list in order
     final_scores.sort(key=lambda x: x[1], reverse=True)
+    if network_stats is not None and len(final_scores) < num_rec:
+        lowest = final_scores[-1][1] if final_scores else float("inf")
+        final_scores.extend((movie, min(score, lowest)) for movie, score in network_stats.cold_start(
+            user_movies, num_rec - len(final_scores), {movie.title for movie, _ in final_scores}))
+
+    if stats is not None:
+        end = time.perf_counter()
+        stats.accumulator_entries = len(accumulator)
+        stats.phase_seconds["score"] += end - scoring_start
+        stats.total_seconds = end - start
+        if observer is not None:
+            observer(stats)
     return final_scores[:num_rec]
 
 
 # Testing code
 if __name__ == "__main__":
     python_ta.check_all(config={
-        'extra-imports': ["data_parsing", "movie_classes"],
+        'extra-imports': ["dataclasses", "typing", "time", "data_parsing", "movie_classes", "movie_stats",
+                          "tracing"],
         'allowed-io': [],
+        'disable': ["global-statement"],
         'max-line-length': 120
     })
 
@@ -0,0 +1,192 @@
+"""
+CSC111 Final Project - Phase 2: Data Parsing - Recommendation Service Load Generator
+
+Description
+===============================
+
+This Python module sends recommendation requests to the recommendation
+service from many threads at once and reports throughput and client-side
+latency percentiles. Without --url, it starts its own service in a
+separate process and also reports how long that took to come up.
+
+    python -c "import sys, load_generator; load_generator.main(sys.argv[1:])" --requests 2000 --concurrency 16
+    python -c "import sys, load_generator; load_generator.main(sys.argv[1:])" --url http://127.0.0.1:8111
+
+Copyright and Usage Information
+===============================
+
+This file is provided solely for the TA's and Computer Science Professors
+at the University of Toronto St. George campus. All forms of distribution
+of this code, whether as given or with any changes, are expressly prohibited.
+
+This file is Copyright (c) 2023 Guransh Singh, Nauhar Kapur, Shahbaz Nanda,
+and Raunak Madan.
+"""
+# Importing libraries
+from __future__ import annotations
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Optional
+from urllib.error import HTTPError, URLError
+from urllib.request import Request, urlopen
+import argparse
+import json
+import random
+import subprocess
+import sys
+import threading
+import time
+import python_ta
+import benchmark_graph_traversal
+
+
+# Program constants
+REQUEST_TIMEOUT = 30
+STARTUP_TIMEOUT = 120
+
+
+@dataclass
+class LoadReport:
+    """
+    Results of a load run.
+
+    Instance Attributes:
+    - latencies: seconds taken by every successful request
+    - statuses: number of responses with each HTTP status (0 for connection errors)
+    - elapsed: wall-clock seconds taken by the run
+    - startup_seconds: seconds the spawned service took to answer its first request, if one was spawned
+    """
+    latencies: list[float] = field(default_factory=list)
+    statuses: dict[int, int] = field(default_factory=dict)
+    elapsed: float = 0.0
+    startup_seconds: Optional[float] = None
+
+    def summary(self) -> dict[str, float]:
+        """Return the throughput and latency percentiles of the run."""
+        ordered = sorted(self.latencies)
+        result = {"requests": sum(self.statuses.values()), "ok": len(ordered),
+                  "throughput_rps": len(ordered) / self.elapsed if self.elapsed else 0.0}
+        for name, fraction in [("p50_ms", 0.5), ("p95_ms", 0.95), ("p99_ms", 0.99)]:
+            result[name] = benchmark_graph_traversal.percentile(ordered, fraction) * 1000 if ordered else 0.0
+        result["max_ms"] = ordered[-1] * 1000 if ordered else 0.0
+        if self.startup_seconds is not None:
+            result["startup_s"] = self.startup_seconds
+        return result
+
+
+def get_json(url: str) -> dict:
+    """Return the decoded JSON body of a GET request to url."""
+    with urlopen(url, timeout=REQUEST_TIMEOUT) as response:
+        return json.loads(response.read())
+
+
+def make_requests(titles: list[str], n: int, max_ratings: int = 5, seed: int = 111) -> list[dict]:
+    """Return n /recommend request bodies, each rating between one and max_ratings of titles at random."""
+    rng = random.Random(seed)
+    return [{"ratings": {title: rng.choice([1.0, 2.5, 3.5, 4.0, 4.5, 5.0])
+                         for title in rng.sample(titles, rng.randint(1, min(max_ratings, len(titles))))},
+             "num_rec": 10}
+            for _ in range(n)]
+
+
+def run_load(url: str, bodies: list[dict], concurrency: int) -> LoadReport:
+    """Send every request in bodies to the service at url, concurrency at a time, and return the results."""
+    report = LoadReport()
+    lock = threading.Lock()
+
+    def send(body: dict) -> None:
+        request = Request(url + "/recommend", data=json.dumps(body).encode(),
+                          headers={"Content-Type": "application/json"})
+        start = time.perf_counter()
+        try:
+            with urlopen(request, timeout=REQUEST_TIMEOUT) as response:
+                response.read()
+                status = response.status
+        except HTTPError as error:
+            status = error.code
+        except (URLError, OSError):
+            status = 0
+        elapsed = time.perf_counter() - start
+        with lock:
+            report.statuses[status] = report.statuses.get(status, 0) + 1
+            if status == 200:
+                report.latencies.append(elapsed)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(send, bodies))
+    report.elapsed = time.perf_counter() - start
+    return report
+
+
+def spawn_service(server_args: list[str]) -> tuple[subprocess.Popen, str, float]:
+    """Start the recommendation service in a new process on a free port.
+
+    Return the process, its URL and the seconds until it answered /health."""
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-c", "import sys, recommend_server; recommend_server.main(sys.argv[1:])",
+         "--port", "0"] + server_args, stdout=subprocess.PIPE, text=True)
+    line = process.stdout.readline()
+    if " on http://" not in line:
+        process.kill()
+        raise RuntimeError(f"recommendation service failed to start: {line!r}")
+    url = line.split(" on ")[1].split()[0]
+
+    deadline = time.monotonic() + STARTUP_TIMEOUT
+    while True:
+        try:
+            get_json(url + "/health")
+            break
+        except (URLError, OSError):
+            if time.monotonic() > deadline:
+                process.kill()
+                raise
+            time.sleep(0.05)
+    return process, url, time.perf_counter() - start
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    """Run the load generator from the command line and print its results."""
+    parser = argparse.ArgumentParser(description="Measure recommendation service throughput and latency.")
+    parser.add_argument("--url", default=None, help="service to load (default: spawn one)")
+    parser.add_argument("--requests", type=int, default=1000, help="number of requests to send")
+    parser.add_argument("--concurrency", type=int, default=16, help="requests in flight at once")
+    parser.add_argument("--workers", type=int, default=4, help="workers of the spawned service")
+    parser.add_argument("--max-queue", type=int, default=64, help="queue limit of the spawned service")
+    args = parser.parse_args(argv)
+
+    process = None
+    url = args.url
+    startup_seconds = None
+    if url is None:
+        process, url, startup_seconds = spawn_service(["--workers", str(args.workers),
+                                                        "--max-queue", str(args.max_queue)])
+    try:
+        titles = get_json(url + "/titles")["titles"]
+        report = run_load(url, make_requests(titles, args.requests), args.concurrency)
+        report.startup_seconds = startup_seconds
+        stats = get_json(url + "/stats")
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+    print("Client: " + ", ".join(f"{key} {value:.2f}" for key, value in report.summary().items()))
+    print(f"Statuses: {dict(sorted(report.statuses.items()))}")
+    print(f"Server: completed {stats['completed']}, rejected {stats['rejected']}, invalid {stats['invalid']}, "
+          f"service p50 <= {stats['service_time']['p50_ms']} ms, p99 <= {stats['service_time']['p99_ms']} ms, "
+          f"queue wait p99 <= {stats['queue_wait']['p99_ms']} ms")
+
+
+# Testing code
+if __name__ == "__main__":
+    python_ta.check_all(config={
+        'extra-imports': ["annotations", "concurrent.futures", "dataclasses", "typing", "urllib.error",
+                          "urllib.request", "argparse", "json", "random", "subprocess", "sys", "threading",
+                          "time", "benchmark_graph_traversal"],
+        'allowed-io': ["main"],
+        'max-line-length': 120
+    })
+
+    main()
@@ -28,16 +28,29 @@ import tkinter as tk
 import python_ta
 import pygame
 from result_scene import ResultScene
-import data_parsing
 import graph_traversal
-
-# Getting the screen resolution
-ROOT = tk.Tk()
-SCREEN_WIDTH = ROOT.winfo_screenwidth() - 100
-SCREEN_HEIGHT = ROOT.winfo_screenheight() - 150
+import movie_stats
+import network_loader
+import speculative_prefetch
+import text_cache
+import title_index
+import tracing
+
+# Timing every phase of start-up from here on
+STARTUP_TIMER = network_loader.PhaseTimer()
+
+# Getting the screen resolution (falling back to a fixed size when there is no display, e.g. in benchmarks)
+try:
+    ROOT = tk.Tk()
+    SCREEN_WIDTH = ROOT.winfo_screenwidth() - 100
+    SCREEN_HEIGHT = ROOT.winfo_screenheight() - 150
+except tk.TclError:
+    SCREEN_WIDTH, SCREEN_HEIGHT = 1500, 850
+STARTUP_TIMER.mark("screen size found")
 
 # Initializing pygame
 DIMENSIONS = pygame.init()
+STARTUP_TIMER.mark("pygame initialized")
 
 # Defining ratio sizes
 ASPECT_RATIO = 1.5
@@ -50,12 +63,51 @@ GOLDEN = pygame.Color('darkgoldenrod')
 RED = pygame.Color('crimson')
 WHITE = pygame.Color('ghostwhite')
 
-# Getting network from data_parsing
-REVIEW_NETWORK = data_parsing.create_review_network('CSC111 Final Data.csv')
+# Defining font sizes
+BASE_FONT_SIZE = int(SCREEN_WIDTH * 0.017)
+TITLE_FONT_SIZE = int(SCREEN_WIDTH * 0.025)
+SIDEBAR_FONT_SIZE = int(SCREEN_WIDTH * 0.02)
+DROPDOWN_FONT_SIZE = 20
+
+# Number of title suggestions shown under the focused text box
+NUM_SUGGESTIONS = 3
+
+# Folder holding the "Today's Hit Flicks" poster images
+POSTER_DIR = 'Posters'
+
+# Mapping the "Today's Hit Flicks" titles to their IMDb pages
+HIT_FLICKS = {
+    "12 Angry Men": r"https://www.imdb.com/title/tt0050083/?pf_rd_m=A2FGELUUNOQJNL&pf_rd_p=1a264172"
+                    r"-ae11-42e4-8ef7-7fed1973bb8f&pf_rd_r=AY29H1PCPTHZXTRCGVQV&pf_rd_s=center-1"
+                    r"&pf_rd_t=15506&pf_rd_i=top&ref_=chttp_tt_5",
+    "The Dark Knight": r"https://www.imdb.com/title/tt0468569/?pf_rd_m=A2FGELUUNOQJNL&pf_rd_p=1a264172"
+                       r"-ae11-42e4-8ef7-7fed1973bb8f&pf_rd_r=AY29H1PCPTHZXTRCGVQV&pf_rd_s=center-1"
+                       r"&pf_rd_t=15506&pf_rd_i=top&ref_=chttp_tt_3",
+    "The Godfather": r"https://www.imdb.com/title/tt0068646/?pf_rd_m=A2FGELUUNOQJNL&pf_rd_p=1a264172"
+                     r"-ae11-42e4-8ef7-7fed1973bb8f&pf_rd_r=AY29H1PCPTHZXTRCGVQV&pf_rd_s=center-1"
+                     r"&pf_rd_t=15506&pf_rd_i=top&ref_=chttp_tt_2",
+    "The Shawshank Redemption": r"https://www.imdb.com/title/tt0111161/?pf_rd_m=A2FGELUUNOQJNL&pf_rd_p"
+                                r"=1a264172-ae11-42e4-8ef7-7fed1973bb8f&pf_rd_r=AY29H1PCPTHZXTRCGVQV"
+                                r"&pf_rd_s=center-1&pf_rd_t=15506&pf_rd_i=top&ref_=chttp_tt_1",
+    "Schindler's List": r"https://www.imdb.com/title/tt0108052/?pf_rd_m=A2FGELUUNOQJNL&pf_rd_p=1a264172"
+                        r"-ae11-42e4-8ef7-7fed1973bb8f&pf_rd_r=4GCPMC1MJNZQEQHH50KH&pf_rd_s=center-1"
+                        r"&pf_rd_t=15506&pf_rd_i=top&ref_=chttp_tt_6",
+    "The Godfather Part 2": r"https://www.imdb.com/title/tt0071562/?pf_rd_m=A2FGELUUNOQJNL&pf_rd_p"
+                            r"=1a264172-ae11-42e4-8ef7-7fed1973bb8f&pf_rd_r=4GCPMC1MJNZQEQHH50KH"
+                            r"&pf_rd_s=center-1&pf_rd_t=15506&pf_rd_i=top&ref_=chttp_tt_4",
+    "Pulp Fiction": r"https://www.imdb.com/title/tt0110912/?pf_rd_m=A2FGELUUNOQJNL&pf_rd_p=1a264172"
+                    r"-ae11-42e4-8ef7-7fed1973bb8f&pf_rd_r=4GCPMC1MJNZQEQHH50KH&pf_rd_s=center-1"
+                    r"&pf_rd_t=15506&pf_rd_i=top&ref_=chttp_tt_8",
+    "The Bourne Supremacy": r"https://www.imdb.com/title/tt0372183/?ref_=nv_sr_srsg_0",
+    "Mission Impossible": r"https://www.imdb.com/title/tt0117060/?ref_=nv_sr_srsg_0",
+    "Titanic": r"https://www.imdb.com/title/tt0120338/?ref_=nv_sr_srsg_0"}
 
 # Starting pygame clock
 CLOCK = pygame.time.Clock()
 
+# Longest time (in milliseconds) an idle scene sleeps waiting for events
+IDLE_WAIT_MS = 1000
+
 
 class DropDown:
     """
@@ -75,7 +127,6 @@ class DropDown:
     Representation Invariants:
     - len(self.color_menu) >= 2
     - len(self.color_option) >= 2
-    - len(self.options) > 0
     - self.main != ''
     - self.active_option < len(self.options)
     """
@@ -119,7 +170,7 @@ class DropDown:
 
         # display the main title/label of the drop-down menu on surf
         pygame.draw.rect(surf, self.color_menu[self.menu_active], self.rect, 0)
-        msg = self.font.render(self.main, True, WHITE)
+        msg = text_cache.TEXT_CACHE.render(self.font, self.main, WHITE)
         surf.blit(msg, msg.get_rect(center=self.rect.center))
 
         # display the expanded drop-down menu on surf if self.draw_menu is True
@@ -128,17 +179,25 @@ class DropDown:
                 rect = self.rect.copy()
                 rect.y += (i + 1) * self.rect.height
                 pygame.draw.rect(surf, self.color_option[1 if i == self.active_option else 0], rect, 0)
-                msg = self.font.render(text, True, WHITE)
+                msg = text_cache.TEXT_CACHE.render(self.font, text, WHITE)
                 surf.blit(msg, msg.get_rect(center=rect.center))
 
+    def full_rect(self) -> pygame.Rect:
+        """Return the screen region covered by the drop-down menu when it is expanded."""
+        return pygame.Rect(self.rect.x, self.rect.y, self.rect.w, self.rect.h * (len(self.options) + 1))
+
     def update(self, event_list: list[pygame.event.Event], scene: MenuScene) -> int:
         """
         Keep track of user interactions and handle all events in event_list relating to the drop-down menu.
         Update the drop-down menu's attributes and/or the attributes of scene as necessary.
         """
 
-        # get the user's mouse position and determine if it collides with the drop-down menu
+        # get the user's mouse position (from the latest mouse event, which the clicks below refer to) and
+        # determine if it collides with the drop-down menu
         mpos = pygame.mouse.get_pos()
+        for event in event_list:
+            if event.type in (pygame.MOUSEMOTION, pygame.MOUSEBUTTONDOWN):
+                mpos = event.pos
         self.menu_active = self.rect.collidepoint(mpos)
 
         # checking if the user's mouse collides with any of the option boxes of the drop-down menu
@@ -198,14 +257,24 @@ class MenuScene:
     - screen_h: height of the Pygame Surface represented by the screen attribute.
     - dropdown: DropDown menu for displaying possible movies to choose from if the user cannot think of any movies
                 to rate.
-    - movies: set of all known movies in the movie review network. Used to check the validity of the user's input
+    - movies: set of all known movies in the movie review network. Used to check the validity of the user's input.
+              Empty until the review network has loaded.
+    - loader: the NetworkLoader loading the review network in the background
+    - network_ready: whether the review network has loaded, which is required before the user can press 'GO'
+    - load_error: the error raised while loading the review network, if loading failed
+    - posters_loaded: whether the featured movie posters have replaced their placeholders
+    - title_index: index used to suggest movie titles as the user types, once the review network has loaded
     - submit_permitted: bool representing whether the user can proceed to the result scene with movie
             recommendations.
     - user_submissions: dictionary mapping user's movie title input to corresponding movie rating input
+    - title_widths: dictionary mapping every movie title in the review network to its width in the drop-down font
+    - input_panel_rect: screen region holding the text boxes, rating boxes, warnings and 'GO' button
+    - dirty_rects: screen regions changed by draw that have not been pushed to the display yet
+    - speculator: background worker that computes and prefetches recommendations while the user is typing
 
     Representation Invariants:
     - not(self.textbox_index is not None and self.ratingbox_index is not None)
-    - len(self.movies) > 0
+    - self.network_ready == (len(self.movies) > 0)
     - len(self.user_texts) == len(self.user_text_rects)
     - len(self.rating_texts) == len(self.rating_rects)
     - len(self.user_texts) == len(self.rating_texts)
@@ -226,13 +295,24 @@ class MenuScene:
     screen_h: int | float
     dropdown: DropDown
     movies: set[str]
+    loader: network_loader.NetworkLoader
+    network_ready: bool
+    load_error: Optional[BaseException]
+    posters_loaded: bool
+    title_index: Optional[title_index.TitleIndex]
     submit_permitted: Optional[bool]
     user_submissions: dict[str, float]
+    title_widths: dict[str, int]
+    speculator: speculative_prefetch.SpeculativePrefetcher
+    input_panel_rect: pygame.Rect
+    dirty_rects: list[pygame.Rect]
+    _drawn_state: Optional[tuple[tuple, tuple]]
 
-    def __init__(self, movie_set: set[str]) -> None:
+    def __init__(self, review_loader: network_loader.NetworkLoader) -> None:
         """
-        Initialize a new MenuScene with default attributes and with movie_set as a set of all known movies in the review
-        network.
+        Initialize a new MenuScene with default attributes. The set of known movies and the drop-down menu are
+        filled in once review_loader has finished loading the review network, and the featured posters are loaded
+        after the first frame, so the window can be shown straight away.
         """
         # initializing instance attributes
         self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
@@ -241,32 +321,14 @@ class MenuScene:
         self.active = False
         self.textbox_index = None
         self.ratingbox_index = None
-        self.movies = movie_set
-        self.posters_dict = {
-            "12 Angry Men": r"https://www.imdb.com/title/tt0050083/?pf_rd_m=A2FGELUUNOQJNL&pf_rd_p=1a264172"
-                            r"-ae11-42e4-8ef7-7fed1973bb8f&pf_rd_r=AY29H1PCPTHZXTRCGVQV&pf_rd_s=center-1"
-                            r"&pf_rd_t=15506&pf_rd_i=top&ref_=chttp_tt_5",
-            "The Dark Knight": r"https://www.imdb.com/title/tt0468569/?pf_rd_m=A2FGELUUNOQJNL&pf_rd_p=1a264172"
-                               r"-ae11-42e4-8ef7-7fed1973bb8f&pf_rd_r=AY29H1PCPTHZXTRCGVQV&pf_rd_s=center-1"
-                               r"&pf_rd_t=15506&pf_rd_i=top&ref_=chttp_tt_3",
-            "The Godfather": r"https://www.imdb.com/title/tt0068646/?pf_rd_m=A2FGELUUNOQJNL&pf_rd_p=1a264172"
-                             r"-ae11-42e4-8ef7-7fed1973bb8f&pf_rd_r=AY29H1PCPTHZXTRCGVQV&pf_rd_s=center-1"
-                             r"&pf_rd_t=15506&pf_rd_i=top&ref_=chttp_tt_2",
-            "The Shawshank Redemption": r"https://www.imdb.com/title/tt0111161/?pf_rd_m=A2FGELUUNOQJNL&pf_rd_p"
-                                        r"=1a264172-ae11-42e4-8ef7-7fed1973bb8f&pf_rd_r=AY29H1PCPTHZXTRCGVQV"
-                                        r"&pf_rd_s=center-1&pf_rd_t=15506&pf_rd_i=top&ref_=chttp_tt_1",
-            "Schindler's List": r"https://www.imdb.com/title/tt0108052/?pf_rd_m=A2FGELUUNOQJNL&pf_rd_p=1a264172"
-                                r"-ae11-42e4-8ef7-7fed1973bb8f&pf_rd_r=4GCPMC1MJNZQEQHH50KH&pf_rd_s=center-1"
-                                r"&pf_rd_t=15506&pf_rd_i=top&ref_=chttp_tt_6",
-            "The Godfather Part 2": r"https://www.imdb.com/title/tt0071562/?pf_rd_m=A2FGELUUNOQJNL&pf_rd_p"
-                                    r"=1a264172-ae11-42e4-8ef7-7fed1973bb8f&pf_rd_r=4GCPMC1MJNZQEQHH50KH"
-                                    r"&pf_rd_s=center-1&pf_rd_t=15506&pf_rd_i=top&ref_=chttp_tt_4",
-            "Pulp Fiction": r"https://www.imdb.com/title/tt0110912/?pf_rd_m=A2FGELUUNOQJNL&pf_rd_p=1a264172"
-                            r"-ae11-42e4-8ef7-7fed1973bb8f&pf_rd_r=4GCPMC1MJNZQEQHH50KH&pf_rd_s=center-1"
-                            r"&pf_rd_t=15506&pf_rd_i=top&ref_=chttp_tt_8",
-            "The Bourne Supremacy": r"https://www.imdb.com/title/tt0372183/?ref_=nv_sr_srsg_0",
-            "Mission Impossible": r"https://www.imdb.com/title/tt0117060/?ref_=nv_sr_srsg_0",
-            "Titanic": r"https://www.imdb.com/title/tt0120338/?ref_=nv_sr_srsg_0"}
+        self.movies = set()
+        self.loader = review_loader
+        self.network_ready = False
+        self.load_error = None
+        self.posters_loaded = False
+        self.title_index = None
+        self._suggestion_cache = (None, '', [])
+        self.posters_dict = dict(HIT_FLICKS)
 
         self.chosen_posters = []
         self.user_text_rects = []
@@ -297,33 +359,122 @@ class MenuScene:
         self.user_texts = [''] * len(self.user_text_rects)
         self.rating_texts = [''] * len(self.rating_rects)
 
-        # choosing random movie posters to be featured on the current MenuScene
+        # choosing random movie posters to be featured on the current MenuScene (shown as blank until loaded)
         for _ in range(4):
             random_title = random.choice(list(self.posters_dict.keys()))
-            random_image = pygame.transform.scale(pygame.image.load(f'Posters/{random_title}.png'), DEFAULT_IMAGE_SIZE)
-            self.chosen_posters.append((random_title, (random_image, self.posters_dict[random_title])))
+            placeholder_image = pygame.Surface(DEFAULT_IMAGE_SIZE)
+            placeholder_image.fill((40, 40, 40))
+            self.chosen_posters.append((random_title, (placeholder_image, self.posters_dict[random_title])))
             self.posters_dict.pop(random_title)
 
-        good_size_movies = []
-
-        # collecting potential movies from the review network to add to the scene's drop down menu
-        for movie in REVIEW_NETWORK.movies:
-            text_width = pygame.font.SysFont('trebuchetms', 20).size(movie)[0]
-            if text_width <= 400:
-                good_size_movies.append(movie)
-
-        # creating a dropdown menu with random movie selection options from good_size_movies
+        # creating a dropdown menu, whose movie selection options are added once the review network is loaded
+        self.title_widths = {}
         self.dropdown = DropDown(
             [BLUE, GOLDEN],
             [SCREEN_WIDTH * 0.35, 3, SCREEN_WIDTH * 0.35, SCREEN_HEIGHT * 0.07],
-            pygame.font.SysFont('trebuchetms', 20),
-            ["Some Movie Selections"] + random.choices(good_size_movies, k=10))
+            text_cache.get_font(DROPDOWN_FONT_SIZE),
+            ["Some Movie Selections"])
 
         # initializing more instance attributes
         self.submit_permitted = None
         self.user_submissions = {}
+        self.speculator = speculative_prefetch.SpeculativePrefetcher()
+        self.input_panel_rect = pygame.Rect(0, SCREEN_HEIGHT * 0.077, SCREEN_WIDTH * 0.7, SCREEN_HEIGHT * 0.923)
+        self.dirty_rects = []
+        self._drawn_state = None
         pygame.key.set_repeat(300, 100)
 
+    def _mark(self, phase: str) -> None:
+        """
+        Record that the given start-up phase has finished, if the loader has a timer.
+        """
+        if self.loader.timer is not None:
+            self.loader.timer.mark(phase)
+
+    def check_network(self) -> None:
+        """
+        Fill in the known movies and the drop-down menu options if the review network has just finished loading,
+        or record the error if loading failed.
+        """
+        if self.network_ready or self.load_error is not None or not self.loader.is_done():
+            return
+        if self.loader.error is not None:
+            self.load_error = self.loader.error
+            return
+        review_network = self.loader.wait()
+        graph_traversal.set_review_network(review_network)
+        graph_traversal.set_movie_stats(self.loader.movie_stats)
+        self.movies = review_network.get_movie_titles()
+        self.title_index = self.loader.title_index
+
+        # measuring every movie title once, and offering popular movies that fit in the scene's drop down menu
+        self.title_widths = text_cache.measure_titles(review_network.movies, self.dropdown.font)
+        popular_movies = [title for title, _ in self.loader.movie_stats.popular(movie_stats.LIST_LENGTH)
+                          if self.title_widths[title] <= 400]
+        if len(popular_movies) >= 10:
+            self.dropdown.options = random.sample(popular_movies, k=10)
+        else:
+            good_size_movies = [movie for movie in self.title_widths if self.title_widths[movie] <= 400]
+            self.dropdown.options = random.choices(good_size_movies, k=10)
+        self.network_ready = True
+        self._mark("drop-down menu ready")
+
+    def load_posters(self) -> None:
+        """
+        Replace the placeholder images of the featured movies with their posters.
+        """
+        for j, (title, (_, link)) in enumerate(self.chosen_posters):
+            image = pygame.transform.scale(pygame.image.load(f'{POSTER_DIR}/{title}.png'), DEFAULT_IMAGE_SIZE)
+            self.chosen_posters[j] = (title, (image.convert(), link))
+        self.posters_loaded = True
+        self._mark("featured posters loaded")
+
+    def current_suggestions(self) -> list[str]:
+        """
+        Return the movie titles suggested for the text in the focused movie title text box, best first.
+
+        There are no suggestions if no text box is focused, if it is empty, or if it already holds a known movie.
+        """
+        if self.textbox_index is None or self.title_index is None:
+            return []
+        text = self.user_texts[self.textbox_index]
+        if text == '' or text in self.movies:
+            return []
+        if self._suggestion_cache[:2] != (self.textbox_index, text):
+            self._suggestion_cache = (self.textbox_index, text, self.title_index.suggest(text, NUM_SUGGESTIONS))
+        return self._suggestion_cache[2]
+
+    def suggestion_rects(self) -> list[pygame.Rect]:
+        """
+        Return the rectangles that the current suggestions are drawn in, below the focused text box.
+        """
+        suggestions = self.current_suggestions()
+        if not suggestions:
+            return []
+        text_rect = self.user_text_rects[self.textbox_index]
+        height = SCREEN_HEIGHT * 0.04
+        return [pygame.Rect(text_rect.x, text_rect.bottom + j * height, SCREEN_WIDTH * 0.44, height)
+                for j in range(len(suggestions))]
+
+    def accept_suggestion(self, suggestion_index: int) -> None:
+        """
+        Fill the focused text box with the suggestion at suggestion_index and move on to its rating box.
+        """
+        suggestions = self.current_suggestions()
+        if suggestion_index < len(suggestions):
+            self.user_texts[self.textbox_index] = suggestions[suggestion_index]
+            self.textbox_index, self.ratingbox_index = None, self.textbox_index
+
+    def current_submissions(self) -> dict[str, float]:
+        """
+        Return a dictionary mapping each valid movie title currently entered to its rating.
+        """
+        submissions = {}
+        for j in range(len(self.user_texts)):
+            if self.user_texts[j] in self.movies and is_valid_rating(self.rating_texts[j]):
+                submissions[self.user_texts[j]] = float(self.rating_texts[j])
+        return submissions
+
     def _event_action(self, event: pygame.event.Event) -> None:
         """
         Helper method for MenuScene.handle_event.
@@ -346,6 +497,10 @@ class MenuScene:
                         len(self.rating_texts[self.ratingbox_index]) < 3:
                     self.rating_texts[self.ratingbox_index] += event.unicode
 
+            # accepting the best title suggestion if the tab key was pressed
+            elif self.textbox_index is not None and event.key == pygame.K_TAB:
+                self.accept_suggestion(0)
+
             # adding text to the movie title text boxes
             elif self.textbox_index is not None and event.key != pygame.K_RETURN:
                 self.user_texts[self.textbox_index] += event.unicode
@@ -359,19 +514,25 @@ class MenuScene:
                     if self.ratingbox_index < 4:
                         self.ratingbox_index, self.textbox_index = None, self.ratingbox_index + 1
 
-    def handle_event(self) -> None:
+    def handle_event(self, event_list: Optional[list[pygame.event.Event]] = None) -> None:
         """
         Check for user interaction with the current MenuScene, and update the current MenuScene attributes to
         keep track of the user's interactions.
+
+        If event_list is not given, the events are taken from the pygame event queue.
         """
 
         # getting a list of user events/interactions with the current MenuScene
-        event_list = pygame.event.get()
+        if event_list is None:
+            event_list = pygame.event.get()
 
         poster_coord_width = SCREEN_WIDTH * 0.8
         poster_coord_height = SCREEN_HEIGHT * 0.13
         poster_gap = SCREEN_HEIGHT * 0.215
 
+        # picking up the review network if it has finished loading in the background
+        self.check_network()
+
         # checking for interactions with the drop-down menu and updating its attributes as necessary
         self.dropdown.update(event_list, self)
 
@@ -381,6 +542,17 @@ class MenuScene:
                 pygame.quit()
                 sys.exit()
 
+            # redrawing everything if the window contents were lost
+            if event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+                self.invalidate()
+
+            # checking for clicks on the title suggestions under the focused text box
+            if event.type == pygame.MOUSEBUTTONDOWN:
+                clicked = [j for j, rect in enumerate(self.suggestion_rects()) if rect.collidepoint(event.pos)]
+                if clicked:
+                    self.accept_suggestion(clicked[0])
+                    continue
+
             # checking for mouse clicks
             if event.type == pygame.MOUSEBUTTONDOWN:
                 if self.chosen_posters[0][1][0].get_rect(
@@ -400,8 +572,8 @@ class MenuScene:
                     self.textbox_index = None
                     self.ratingbox_index = None
 
-                # checking if the user clicks on the 'GO' button
-                if self.submit_rect.collidepoint(event.pos):
+                # checking if the user clicks on the 'GO' button (once the movies have loaded)
+                if self.submit_rect.collidepoint(event.pos) and self.network_ready:
                     part_a = [self.user_texts[r] in self.movies for r in range(len(self.user_texts))]
                     part_b = [is_valid_rating(self.rating_texts[n]) for n in range(len(self.user_texts))]
                     if any(part_a[g] and part_b[g] for g in range(len(self.user_texts))):
@@ -426,6 +598,9 @@ class MenuScene:
             # helper method to check for KEYDOWN events
             self._event_action(event)
 
+        # letting the speculator start on the rows entered so far
+        self.speculator.update(self.current_submissions())
+
     def _help_draw(self) -> None:
         """
         Helper method for MenuScene.draw.
@@ -435,10 +610,11 @@ class MenuScene:
         poster_coord_width = SCREEN_WIDTH * 0.8
         poster_coord_height = SCREEN_HEIGHT * 0.13
         poster_gap = SCREEN_HEIGHT * 0.215
-        base_font = pygame.font.SysFont('trebuchetms', int(SCREEN_WIDTH * 0.017))
-        invalid_movie_surface = base_font.render('Movie not found. Please enter a different movie.', True, RED)
-        invalid_rate_surface = base_font.render('Invalid rating.', True, RED)
-        invalid_rate_surface_2 = base_font.render('Ratings must be from 0.0 to 5.0 inclusive.', True, RED)
+        invalid_movie_surface = text_cache.render_text(BASE_FONT_SIZE,
+                                                       'Movie not found. Please enter a different movie.', RED)
+        invalid_rate_surface = text_cache.render_text(BASE_FONT_SIZE, 'Invalid rating.', RED)
+        invalid_rate_surface_2 = text_cache.render_text(BASE_FONT_SIZE,
+                                                        'Ratings must be from 0.0 to 5.0 inclusive.', RED)
 
         # displaying movie poster images
         for j in range(len(self.chosen_posters)):
@@ -448,10 +624,10 @@ class MenuScene:
 
         # displaying user's movie title input and adjusting text box size
         for j in range(len(self.user_texts)):
-            text_surface = base_font.render(self.user_texts[j], True, (255, 255, 255))
+            text_surface = text_cache.render_text(BASE_FONT_SIZE, self.user_texts[j], (255, 255, 255))
             if self.rating_rects[j].x - (self.user_text_rects[j].x + text_surface.get_width()) <= 50:
                 self.user_texts[j] = self.user_texts[j][:-1]
-                text_surface = base_font.render(self.user_texts[j], True, (255, 255, 255))
+                text_surface = text_cache.render_text(BASE_FONT_SIZE, self.user_texts[j], (255, 255, 255))
             self.screen.blit(text_surface, (self.user_text_rects[j].x + 5, self.user_text_rects[j].y + 5))
             self.user_text_rects[j].w = max(text_surface.get_width() + 10, 150)
 
@@ -464,7 +640,7 @@ class MenuScene:
 
         # displaying user's movie rating input
         for j in range(len(self.rating_texts)):
-            text_surface = base_font.render(self.rating_texts[j], True, (255, 255, 255))
+            text_surface = text_cache.render_text(BASE_FONT_SIZE, self.rating_texts[j], (255, 255, 255))
             self.screen.blit(text_surface, (self.rating_rects[j].x + SCREEN_WIDTH * 0.01,
                                             self.rating_rects[j].y + SCREEN_HEIGHT * 0.01))
 
@@ -478,35 +654,81 @@ class MenuScene:
                     center=(self.rating_rects[j].centerx,
                             self.rating_rects[j].centery + 0.08 * self.screen_h)))
 
+        # displaying title suggestions under the focused movie title text box
+        for rect, suggestion in zip(self.suggestion_rects(), self.current_suggestions()):
+            pygame.draw.rect(self.screen, (21, 21, 81), rect)
+            pygame.draw.rect(self.screen, BLUE, rect, 1)
+            suggestion_surface = text_cache.render_text(BASE_FONT_SIZE, suggestion, WHITE)
+            self.screen.blit(suggestion_surface, suggestion_surface.get_rect(midleft=(rect.x + 5, rect.centery)))
+
     def draw(self) -> Optional[bool]:
         """
         Draw the scene's contents on the given screen using Pygame.
+
+        Nothing is drawn if nothing on screen would change since the previous call. Otherwise, only the regions
+        that changed are redrawn, and they are added to self.dirty_rects. Return True once the user has submitted
+        valid input.
+        """
+
+        # If user entered valid input, collect it in order to find the best movie recommendations
+        if self.submit_permitted:
+            self.user_submissions.update(self.current_submissions())
+            return True
+
+        # skipping the frame entirely if nothing on screen would change
+        input_state, dropdown_state = self._screen_state()
+        if self._drawn_state is None:
+            self.dirty_rects.append(self.screen.get_rect())
+        else:
+            if input_state != self._drawn_state[0]:
+                self.dirty_rects.append(self.input_panel_rect)
+            if dropdown_state != self._drawn_state[1]:
+                self.dirty_rects.append(self.dropdown.full_rect())
+        if not self.dirty_rects:
+            return None
+
+        # repainting only inside the changed regions: everything drawn outside the clip rectangle is skipped
+        if self.screen.get_rect() in self.dirty_rects:
+            self._draw_contents()
+        else:
+            for rect in self.dirty_rects:
+                self.screen.set_clip(rect)
+                self._draw_contents()
+            self.screen.set_clip(None)
+
+        # remembering what is on screen (after _help_draw, which may trim overlong input)
+        if self._drawn_state is None and not STARTUP_TIMER.has("first frame drawn"):
+            self._mark("first frame drawn")
+        self._drawn_state = self._screen_state()
+
+        # loading the featured posters once the window is already showing something
+        if not self.posters_loaded:
+            self.load_posters()
+            self.invalidate()
+        return None
+
+    def _draw_contents(self) -> None:
+        """
+        Draw every component of the scene on the screen, within its current clip rectangle.
         """
 
         # filling the current MenuScene's Pygame screen with a black background
         self.screen.fill((0, 0, 0))
 
-        # initializing fonts and rectagles
-        base_font = pygame.font.SysFont('trebuchetms', int(SCREEN_WIDTH * 0.017))
-
+        # initializing rectagles
         title_outline_rect = pygame.Rect(0, 0, SCREEN_WIDTH * 0.7, SCREEN_HEIGHT * 0.077)
         movies_outline_rect = pygame.Rect(SCREEN_WIDTH * 0.7, 0, SCREEN_WIDTH * 0.3, SCREEN_HEIGHT * 0.077)
 
         # displaying error message if user tries to receive recommendations with invalid input
-        if not self.submit_permitted and self.submit_permitted is not None:
-            invalid_submit_surface = base_font.render(
+        if self.submit_permitted is not None:
+            invalid_submit_surface = text_cache.render_text(
+                BASE_FONT_SIZE,
                 'Invalid input. Please fill out at least one row with a valid movie title and rating to proceed.',
-                True, RED)
+                RED)
             self.screen.blit(invalid_submit_surface, invalid_submit_surface.get_rect(center=(
                 self.submit_rect.centerx + 0.13 * SCREEN_WIDTH,
                 self.submit_rect.centery + 0.05 * self.screen.get_height())))
 
-        # If user entered valid input, collect it in order to find the best movie recommendations
-        elif self.submit_permitted:
-            for j in range(len(self.user_texts)):
-                if self.user_texts[j] in self.movies and is_valid_rating(self.rating_texts[j]):
-                    self.user_submissions[self.user_texts[j]] = float(self.rating_texts[j])
-            return True
 
         # drawing text box and rating box rectangles
         for i in range(len(self.user_text_rects)):
@@ -526,19 +748,20 @@ class MenuScene:
         pygame.draw.rect(self.screen, BLUE, self.submit_rect)
 
         # rendering title/header texts using various fonts
-        title_surface = pygame.font.SysFont('trebuchetms', int(SCREEN_WIDTH * 0.025)).render('FlickFindr', True, GOLDEN)
-        sidebar_title_surface = pygame.font.SysFont('trebuchetms',
-                                                    int(SCREEN_WIDTH * 0.02)).render('Today\'s Hit Flicks:', True, BLUE)
-        instructions_surface1 = pygame.font.SysFont('trebuchetms', int(SCREEN_WIDTH * 0.017)).render(
-            'Submit up to 5 movie ratings and press \'GO\'', True,
-            GOLDEN)
-        instructions_surface2 = pygame.font.SysFont('trebuchetms',
-                                                    int(SCREEN_WIDTH * 0.017))\
-            .render('to receive movie recommendations!', True, GOLDEN)
-        moviebox_label = pygame.font.SysFont('trebuchetms', int(SCREEN_WIDTH * 0.017)).render('Movie Title', True, BLUE)
-        ratingbox_label = pygame.font.SysFont('trebuchetms', int(SCREEN_WIDTH * 0.017)).render('Rating (0.0 to 5.0)',
-                                                                                               True, BLUE)
-        submit_label = pygame.font.SysFont('trebuchetms', int(SCREEN_WIDTH * 0.017)).render('GO!', True, WHITE)
+        title_surface = text_cache.render_text(TITLE_FONT_SIZE, 'FlickFindr', GOLDEN)
+        sidebar_title_surface = text_cache.render_text(SIDEBAR_FONT_SIZE, 'Today\'s Hit Flicks:', BLUE)
+        instructions_surface1 = text_cache.render_text(BASE_FONT_SIZE, 'Submit up to 5 movie ratings and press \'GO\'',
+                                                       GOLDEN)
+        instructions_surface2 = text_cache.render_text(BASE_FONT_SIZE, 'to receive movie recommendations!', GOLDEN)
+        moviebox_label = text_cache.render_text(BASE_FONT_SIZE, 'Movie Title', BLUE)
+        ratingbox_label = text_cache.render_text(BASE_FONT_SIZE, 'Rating (0.0 to 5.0)', BLUE)
+        if self.network_ready:
+            submit_text = 'GO!'
+        elif self.load_error is not None:
+            submit_text = 'Could not load movies'
+        else:
+            submit_text = 'Loading movies...'
+        submit_label = text_cache.render_text(BASE_FONT_SIZE, submit_text, WHITE)
 
         # displaying text on the pygame window
         self.screen.blit(title_surface,
@@ -560,7 +783,45 @@ class MenuScene:
         # drawing the most updated version of the Drop-Down menu
         self.dropdown.draw(self.screen)
 
-        return None
+    def _screen_state(self) -> tuple[tuple, tuple]:
+        """
+        Return a snapshot of everything that decides what the input panel and the drop-down menu look like.
+        """
+        input_state = (tuple(self.user_texts), tuple(self.rating_texts), self.textbox_index, self.ratingbox_index,
+                       self.submit_permitted, self.network_ready, self.load_error is not None)
+        dropdown_state = (self.dropdown.draw_menu, self.dropdown.menu_active, self.dropdown.active_option,
+                          tuple(self.dropdown.options))
+        return input_state, dropdown_state
+
+    def take_dirty_rects(self) -> list[pygame.Rect]:
+        """
+        Return the screen regions changed since the last call, and forget them.
+        """
+        dirty_rects, self.dirty_rects = self.dirty_rects, []
+        return dirty_rects
+
+    def needs_update(self) -> bool:
+        """
+        Return whether the scene must be drawn again even if no new events arrive.
+        """
+        loading = not self.network_ready and self.load_error is None
+        return self._drawn_state is None or loading or not self.posters_loaded
+
+    def invalidate(self) -> None:
+        """
+        Make the next call to draw redraw the whole screen.
+        """
+        self._drawn_state = None
+
+
+def wait_for_events(timeout: int) -> list[pygame.event.Event]:
+    """
+    Block until at least one event arrives or timeout milliseconds pass, then return every queued event.
+    """
+    first_event = pygame.event.wait(timeout)
+    if first_event.type == pygame.NOEVENT:
+        return []
+    return [first_event] + pygame.event.get()
 
 
 def is_valid_rating(rating: str) -> bool:
@@ -594,25 +855,48 @@ def is_valid_rating(rating: str) -> bool:
 if __name__ == '__main__':
     python_ta.check_all(config={
         'extra-imports': ["annotations", "Optional", "result_scene", "webbrowser", "pygame", "sys", "random",
-                          "data_parsing", "graph_traversal", "tkinter"],
+                          "graph_traversal", "tkinter", "movie_stats", "network_loader",
+                          "speculative_prefetch", "text_cache", "title_index", "tracing"],
         'allowed-io': [],
         'disable': ["too-many-instance-attributes", "too-many-branches", "too-many-nested-blocks"],
         'generated-members': ['pygame.*'],
         'max-line-length': 120
     })
 
-    user_scene = MenuScene(REVIEW_NETWORK.get_movie_titles())
+    loader = network_loader.NetworkLoader(graph_traversal.DATA_FILE, STARTUP_TIMER).start()
+    user_scene = MenuScene(loader)
+    STARTUP_TIMER.mark("window created")
+    startup_reported = False
     while True:
+        # sleeping until something happens when the scene has nothing left to draw
+        if user_scene.needs_update():
+            events = pygame.event.get()
+        else:
+            events = wait_for_events(IDLE_WAIT_MS)
+
         if isinstance(user_scene, MenuScene):
-            user_scene.handle_event()
-            if user_scene.draw():
-                top_movies = graph_traversal.run_search_on_all(user_scene.user_submissions)
+            user_scene.handle_event(events)
+            with tracing.span("MenuScene.draw"):
+                submitted = user_scene.draw()
+            if submitted:
+                top_movies = user_scene.speculator.recommend(user_scene.user_submissions)
+                print(user_scene.speculator.report(), file=sys.stderr)
                 top_movie_titles = [x[0].title for x in top_movies]
                 user_scene = ResultScene(top_movie_titles)
 
         elif isinstance(user_scene, ResultScene):
-            user_scene.draw()
-            user_scene.handle_event()
-
-        pygame.display.flip()
+            with tracing.span("ResultScene.draw"):
+                user_scene.draw()
+            user_scene.handle_event(events)
+
+        # pushing only the changed regions of the screen to the display
+        changed_rects = user_scene.take_dirty_rects()
+        if changed_rects:
+            with tracing.span("display.update", rects=len(changed_rects)):
+                pygame.display.update(changed_rects)
+
+        # reporting start-up times once everything on the first screen has loaded
+        if not startup_reported and isinstance(user_scene, MenuScene) and not user_scene.needs_update():
+            print(STARTUP_TIMER.report(), file=sys.stderr)
+            startup_reported = True
         CLOCK.tick(60)
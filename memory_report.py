@@ -0,0 +1,257 @@
+"""
+CSC111 Final Project - Phase 2: Data Parsing - Memory Accounting
+
+Description
+===============================
+
+This Python module breaks down the memory a loaded ReviewNetwork uses by
+structure: the Movie, User and Rating objects, the users_rated_by sets,
+the movies_rated dicts, the title and genre strings, the rating floats and
+the network's own indexes. Shared objects are counted once. Each structure
+grows with the number of ratings, users or movies, which is used to
+project the total to a larger dataset.
+
+The accounted total is compared with the growth of the process's resident
+set size while loading, and with the size of the same network in the
+compact array layout of shared_network.
+
+    python -c "import sys, memory_report; memory_report.main(sys.argv[1:])" --target-rows 1000000 10000000
+
+Copyright and Usage Information
+===============================
+
+This file is provided solely for the TA's and Computer Science Professors
+at the University of Toronto St. George campus. All forms of distribution
+of this code, whether as given or with any changes, are expressly prohibited.
+
+This file is Copyright (c) 2023 Guransh Singh, Nauhar Kapur, Shahbaz Nanda,
+and Raunak Madan.
+"""
+# Importing libraries
+from __future__ import annotations
+from dataclasses import asdict, dataclass, field
+from typing import Callable, Optional
+import argparse
+import gc
+import json
+import sys
+import tracemalloc
+import python_ta
+import data_parsing
+import graph_traversal
+import movie_classes
+import network_versions
+import shared_network
+import synthetic_data
+
+
+# Program constants
+INSTANCE_SAMPLES = 1000
+MB = 2 ** 20
+
+
+@dataclass
+class MemoryCategory:
+    """
+    The memory taken by one kind of structure in a network.
+
+    Instance Attributes:
+    - name: what the structure is
+    - driver: what its size grows with: "rating", "user" or "movie"
+    - objects: the number of distinct objects counted
+    - bytes: their total size
+
+    Representation Invariants:
+    - self.driver in {"rating", "user", "movie"}
+    - self.objects >= 0 and self.bytes >= 0
+    """
+    name: str
+    driver: str
+    objects: int = 0
+    bytes: int = 0
+
+
+@dataclass
+class MemoryReport:
+    """
+    The memory breakdown of a ReviewNetwork.
+
+    Instance Attributes:
+    - ratings: the number of ratings in the network
+    - users: the number of users
+    - movies: the number of movies
+    - categories: the memory of each structure, in the order they are reported
+    - rss_growth: how much the process's resident set grew while loading the network, if measured
+    - array_layout_bytes: the size of the same network in shared_network's array layout, if measured
+
+    Representation Invariants:
+    - self.ratings > 0 and self.users > 0 and self.movies > 0
+    """
+    ratings: int
+    users: int
+    movies: int
+    categories: list[MemoryCategory] = field(default_factory=list)
+    rss_growth: Optional[int] = None
+    array_layout_bytes: Optional[int] = None
+
+    def total(self) -> int:
+        """Return the total accounted size in bytes."""
+        return sum(category.bytes for category in self.categories)
+
+    def project(self, target_ratings: int, target_users: Optional[int] = None,
+                target_movies: Optional[int] = None) -> int:
+        """Return the projected accounted size, in bytes, of a network with target_ratings ratings.
+
+        The numbers of users and movies grow in proportion to the ratings unless they are given. Hash tables
+        grow in steps, so the projection is accurate to within the slack of their last resize."""
+        factor = target_ratings / self.ratings
+        counts = {"rating": (self.ratings, target_ratings),
+                  "user": (self.users, round(self.users * factor) if target_users is None else target_users),
+                  "movie": (self.movies, round(self.movies * factor) if target_movies is None else target_movies)}
+        projected = 0
+        for category in self.categories:
+            current, target = counts[category.driver]
+            projected += round(category.bytes * target / current)
+        return projected
+
+    def table(self) -> str:
+        """Return the breakdown as a printable table, with totals per rating and per user."""
+        total = self.total()
+        lines = [f"{self.ratings} ratings, {self.users} users, {self.movies} movies",
+                 f"{'structure':<24}{'grows with':>11}{'objects':>10}{'MB':>9}{'share':>7}{'B/rating':>10}"
+                 f"{'B/user':>10}"]
+        for category in sorted(self.categories, key=lambda c: -c.bytes):
+            lines.append(f"{category.name:<24}{category.driver:>11}{category.objects:>10}{category.bytes / MB:>9.2f}"
+                         f"{category.bytes / total:>7.0%}{category.bytes / self.ratings:>10.1f}"
+                         f"{category.bytes / self.users:>10.0f}")
+        lines.append(f"{'total':<24}{'':>11}{sum(c.objects for c in self.categories):>10}{total / MB:>9.2f}"
+                     f"{'100%':>7}{total / self.ratings:>10.1f}{total / self.users:>10.0f}")
+        if self.rss_growth is not None:
+            lines.append(f"resident set growth while loading: {self.rss_growth / MB:.2f} MB "
+                         f"({self.rss_growth / self.ratings:.1f} B/rating)")
+        if self.array_layout_bytes is not None:
+            lines.append(f"same network in the array layout: {self.array_layout_bytes / MB:.2f} MB "
+                         f"({self.array_layout_bytes / self.ratings:.1f} B/rating)")
+        return "\n".join(lines)
+
+
+def instance_bytes(make: Callable[[], object], samples: int = INSTANCE_SAMPLES) -> float:
+    """Return the average number of bytes allocated by each call of make, measured with tracemalloc.
+
+    This counts an instance with its attribute storage without reading its __dict__ (which would turn the
+    compact attribute storage of recent Python versions into a full dict)."""
+    was_tracing = tracemalloc.is_tracing()
+    if not was_tracing:
+        tracemalloc.start()
+    objects = [None] * samples
+    before = tracemalloc.get_traced_memory()[0]
+    for i in range(samples):
+        objects[i] = make()
+    allocated = tracemalloc.get_traced_memory()[0] - before
+    if not was_tracing:
+        tracemalloc.stop()
+    return allocated / samples
+
+
+def account(review_network: movie_classes.ReviewNetwork) -> MemoryReport:
+    """Return the memory breakdown of review_network."""
+    sample_user = movie_classes.User(0)
+    sample_movie = movie_classes.Movie("Sample", ["Drama"])
+    movie_size = instance_bytes(lambda: movie_classes.Movie("Sample", sample_movie.genre)) - sys.getsizeof(set())
+    user_size = instance_bytes(lambda: movie_classes.User(0)) - sys.getsizeof({})
+    rating_size = instance_bytes(lambda: movie_classes.Rating(sample_user, sample_movie, 4.0))
+
+    categories = {name: MemoryCategory(name, driver) for name, driver in [
+        ("Rating objects", "rating"), ("movies_rated dicts", "rating"), ("users_rated_by sets", "rating"),
+        ("rating floats", "rating"), ("User objects", "user"), ("user id ints", "user"),
+        ("users index", "user"), ("Movie objects", "movie"), ("title strings", "movie"),
+        ("genre lists", "movie"), ("genre strings", "movie"), ("movies index", "movie")]}
+    seen = set()
+
+    def add(name: str, obj: object, size: Optional[float] = None) -> None:
+        """Count obj in the named category unless it has been counted already."""
+        if id(obj) not in seen:
+            seen.add(id(obj))
+            categories[name].objects += 1
+            categories[name].bytes += round(sys.getsizeof(obj) if size is None else size)
+
+    add("movies index", review_network.movies)
+    add("users index", review_network.users)
+    ratings = 0
+    for movie in review_network.movies.values():
+        add("Movie objects", movie, movie_size)
+        add("title strings", movie.title)
+        add("genre lists", movie.genre)
+        for genre in movie.genre:
+            add("genre strings", genre)
+        add("users_rated_by sets", movie.users_rated_by)
+    for user in review_network.users.values():
+        add("User objects", user, user_size)
+        add("user id ints", user.user_id)
+        add("movies_rated dicts", user.movies_rated)
+        ratings += len(user.movies_rated)
+        for rating in user.movies_rated.values():
+            add("Rating objects", rating, rating_size)
+            add("rating floats", rating.rating)
+
+    return MemoryReport(ratings, len(review_network.users), len(review_network.movies),
+                        [category for category in categories.values() if category.objects > 0])
+
+
+def load_and_account(load: Callable[[], movie_classes.ReviewNetwork], array_layout: bool = True) -> MemoryReport:
+    """Call load to build a network, and return its memory breakdown with the resident set growth while it
+    loaded and, if array_layout is True, its size in the array layout."""
+    gc.collect()
+    before = network_versions.current_rss_bytes()
+    review_network = load()
+    gc.collect()
+    rss_growth = network_versions.current_rss_bytes() - before
+
+    report = account(review_network)
+    report.rss_growth = rss_growth
+    if array_layout:
+        report.array_layout_bytes = shared_network.layout_size(shared_network.build_arrays(review_network))
+    return report
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    """Print the memory breakdown of a dataset and its projection to larger row counts."""
+    parser = argparse.ArgumentParser(description="Break down the memory a loaded review network uses.")
+    parser.add_argument("--csv", default=graph_traversal.DATA_FILE, help="ratings file to load")
+    parser.add_argument("--synthetic-rows", type=int, default=None,
+                        help="account a synthetic network of about this many ratings instead of the ratings file")
+    parser.add_argument("--target-rows", type=int, nargs="*", default=[1000000, 10000000],
+                        help="row counts to project the memory use to")
+    parser.add_argument("--output", default=None, help="file to write the JSON report to")
+    args = parser.parse_args(argv)
+
+    if args.synthetic_rows is not None:
+        spec = synthetic_data.SyntheticSpec.for_rows(args.synthetic_rows)
+        report = load_and_account(lambda: synthetic_data.generate_network(spec))
+    else:
+        report = load_and_account(lambda: data_parsing.create_review_network(args.csv))
+    print(report.table())
+
+    projections = {}
+    for target in args.target_rows:
+        projections[target] = report.project(target)
+        array_bytes = report.array_layout_bytes * target / report.ratings
+        print(f"projected to {target:,} ratings: {projections[target] / MB:,.0f} MB of objects "
+              f"(array layout: {array_bytes / MB:,.0f} MB)")
+
+    if args.output is not None:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump({**asdict(report), "total": report.total(), "projections": projections}, file, indent=2)
+
+
+# Testing code
+if __name__ == "__main__":
+    python_ta.check_all(config={
+        'extra-imports': ["annotations", "dataclasses", "typing", "argparse", "gc", "json", "sys", "tracemalloc",
+                          "data_parsing", "graph_traversal", "movie_classes", "network_versions", "shared_network",
+                          "synthetic_data"],
+        'allowed-io': ["main"],
+        'max-line-length': 120
+    })
+
+    main()
@@ -0,0 +1,133 @@
+"""
+CSC111 Final Project - Phase 3: UI Design and Implementation - Local Metadata Store
+
+Description
+===============================
+
+This Python module contains the MetadataStore class, which keeps the rent,
+trailer and poster links and the IMDb rating of each movie in a local JSON
+file, so that the movie API only needs to be queried once per title.
+
+Copyright and Usage Information
+===============================
+
+This file is provided solely for the TA's and Computer Science Professors
+at the University of Toronto St. George campus. All forms of distribution
+of this code, whether as given or with any changes, are expressly prohibited.
+
+This file is Copyright (c) 2023 Guransh Singh, Nauhar Kapur, Shahbaz Nanda,
+and Raunak Madan.
+"""
+# Importing libraries
+from __future__ import annotations
+from typing import Optional
+import json
+import os
+import threading
+import python_ta
+
+
+# Program constants
+DEFAULT_STORE_PATH = "metadata_store.json"
+
+
+class MetadataStore:
+    """
+    A thread-safe mapping from movie titles to their API results, persisted to a JSON file.
+
+    Each stored value has the same format as the list returned by api_parser.run_api, that is
+    [rent link, trailer link, poster link, IMDb rating].
+
+    Instance Attributes:
+    - path: the JSON file that this store is loaded from and saved to
+    - entries: dictionary mapping movie titles to their stored API results
+    - unsaved_changes: whether entries has changed since the store was last saved
+
+    Representation Invariants:
+    - self.path != ''
+    - all(len(links) == 4 for links in self.entries.values())
+    """
+    path: str
+    entries: dict[str, list[str]]
+    unsaved_changes: bool
+    _lock: threading.Lock
+
+    def __init__(self, path: str = DEFAULT_STORE_PATH) -> None:
+        """Initialize the store, loading any entries previously saved at path."""
+        self.path = path
+        self.entries = {}
+        self.unsaved_changes = False
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as file:
+                self.entries = json.load(file)
+
+    def __contains__(self, title: str) -> bool:
+        """Return whether the given title has a stored entry."""
+        with self._lock:
+            return title in self.entries
+
+    def __len__(self) -> int:
+        """Return the number of stored entries."""
+        with self._lock:
+            return len(self.entries)
+
+    def get(self, title: str) -> Optional[list[str]]:
+        """Return a copy of the stored API result for the given title, or None if it has not been stored."""
+        with self._lock:
+            links = self.entries.get(title)
+            return None if links is None else list(links)
+
+    def put(self, title: str, links: list[str]) -> None:
+        """
+        Store the API result for the given title.
+
+        Preconditions:
+        - len(links) == 4
+        """
+        with self._lock:
+            self.entries[title] = list(links)
+            self.unsaved_changes = True
+
+    def save(self) -> None:
+        """
+        Write the stored entries to self.path if anything has changed.
+
+        The file is replaced atomically, so an interrupted save never leaves a partially written store behind.
+        """
+        with self._lock:
+            if not self.unsaved_changes:
+                return
+            temp_path = self.path + ".tmp"
+            with open(temp_path, "w", encoding="utf-8") as file:
+                json.dump(self.entries, file)
+            os.replace(temp_path, self.path)
+            self.unsaved_changes = False
+
+
+_DEFAULT_STORE = None
+
+
+def get_default_store() -> MetadataStore:
+    """Return the store saved at DEFAULT_STORE_PATH, loading it on first use."""
+    global _DEFAULT_STORE
+    if _DEFAULT_STORE is None:
+        _DEFAULT_STORE = MetadataStore()
+    return _DEFAULT_STORE
+
+
+def set_default_store(store: Optional[MetadataStore]) -> None:
+    """Make get_default_store return the given store (e.g. a temporary one in benchmarks), or load the store
+    at DEFAULT_STORE_PATH again on next use if store is None."""
+    global _DEFAULT_STORE
+    _DEFAULT_STORE = store
+
+
+# Testing code
+if __name__ == "__main__":
+    python_ta.check_all(config={
+        'extra-imports': ["annotations", "typing", "json", "os", "threading"],
+        'allowed-io': ["MetadataStore.__init__", "MetadataStore.save"],
+        'disable': ["global-statement"],
+        'max-line-length': 120
+    })
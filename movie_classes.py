@@ -168,6 +168,39 @@ class ReviewNetwork:
         if movie.title not in self.movies:
             self.movies[movie.title] = movie
 
+    def add_rating(self, user_id: int, title: str, genres: list[str], rating: float) -> Rating:
+        """
+        Record that the user with user_id gave the movie with the given title this rating, creating the user and
+        the movie if they are not in the network yet, and return the Rating.
+
+        If the user already rated the movie, the existing Rating is updated instead. genres is only used when
+        the movie is new.
+
+        Preconditions:
+        - title != ''
+        - title in self.movies or genres != []
+        - 0.0 <= rating <= 5.0
+        """
+        user = self.users.get(user_id)
+        if user is None:
+            user = User(user_id)
+            self.add_user(user)
+
+        movie = self.movies.get(title)
+        if movie is None:
+            movie = Movie(title, genres)
+            self.add_movie(movie)
+
+        existing = user.movies_rated.get(movie)
+        if existing is not None:
+            existing.rating = rating
+            return existing
+
+        new_rating = Rating(user, movie, rating)
+        user.add_movie_rated(movie, new_rating)
+        movie.add_user(user)
+        return new_rating
+
     def get_movie_titles(self) -> set[str]:
         """Return a set of the movie titles of the movies in the current ReviewNetwork"""
         return set(self.movies.keys())
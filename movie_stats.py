@@ -0,0 +1,273 @@
+"""
+CSC111 Final Project - Phase 2: Data Parsing - Movie Statistics
+
+Description
+===============================
+
+This Python module keeps the count, mean and variance of every movie's
+ratings, and of every genre's, computed once when the network is loaded
+and then kept up to date from the deltas of a RatingIngestor. From these it
+serves ranked lists of the best movies overall and in each genre, scored
+with a Bayesian average that pulls movies with few ratings towards their
+genre's mean.
+
+It also knows, for every movie, how many of its raters liked some other
+movie. When no movie in a watch history has such a rater, the graph search
+cannot find a single candidate, so graph_traversal answers the history
+from the genre lists instead of searching (see
+graph_traversal.set_movie_stats).
+
+Copyright and Usage Information
+===============================
+
+This file is provided solely for the TA's and Computer Science Professors
+at the University of Toronto St. George campus. All forms of distribution
+of this code, whether as given or with any changes, are expressly prohibited.
+
+This file is Copyright (c) 2023 Guransh Singh, Nauhar Kapur, Shahbaz Nanda,
+and Raunak Madan.
+"""
+# Importing libraries
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Optional
+import threading
+import python_ta
+import graph_traversal
+import movie_classes
+import rating_ingest
+
+
+# Program constants
+PRIOR_WEIGHT = 10.0
+LIST_LENGTH = 100
+
+
+@dataclass
+class RatingAggregate:
+    """
+    The count, sum and sum of squares of a collection of ratings.
+
+    Instance Attributes:
+    - count: the number of ratings
+    - total: their sum
+    - total_squares: the sum of their squares
+
+    Representation Invariants:
+    - self.count >= 0
+    - self.count > 0 or self.total == self.total_squares == 0
+    """
+    count: int = 0
+    total: float = 0.0
+    total_squares: float = 0.0
+
+    def add(self, rating: float) -> None:
+        """Add a single rating."""
+        self.count += 1
+        self.total += rating
+        self.total_squares += rating * rating
+
+    def combine(self, other: RatingAggregate, sign: int = 1) -> None:
+        """Add the ratings of other to this aggregate, or remove them if sign is -1.
+
+        Preconditions:
+        - sign in {1, -1}
+        - sign == 1 or other's ratings are all included in this aggregate
+        """
+        self.count += sign * other.count
+        self.total += sign * other.total
+        self.total_squares += sign * other.total_squares
+
+    def mean(self) -> float:
+        """Return the mean rating, or 0.0 if there are no ratings."""
+        return self.total / self.count if self.count else 0.0
+
+    def variance(self) -> float:
+        """Return the (population) variance of the ratings, or 0.0 if there are none."""
+        if not self.count:
+            return 0.0
+        return max(0.0, self.total_squares / self.count - self.mean() ** 2)
+
+
+class MovieStats:
+    """
+    Rating statistics of every movie and genre of a ReviewNetwork, with ranked lists served from a cache.
+
+    Instance Attributes:
+    - network: the ReviewNetwork the statistics describe
+    - prior_weight: how many ratings' worth of weight the genre mean has in a movie's Bayesian average
+    - movies: the ratings of every movie, by title
+    - genres: the ratings of every movie in each genre, by genre
+    - overall: every rating in the network
+    - useful_raters: the number of raters of every movie who rated another movie at least
+                     graph_traversal.MOVIE_THRESHOLD, by title
+
+    Representation Invariants:
+    - self.prior_weight > 0
+    - self.movies.keys() == self.useful_raters.keys() == self.network.movies.keys()
+    - self.overall.count == sum(aggregate.count for aggregate in self.movies.values())
+    """
+    network: movie_classes.ReviewNetwork
+    prior_weight: float
+    movies: dict[str, RatingAggregate]
+    genres: dict[str, RatingAggregate]
+    overall: RatingAggregate
+    useful_raters: dict[str, int]
+    _liked: dict[int, int]
+    _rankings: dict[Optional[str], list[tuple[str, float]]]
+    _lock: threading.RLock
+
+    def __init__(self, network: movie_classes.ReviewNetwork, prior_weight: float = PRIOR_WEIGHT) -> None:
+        """Compute the statistics of network."""
+        self.network = network
+        self.prior_weight = prior_weight
+        self.movies = {title: RatingAggregate() for title in network.movies}
+        self.genres = {}
+        self.overall = RatingAggregate()
+        self.useful_raters = dict.fromkeys(network.movies, 0)
+        self._liked = {}
+        self._rankings = {}
+        self._lock = threading.RLock()
+
+        for user_id, user in network.users.items():
+            liked = self._count_liked(user)
+            self._liked[user_id] = liked
+            for movie, rating in user.movies_rated.items():
+                self.movies[movie.title].add(rating.rating)
+                if liked - (rating.rating >= graph_traversal.MOVIE_THRESHOLD) > 0:
+                    self.useful_raters[movie.title] += 1
+        for title, aggregate in self.movies.items():
+            self._add_to_genres(title, aggregate, 1)
+
+    @staticmethod
+    def _count_liked(user: movie_classes.User) -> int:
+        """Return the number of movies user rated at least graph_traversal.MOVIE_THRESHOLD."""
+        return sum(rating.rating >= graph_traversal.MOVIE_THRESHOLD for rating in user.movies_rated.values())
+
+    def _add_to_genres(self, title: str, aggregate: RatingAggregate, sign: int) -> None:
+        """Add the ratings in aggregate of the movie with the given title to its genres and the overall total,
+        or remove them if sign is -1."""
+        self.overall.combine(aggregate, sign)
+        for genre in self.network.movies[title].genre:
+            if genre != '':
+                self.genres.setdefault(genre, RatingAggregate()).combine(aggregate, sign)
+
+    def bayesian_score(self, title: str, genre: Optional[str] = None) -> float:
+        """Return the Bayesian average rating of the movie with the given title: its mean rating, pulled towards
+        the mean of genre (or of every rating, if genre is None) by prior_weight ratings.
+
+        Preconditions:
+        - title in self.movies
+        - genre is None or genre in self.genres
+        """
+        prior = self.overall if genre is None else self.genres[genre]
+        aggregate = self.movies[title]
+        return (self.prior_weight * prior.mean() + aggregate.total) / (self.prior_weight + aggregate.count)
+
+    def popular(self, num_movies: int = 10, genre: Optional[str] = None) -> list[tuple[str, float]]:
+        """Return the titles of the num_movies (at most LIST_LENGTH) movies with the highest Bayesian average in
+        genre, or overall if genre is None, with their scores, best first.
+
+        The list is ranked once and then served from a cache until the ratings of the genre change."""
+        with self._lock:
+            ranking = self._rankings.get(genre)
+            if ranking is None:
+                if genre is None:
+                    titles = self.movies.keys()
+                elif genre in self.genres:
+                    titles = [title for title, movie in self.network.movies.items() if genre in movie.genre]
+                else:
+                    titles = []
+                scored = [(title, self.bayesian_score(title, genre)) for title in titles if self.movies[title].count]
+                scored.sort(key=lambda x: (-x[1], x[0]))
+                ranking = self._rankings[genre] = scored[:LIST_LENGTH]
+            return ranking[:num_movies]
+
+    def can_help(self, user_movies: dict[str, float]) -> bool:
+        """Return whether graph_traversal.run_search_on_all may find any recommendation for user_movies.
+
+        It cannot when every movie in user_movies is known and none of their raters liked another movie. A
+        history with an unknown title is left for the search to reject."""
+        with self._lock:
+            return any(self.useful_raters.get(title, 1) > 0 for title in user_movies)
+
+    def cold_start(self, user_movies: dict[str, float], num_rec: int = 10,
+                   exclude: Optional[set[str]] = None) -> list[tuple[movie_classes.Movie, float]]:
+        """Return num_rec recommendations for user_movies from the genre lists alone, with their Bayesian
+        averages, without searching the graph. Titles in user_movies or exclude are never recommended.
+
+        The genres of the movies the user rated at least graph_traversal.GENRE_THRESHOLD are taken in turn,
+        most liked first, and the overall list is used when there are none (e.g. for an empty history)."""
+        liking = {}
+        for title, rating in user_movies.items():
+            if rating >= graph_traversal.GENRE_THRESHOLD and title in self.network.movies:
+                for genre in self.network.movies[title].genre:
+                    if genre in self.genres:
+                        liking[genre] = liking.get(genre, 0.0) + rating
+        genres = sorted(liking, key=lambda g: (-liking[g], g)) or [None]
+        lists = [self.popular(LIST_LENGTH, genre) for genre in genres]
+
+        chosen = set(user_movies) | (exclude or set())
+        results = []
+        for rank in range(LIST_LENGTH):
+            for ranking in lists:
+                if len(results) == num_rec:
+                    return results
+                if rank < len(ranking) and ranking[rank][0] not in chosen:
+                    chosen.add(ranking[rank][0])
+                    results.append((self.network.movies[ranking[rank][0]], ranking[rank][1]))
+        return results
+
+    def apply_delta(self, delta: rating_ingest.RatingDelta) -> None:
+        """Update the statistics after the ratings in delta were applied to the network.
+
+        Only the changed movies, and the movies rated by changed users, are recounted."""
+        with self._lock:
+            affected = set(delta.changed_movies)
+            for user_id in delta.changed_users:
+                user = self.network.users[user_id]
+                self._liked[user_id] = self._count_liked(user)
+                affected.update(movie.title for movie in user.movies_rated)
+
+            for title in delta.changed_movies:
+                movie = self.network.movies[title]
+                aggregate = RatingAggregate()
+                for user in movie.users_rated_by:
+                    aggregate.add(user.movies_rated[movie].rating)
+                if title in self.movies:
+                    self._add_to_genres(title, self.movies[title], -1)
+                self.movies[title] = aggregate
+                self._add_to_genres(title, aggregate, 1)
+                for genre in movie.genre:
+                    self._rankings.pop(genre, None)
+            if delta.changed_movies:
+                self._rankings.pop(None, None)
+
+            for title in affected:
+                movie = self.network.movies[title]
+                self.useful_raters[title] = sum(
+                    self._liked[user.user_id] - (user.movies_rated[movie].rating >= graph_traversal.MOVIE_THRESHOLD)
+                    > 0 for user in movie.users_rated_by)
+
+    def attach(self, ingestor: rating_ingest.RatingIngestor) -> MovieStats:
+        """Keep these statistics up to date with every batch ingestor applies, and return them.
+
+        Preconditions:
+        - ingestor.network is self.network
+        """
+        def on_delta(delta: rating_ingest.RatingDelta) -> None:
+            with ingestor.lock:
+                self.apply_delta(delta)
+
+        ingestor.add_listener(on_delta)
+        return self
+
+
+# Testing code
+if __name__ == "__main__":
+    python_ta.check_all(config={
+        'extra-imports': ["annotations", "dataclasses", "typing", "threading", "graph_traversal", "movie_classes",
+                          "rating_ingest"],
+        'allowed-io': [],
+        'max-line-length': 120
+    })
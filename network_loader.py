@@ -0,0 +1,168 @@
+"""
+CSC111 Final Project - Phase 3: UI Design and Implementation - Background Network Loading
+
+Description
+===============================
+
+This Python module contains the NetworkLoader class, which loads the
+ReviewNetwork and builds its title index and movie statistics on a
+background thread so that the window can appear before the data is ready,
+and the PhaseTimer class, which reports how long each phase of start-up
+took.
+
+Copyright and Usage Information
+===============================
+
+This file is provided solely for the TA's and Computer Science Professors
+at the University of Toronto St. George campus. All forms of distribution
+of this code, whether as given or with any changes, are expressly prohibited.
+
+This file is Copyright (c) 2023 Guransh Singh, Nauhar Kapur, Shahbaz Nanda,
+and Raunak Madan.
+"""
+# Importing libraries
+from __future__ import annotations
+from typing import Optional
+import threading
+import time
+import python_ta
+import data_parsing
+import movie_classes
+import movie_stats
+import title_index
+
+
+class PhaseTimer:
+    """
+    Records when each named phase of a process finished, relative to when the timer was created.
+
+    Instance Attributes:
+    - start_time: perf_counter time at which the timer was created
+    - phases: list of (phase name, seconds since start_time) pairs, in the order they were marked
+
+    Representation Invariants:
+    - all(seconds >= 0 for _, seconds in self.phases)
+    """
+    start_time: float
+    phases: list[tuple[str, float]]
+    _lock: threading.Lock
+
+    def __init__(self, start_time: Optional[float] = None) -> None:
+        """Initialize a timer starting now, or at start_time if it is given."""
+        self.start_time = time.perf_counter() if start_time is None else start_time
+        self.phases = []
+        self._lock = threading.Lock()
+
+    def mark(self, phase: str) -> None:
+        """Record that the given phase has just finished. This may be called from any thread."""
+        with self._lock:
+            self.phases.append((phase, time.perf_counter() - self.start_time))
+
+    def has(self, phase: str) -> bool:
+        """Return whether the given phase has been marked."""
+        with self._lock:
+            return any(name == phase for name, _ in self.phases)
+
+    def report(self) -> str:
+        """Return a table of the marked phases, with the time each one finished at and the time since the
+        previously marked phase."""
+        with self._lock:
+            phases = sorted(self.phases, key=lambda x: x[1])
+        lines = ["Start-up phases:"]
+        previous = 0.0
+        for name, seconds in phases:
+            lines.append(f"  {name:<28} at {seconds * 1000:8.1f} ms  (+{(seconds - previous) * 1000:.1f} ms)")
+            previous = seconds
+        return "\n".join(lines)
+
+
+class NetworkLoader:
+    """
+    Loads the ReviewNetwork for a ratings file, and builds a TitleIndex and the MovieStats of its movies, on a
+    background thread.
+
+    The network is read from its snapshot when the snapshot is up to date, and otherwise parsed from the ratings
+    file (see data_parsing.load_review_network). Titles are ranked in the index by their number of ratings.
+
+    Instance Attributes:
+    - csv_file: the ratings file to load
+    - timer: the PhaseTimer to mark when loading finishes, if any
+    - error: the exception raised while loading, if loading failed
+    - title_index: the index of the network's movie titles, once loading has finished
+    - movie_stats: the rating statistics of the network's movies, once loading has finished
+
+    Representation Invariants:
+    - self.csv_file != ''
+    """
+    csv_file: str
+    timer: Optional[PhaseTimer]
+    error: Optional[BaseException]
+    title_index: Optional[title_index.TitleIndex]
+    movie_stats: Optional[movie_stats.MovieStats]
+    _network: Optional[movie_classes.ReviewNetwork]
+    _done: threading.Event
+    _thread: Optional[threading.Thread]
+
+    def __init__(self, csv_file: str, timer: Optional[PhaseTimer] = None) -> None:
+        """Initialize a loader for csv_file that has not started yet."""
+        self.csv_file = csv_file
+        self.timer = timer
+        self.error = None
+        self.title_index = None
+        self.movie_stats = None
+        self._network = None
+        self._done = threading.Event()
+        self._thread = None
+
+    def start(self) -> NetworkLoader:
+        """Start loading in the background, and return this loader."""
+        self._thread = threading.Thread(target=self._load, daemon=True, name="network-loader")
+        self._thread.start()
+        return self
+
+    def _load(self) -> None:
+        """Load the network, recording it or the error raised."""
+        try:
+            network = data_parsing.load_review_network(self.csv_file)
+            if self.timer is not None:
+                self.timer.mark("review network loaded")
+            self.title_index = title_index.TitleIndex(
+                network.movies, {title: len(movie.users_rated_by) for title, movie in network.movies.items()})
+            if self.timer is not None:
+                self.timer.mark("title index built")
+            self.movie_stats = movie_stats.MovieStats(network)
+            if self.timer is not None:
+                self.timer.mark("movie statistics built")
+            self._network = network
+        except Exception as error:  # pylint: disable=broad-exception-caught
+            self.error = error
+        finally:
+            self._done.set()
+
+    def is_done(self) -> bool:
+        """Return whether loading has finished, successfully or not."""
+        return self._done.is_set()
+
+    def is_ready(self) -> bool:
+        """Return whether the network has finished loading."""
+        return self._done.is_set() and self.error is None
+
+    def wait(self, timeout: Optional[float] = None) -> movie_classes.ReviewNetwork:
+        """Block until the network has loaded and return it.
+
+        Raise the loading error if loading failed, or TimeoutError if timeout seconds pass first."""
+        if not self._done.wait(timeout):
+            raise TimeoutError(f"{self.csv_file} did not load within {timeout} seconds")
+        if self.error is not None:
+            raise self.error
+        return self._network
+
+
+# Testing code
+if __name__ == "__main__":
+    python_ta.check_all(config={
+        'extra-imports': ["annotations", "typing", "threading", "time", "data_parsing", "movie_classes",
+                          "movie_stats", "title_index"],
+        'allowed-io': [],
+        'max-line-length': 120
+    })
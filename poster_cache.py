@@ -0,0 +1,201 @@
+"""
+CSC111 Final Project - Phase 3: UI Design and Implementation - Poster Pipeline
+
+Description
+===============================
+
+This Python module contains the PosterPipeline class, which downloads,
+decodes and scales movie posters on background threads and keeps the
+scaled thumbnails in a disk cache, so that the render loop only ever
+receives ready-to-blit surfaces.
+
+Copyright and Usage Information
+===============================
+
+This file is provided solely for the TA's and Computer Science Professors
+at the University of Toronto St. George campus. All forms of distribution
+of this code, whether as given or with any changes, are expressly prohibited.
+
+This file is Copyright (c) 2023 Guransh Singh, Nauhar Kapur, Shahbaz Nanda,
+and Raunak Madan.
+"""
+# Importing libraries
+from __future__ import annotations
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+from urllib.request import urlopen
+import hashlib
+import io
+import os
+import queue
+import threading
+import time
+import pygame
+import python_ta
+import tracing
+
+
+# Program constants
+DEFAULT_CACHE_DIR = "Poster Cache"
+DEFAULT_WORKERS = 8
+DOWNLOAD_TIMEOUT = 10
+
+
+class PosterPipeline:
+    """
+    Loads posters in parallel off the render thread and hands them back as display-ready surfaces.
+
+    Each poster goes through download, decode and scale on a worker thread. The scaled thumbnail is saved in
+    cache_dir under a name derived from its URL, so a poster seen in an earlier session is read back from disk
+    without downloading or rescaling it. Posters seen in this session are also kept in memory.
+
+    Instance Attributes:
+    - size: the size every poster is scaled to
+    - cache_dir: directory holding the scaled thumbnails
+    - surfaces: posters that are ready to draw, keyed by URL
+    - failed: URLs whose poster could not be loaded
+    - downloads: number of posters fetched from the network
+    - disk_hits: number of posters read back from the disk cache
+
+    Representation Invariants:
+    - all(url not in self.failed for url in self.surfaces)
+    - all(self.surfaces[url].get_size() == self.size for url in self.surfaces)
+    """
+    size: tuple[int, int]
+    cache_dir: str
+    surfaces: dict[str, pygame.Surface]
+    failed: set[str]
+    downloads: int
+    disk_hits: int
+    _pending: set[str]
+    _results: queue.Queue
+    _executor: ThreadPoolExecutor
+    _lock: threading.Lock
+
+    def __init__(self, size: tuple[int, int], cache_dir: str = DEFAULT_CACHE_DIR,
+                 workers: int = DEFAULT_WORKERS) -> None:
+        """Initialize an empty pipeline that scales posters to size and caches them in cache_dir."""
+        self.size = size
+        self.cache_dir = cache_dir
+        self.surfaces = {}
+        self.failed = set()
+        self.downloads = 0
+        self.disk_hits = 0
+        self._pending = set()
+        self._results = queue.Queue()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="poster")
+        self._lock = threading.Lock()
+
+    def cache_path(self, url: str) -> str:
+        """Return the path of the disk cache file for the poster at url."""
+        name = hashlib.sha1(f"{url}|{self.size[0]}x{self.size[1]}".encode()).hexdigest()
+        return os.path.join(self.cache_dir, name + ".png")
+
+    def request(self, url: str) -> None:
+        """Start loading the poster at url unless it is already loaded, loading or known to fail.
+
+        Unlike poll, this may be called from any thread."""
+        with self._lock:
+            if url == "" or url in self.surfaces or url in self.failed or url in self._pending:
+                return
+            self._pending.add(url)
+        self._executor.submit(self._load, url)
+
+    def is_pending(self, url: str) -> bool:
+        """Return whether the poster at url has been requested but has not been collected by poll yet."""
+        return url in self._pending
+
+    def get(self, url: str) -> Optional[pygame.Surface]:
+        """Return the ready surface for the poster at url, or None if it is not ready."""
+        return self.surfaces.get(url)
+
+    def poll(self) -> list[str]:
+        """
+        Collect the posters finished since the last call and return their URLs.
+
+        Must be called from the render thread: this is where each surface is converted to the display's pixel
+        format, so later blits need no conversion.
+        """
+        finished = []
+        while True:
+            try:
+                url, surface = self._results.get_nowait()
+            except queue.Empty:
+                break
+            with self._lock:
+                self._pending.discard(url)
+            if surface is None:
+                self.failed.add(url)
+            else:
+                if pygame.display.get_surface() is not None:
+                    surface = surface.convert()
+                self.surfaces[url] = surface
+            finished.append(url)
+        return finished
+
+    def wait(self, urls: list[str], timeout: Optional[float] = None) -> None:
+        """Request every poster in urls and poll until all of them are ready or have failed."""
+        for url in urls:
+            self.request(url)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while any(self.is_pending(url) for url in urls):
+            if deadline is not None and time.monotonic() > deadline:
+                break
+            self.poll()
+            time.sleep(0.005)
+
+    def _load(self, url: str) -> None:
+        """Load the poster at url from the disk cache or the network, then queue it for poll."""
+        with tracing.span("poster_load", url=url) as span:
+            try:
+                surface = self._load_cached(url)
+                span.set("disk_hit", surface is not None)
+                if surface is None:
+                    surface = self._download(url)
+            except (OSError, ValueError, pygame.error):
+                surface = None
+        self._results.put((url, surface))
+
+    def _load_cached(self, url: str) -> Optional[pygame.Surface]:
+        """Return the cached thumbnail for url, or None if it is not in the disk cache."""
+        path = self.cache_path(url)
+        if not os.path.exists(path):
+            return None
+        surface = pygame.image.load(path)
+        if surface.get_size() != self.size:
+            return None
+        with self._lock:
+            self.disk_hits += 1
+        return surface
+
+    def _download(self, url: str) -> pygame.Surface:
+        """Download, decode and scale the poster at url, and save the thumbnail in the disk cache."""
+        with tracing.span("poster_urlopen", url=url) as span, urlopen(url, timeout=DOWNLOAD_TIMEOUT) as response:
+            image_bytes = response.read()
+            span.set("bytes", len(image_bytes))
+        with self._lock:
+            self.downloads += 1
+        image = pygame.image.load(io.BytesIO(image_bytes))
+        surface = pygame.transform.scale(image, self.size)
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self.cache_path(url)
+        temp_path = f"{path[:-4]}.{threading.get_ident()}.tmp.png"
+        pygame.image.save(surface, temp_path)
+        os.replace(temp_path, path)
+        return surface
+
+    def shutdown(self) -> None:
+        """Stop the worker threads, abandoning posters that have not started loading."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+# Testing code
+if __name__ == "__main__":
+    python_ta.check_all(config={
+        'extra-imports': ["annotations", "concurrent.futures", "typing", "urllib.request", "hashlib", "io", "os",
+                          "queue", "threading", "time", "pygame", "tracing"],
+        'allowed-io': [],
+        'generated-members': ['pygame.*'],
+        'max-line-length': 120
+    })
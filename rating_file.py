@@ -0,0 +1,148 @@
+"""
+CSC111 Final Project - Phase 2: Data Parsing - Binary Columnar Rating Files
+
+Description
+===============================
+
+This Python module converts the ratings CSV into a binary columnar file
+and opens such files with mmap, so that no row is parsed on load: opening
+a file only reads its header, whatever its size, and the operating system
+pages in the parts that are used.
+
+The file uses the layout from shared_network: per-user slices of movie
+code and quantized rating columns (with each user's id), the same ratings
+sliced per movie, offsets for both, and a dictionary section of titles and
+genres. Opened files work with shared_network.run_search_on_all directly.
+
+    python -c "import sys, rating_file; rating_file.main(sys.argv[1:])" "CSC111 Final Data.csv" ratings.flick
+
+Copyright and Usage Information
+===============================
+
+This file is provided solely for the TA's and Computer Science Professors
+at the University of Toronto St. George campus. All forms of distribution
+of this code, whether as given or with any changes, are expressly prohibited.
+
+This file is Copyright (c) 2023 Guransh Singh, Nauhar Kapur, Shahbaz Nanda,
+and Raunak Madan.
+"""
+# Importing libraries
+from __future__ import annotations
+from typing import Optional
+import argparse
+import mmap
+import os
+import time
+import python_ta
+import data_parsing
+import movie_classes
+import shared_network
+
+
+# Program constants
+RATING_FILE_SUFFIX = ".flick"
+
+
+class RatingFile:
+    """
+    A binary columnar rating file opened with mmap.
+
+    Instance Attributes:
+    - path: the file's path
+    - network: the ArrayNetwork over the mapped file
+
+    Representation Invariants:
+    - self.path != ''
+    """
+    path: str
+    network: shared_network.ArrayNetwork
+    _mapping: mmap.mmap
+    _view: memoryview
+
+    def __init__(self, path: str) -> None:
+        """Map the file at path.
+
+        Raise ValueError if it is not a rating file of the current format version."""
+        self.path = path
+        with open(path, "rb") as file:
+            # a file too short to hold the header (including an empty one, which cannot be mapped) is rejected here
+            if os.fstat(file.fileno()).st_size < shared_network.HEADER.size:
+                raise ValueError(f"{path} is not a version {shared_network.FORMAT_VERSION} rating file")
+            self._mapping = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._mapping)
+        try:
+            self.network = shared_network.ArrayNetwork(shared_network.read_layout(self._view))
+        except (ValueError, KeyError, TypeError):
+            self._view.release()
+            self._mapping.close()
+            raise ValueError(f"{path} is not a version {shared_network.FORMAT_VERSION} rating file") from None
+
+    def __enter__(self) -> RatingFile:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Unmap the file."""
+        self.network.release()
+        self._view.release()
+        self._mapping.close()
+
+
+def convert_csv(csv_file: str, rating_file: str) -> int:
+    """Convert the ratings CSV at csv_file into a rating file at rating_file, and return its size in bytes."""
+    return shared_network.write_layout_file(rating_file,
+                                            shared_network.build_arrays(data_parsing.create_review_network(csv_file)))
+
+
+def to_review_network(network: shared_network.ArrayNetwork) -> movie_classes.ReviewNetwork:
+    """Return the ReviewNetwork object graph for an ArrayNetwork (for code that needs Movie and User objects)."""
+    views = network.views
+    genre_names = [bytes(views["genre_name_bytes"][views["genre_name_offsets"][i]:
+                                                   views["genre_name_offsets"][i + 1]]).decode("utf-8")
+                   for i in range(len(views["genre_name_offsets"]) - 1)]
+    titles = [network.title(i) for i in range(network.num_movies)]
+    genres = [[genre_names[g] for g in network.genres(i)] for i in range(network.num_movies)]
+
+    review_network = movie_classes.ReviewNetwork()
+    offsets, movies, ratings = views["user_offsets"], views["user_movies"], views["user_ratings"]
+    for user in range(network.num_users):
+        user_id = views["user_ids"][user]
+        for k in range(offsets[user], offsets[user + 1]):
+            review_network.add_rating(user_id, titles[movies[k]], genres[movies[k]],
+                                      ratings[k] / network.rating_scale)
+    return review_network
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    """Convert a ratings CSV into a rating file and report how long converting and opening took."""
+    parser = argparse.ArgumentParser(description="Convert a ratings CSV into a memory-mapped rating file.")
+    parser.add_argument("csv", help="ratings CSV to convert")
+    parser.add_argument("output", nargs="?", default=None,
+                        help=f"rating file to write (default: the CSV's name with {RATING_FILE_SUFFIX})")
+    args = parser.parse_args(argv)
+    output = args.output if args.output is not None else os.path.splitext(args.csv)[0] + RATING_FILE_SUFFIX
+
+    start = time.perf_counter()
+    size = convert_csv(args.csv, output)
+    print(f"Wrote {output}: {size / 2 ** 20:.2f} MB in {time.perf_counter() - start:.2f}s "
+          f"(CSV {os.path.getsize(args.csv) / 2 ** 20:.2f} MB)")
+
+    start = time.perf_counter()
+    with RatingFile(output) as opened:
+        elapsed = time.perf_counter() - start
+        print(f"Opened {opened.network.num_movies} movies, {opened.network.num_users} users and "
+              f"{len(opened.network.views['user_movies'])} ratings in {elapsed * 1000:.2f} ms")
+
+
+# Testing code
+if __name__ == "__main__":
+    python_ta.check_all(config={
+        'extra-imports': ["annotations", "typing", "argparse", "mmap", "os", "time", "data_parsing",
+                          "movie_classes", "shared_network"],
+        'allowed-io': ["RatingFile.__init__", "main"],
+        'max-line-length': 120
+    })
+
+    main()
@@ -0,0 +1,282 @@
+"""
+CSC111 Final Project - Phase 2: Data Parsing - Incremental Rating Ingestion
+
+Description
+===============================
+
+This Python module adds new and updated ratings to an existing
+ReviewNetwork without rebuilding it, and reports exactly which users and
+movies each batch changed, so that indexes and caches built from the
+network can update only what they need to. It can also follow a ratings
+file that is still being appended to.
+
+    python -c "import sys, rating_ingest; rating_ingest.main(sys.argv[1:])" "CSC111 Final Data.csv" --tail
+
+Copyright and Usage Information
+===============================
+
+This file is provided solely for the TA's and Computer Science Professors
+at the University of Toronto St. George campus. All forms of distribution
+of this code, whether as given or with any changes, are expressly prohibited.
+
+This file is Copyright (c) 2023 Guransh Singh, Nauhar Kapur, Shahbaz Nanda,
+and Raunak Madan.
+"""
+# Importing libraries
+from __future__ import annotations
+from dataclasses import dataclass, field
+from typing import Callable, Iterable, Optional
+import argparse
+import csv
+import os
+import threading
+import time
+import python_ta
+import data_parsing
+import movie_classes
+
+
+# Program constants
+DEFAULT_POLL_INTERVAL = 1.0
+MAX_BATCH_ROWS = 10000
+
+
+@dataclass
+class RatingDelta:
+    """
+    What one batch of ratings changed in a ReviewNetwork.
+
+    Instance Attributes:
+    - changed_users: ids of users with a new or changed rating
+    - changed_movies: titles of movies with a new or changed rating
+    - new_users: ids of users that were not in the network before
+    - new_movies: titles of movies that were not in the network before
+    - added: number of ratings that did not exist before
+    - updated: number of existing ratings that were given a new value
+    - unchanged: number of ratings that were already in the network with the same value
+    - rejected: number of ratings that could not be applied (for example, a new movie without genres)
+
+    Representation Invariants:
+    - self.new_users <= self.changed_users
+    - self.new_movies <= self.changed_movies
+    """
+    changed_users: set[int] = field(default_factory=set)
+    changed_movies: set[str] = field(default_factory=set)
+    new_users: set[int] = field(default_factory=set)
+    new_movies: set[str] = field(default_factory=set)
+    added: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    rejected: int = 0
+
+    def is_empty(self) -> bool:
+        """Return whether the batch changed nothing."""
+        return not self.changed_users
+
+    def merge(self, other: RatingDelta) -> None:
+        """Add the changes recorded in other to this delta."""
+        self.changed_users |= other.changed_users
+        self.changed_movies |= other.changed_movies
+        self.new_users |= other.new_users
+        self.new_movies |= other.new_movies
+        self.added += other.added
+        self.updated += other.updated
+        self.unchanged += other.unchanged
+        self.rejected += other.rejected
+
+    def summary(self) -> str:
+        """Return a one-line description of the batch."""
+        return (f"{self.added} added, {self.updated} updated, {self.unchanged} unchanged, {self.rejected} rejected; "
+                f"{len(self.changed_users)} users ({len(self.new_users)} new), "
+                f"{len(self.changed_movies)} movies ({len(self.new_movies)} new)")
+
+
+class RatingIngestor:
+    """
+    Applies batches of (user id, title, genres, rating) ratings to a ReviewNetwork in place.
+
+    The network's invariants hold between batches: every rating is linked from both its user's movies_rated and
+    its movie's users_rated_by. Listeners are called with the RatingDelta of every batch that changed something.
+
+    Searches must not run on the network while a batch is being applied. Code that searches from other threads
+    should hold self.lock while it does.
+
+    Instance Attributes:
+    - network: the ReviewNetwork ratings are added to
+    - lock: held while a batch is applied
+    - total: the combined delta of every batch applied so far
+
+    Representation Invariants:
+    - all(user_id in self.network.users for user_id in self.total.changed_users)
+    - all(title in self.network.movies for title in self.total.changed_movies)
+    """
+    network: movie_classes.ReviewNetwork
+    lock: threading.RLock
+    total: RatingDelta
+    _listeners: list[Callable[[RatingDelta], None]]
+
+    def __init__(self, network: movie_classes.ReviewNetwork) -> None:
+        """Initialize an ingestor that adds ratings to network."""
+        self.network = network
+        self.lock = threading.RLock()
+        self.total = RatingDelta()
+        self._listeners = []
+
+    def add_listener(self, listener: Callable[[RatingDelta], None]) -> None:
+        """Call listener(delta) after every batch that changed the network."""
+        self._listeners.append(listener)
+
+    def apply(self, ratings: Iterable[tuple[int, str, list[str], float]]) -> RatingDelta:
+        """Add or update every (user id, title, genres, rating) in ratings, and return what changed.
+
+        genres is only used for movies that are not in the network yet. Ratings outside 0.0 to 5.0, and new
+        movies without genres, are rejected rather than added."""
+        delta = RatingDelta()
+        with self.lock:
+            for user_id, title, genres, rating in ratings:
+                self._apply_one(user_id, title, genres, rating, delta)
+        if not delta.is_empty():
+            self.total.merge(delta)
+            for listener in self._listeners:
+                listener(delta)
+        return delta
+
+    def _apply_one(self, user_id: int, title: str, genres: list[str], rating: float, delta: RatingDelta) -> None:
+        """Apply a single rating and record its effect in delta."""
+        movie = self.network.movies.get(title)
+        user = self.network.users.get(user_id)
+        genres = [genre for genre in genres if genre != '']
+        if not 0.0 <= rating <= 5.0 or title == '' or (movie is None and not genres):
+            delta.rejected += 1
+            return
+
+        old = None if movie is None or user is None else user.movies_rated.get(movie)
+        if old is not None and old.rating == rating:
+            delta.unchanged += 1
+            return
+        if old is not None:
+            delta.updated += 1
+        else:
+            delta.added += 1
+        if user is None:
+            delta.new_users.add(user_id)
+        if movie is None:
+            delta.new_movies.add(title)
+
+        self.network.add_rating(user_id, title, genres, rating)
+        delta.changed_users.add(user_id)
+        delta.changed_movies.add(title)
+
+
+class CsvTailer:
+    """
+    Follows a ratings file that is being appended to, feeding each complete new row to a RatingIngestor.
+
+    Only whole lines are read, so a row that is still being written is picked up on a later poll. If the file
+    shrinks (it was replaced or truncated), it is read again from the start.
+
+    Instance Attributes:
+    - csv_file: the ratings file followed
+    - ingestor: the RatingIngestor new rows are applied to
+    - offset: the byte offset just after the last complete line read
+    - malformed: number of rows that could not be parsed
+
+    Representation Invariants:
+    - self.offset >= 0
+    """
+    csv_file: str
+    ingestor: RatingIngestor
+    offset: int
+    malformed: int
+
+    def __init__(self, csv_file: str, ingestor: RatingIngestor, offset: int = 0) -> None:
+        """Initialize a tailer that starts reading csv_file at offset (0 reads the whole file, header included).
+
+        Use os.path.getsize(csv_file) as offset when the network was already built from the file."""
+        self.csv_file = csv_file
+        self.ingestor = ingestor
+        self.offset = offset
+        self.malformed = 0
+
+    def poll(self) -> RatingDelta:
+        """Apply the rows appended since the last poll, MAX_BATCH_ROWS at a time, and return the combined delta.
+        """
+        if os.path.getsize(self.csv_file) < self.offset:
+            self.offset = 0
+
+        combined = RatingDelta()
+        with open(self.csv_file, "rb") as file:
+            file.seek(self.offset)
+            while True:
+                lines = file.readlines(1 << 20)
+                complete = [line for line in lines if line.endswith(b"\n")]
+                if not complete:
+                    break
+                self._apply_lines(complete, combined)
+                self.offset += sum(len(line) for line in complete)
+                if len(complete) < len(lines):
+                    break
+        return combined
+
+    def _apply_lines(self, lines: list[bytes], combined: RatingDelta) -> None:
+        """Parse and apply complete lines of the file, adding their effect to combined."""
+        ratings = []
+        for row in csv.reader(line.decode("utf-8-sig") for line in lines):
+            # skipping blank lines and the header
+            if not row or row[1:4] == ['userId', 'rating', 'MovieTitle']:
+                continue
+            try:
+                user_id, rating_score, movie_title, movie_genres = data_parsing.parse_row(row)
+            except (ValueError, IndexError):
+                self.malformed += 1
+                continue
+            ratings.append((user_id, movie_title, movie_genres, rating_score))
+
+        for start in range(0, len(ratings), MAX_BATCH_ROWS):
+            combined.merge(self.ingestor.apply(ratings[start:start + MAX_BATCH_ROWS]))
+
+    def follow(self, interval: float = DEFAULT_POLL_INTERVAL,
+               on_delta: Optional[Callable[[RatingDelta], None]] = None) -> None:
+        """Poll the file every interval seconds until interrupted, calling on_delta with every non-empty delta."""
+        while True:
+            delta = self.poll()
+            if on_delta is not None and not delta.is_empty():
+                on_delta(delta)
+            time.sleep(interval)
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    """Build a network from a ratings file and, with --tail, keep adding rows appended to it."""
+    parser = argparse.ArgumentParser(description="Load a ratings file and follow the rows appended to it.")
+    parser.add_argument("csv", help="ratings file to load")
+    parser.add_argument("--tail", action="store_true", help="keep following the file for new rows")
+    parser.add_argument("--interval", type=float, default=DEFAULT_POLL_INTERVAL, help="seconds between polls")
+    args = parser.parse_args(argv)
+
+    ingestor = RatingIngestor(movie_classes.ReviewNetwork())
+    tailer = CsvTailer(args.csv, ingestor)
+    start = time.perf_counter()
+    delta = tailer.poll()
+    print(f"Loaded in {time.perf_counter() - start:.2f}s: {delta.summary()}", flush=True)
+    if not args.tail:
+        return
+
+    def report(new_delta: RatingDelta) -> None:
+        print(f"{time.strftime('%H:%M:%S')} {new_delta.summary()}", flush=True)
+
+    try:
+        tailer.follow(args.interval, report)
+    except KeyboardInterrupt:
+        print(f"Stopped; in total {ingestor.total.summary()}")
+
+
+# Testing code
+if __name__ == "__main__":
+    python_ta.check_all(config={
+        'extra-imports': ["annotations", "dataclasses", "typing", "argparse", "csv", "os", "threading", "time",
+                          "data_parsing", "movie_classes"],
+        'allowed-io': ["CsvTailer.poll", "main"],
+        'max-line-length': 120
+    })
+
+    main()
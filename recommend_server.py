@@ -0,0 +1,442 @@
+"""
+CSC111 Final Project - Phase 2: Data Parsing - Recommendation Service
+
+Description
+===============================
+
+This Python module serves movie recommendations over a local HTTP/JSON API,
+without pygame. The ReviewNetwork is loaded once when the server starts.
+
+    python -c "import recommend_server; recommend_server.main()" --port 8111
+
+Endpoints:
+    POST /recommend   {"ratings": {"The Dark Knight": 4.5}, "num_rec": 10}
+    GET  /titles      the most rated titles, to build requests from
+    GET  /stats       request counts, queue depth, latency histograms and slow searches
+    GET  /health      "ok" once the server is up
+    POST /reload      start loading the ratings file again (see network_versions)
+
+Searches run on a fixed pool of worker threads. When every worker is busy
+and max_queue requests are already waiting, new requests are refused with
+503 and a Retry-After header instead of being queued without bound.
+
+With --watch, the server also reloads the ratings file whenever it changes,
+without dropping requests: each request runs on the version of the network
+that was current when it arrived.
+
+Copyright and Usage Information
+===============================
+
+This file is provided solely for the TA's and Computer Science Professors
+at the University of Toronto St. George campus. All forms of distribution
+of this code, whether as given or with any changes, are expressly prohibited.
+
+This file is Copyright (c) 2023 Guransh Singh, Nauhar Kapur, Shahbaz Nanda,
+and Raunak Madan.
+"""
+# Importing libraries
+from __future__ import annotations
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+from urllib.parse import parse_qs, urlparse
+import argparse
+import bisect
+import json
+import threading
+import time
+import python_ta
+import graph_traversal
+import movie_classes
+import network_versions
+import slow_query_log
+
+
+# Program constants
+DEFAULT_PORT = 8111
+DEFAULT_WORKERS = 4
+DEFAULT_MAX_QUEUE = 64
+MAX_NUM_REC = 100
+MAX_BODY_BYTES = 1 << 16
+LISTEN_BACKLOG = 256
+NUM_TITLES = 200
+
+# Upper bounds of the latency histogram buckets, in milliseconds (the last bucket has no upper bound)
+BUCKET_BOUNDS_MS = [0.5, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000]
+
+
+class LatencyHistogram:
+    """
+    A thread-safe histogram of latencies over fixed, roughly logarithmic buckets.
+
+    Instance Attributes:
+    - counts: number of latencies recorded in each bucket; counts[i] covers latencies up to BUCKET_BOUNDS_MS[i],
+      and the last entry covers everything slower
+    - total: number of latencies recorded
+    - total_ms: sum of the recorded latencies, in milliseconds
+
+    Representation Invariants:
+    - len(self.counts) == len(BUCKET_BOUNDS_MS) + 1
+    - sum(self.counts) == self.total
+    """
+    counts: list[int]
+    total: int
+    total_ms: float
+    _lock: threading.Lock
+
+    def __init__(self) -> None:
+        """Initialize an empty histogram."""
+        self.counts = [0] * (len(BUCKET_BOUNDS_MS) + 1)
+        self.total = 0
+        self.total_ms = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        """Record one latency, given in seconds."""
+        milliseconds = seconds * 1000
+        with self._lock:
+            self.counts[bisect.bisect_left(BUCKET_BOUNDS_MS, milliseconds)] += 1
+            self.total += 1
+            self.total_ms += milliseconds
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        """Return the upper bound, in milliseconds, of the bucket holding the given fraction of latencies, or
+        None if nothing has been recorded (or that bucket has no upper bound).
+
+        Preconditions:
+        - 0 < fraction <= 1
+        """
+        with self._lock:
+            counts, total = list(self.counts), self.total
+        seen = 0
+        for i, count in enumerate(counts):
+            seen += count
+            if total > 0 and seen >= fraction * total:
+                return BUCKET_BOUNDS_MS[i] if i < len(BUCKET_BOUNDS_MS) else None
+        return None
+
+    def snapshot(self) -> dict:
+        """Return the histogram and its summary statistics as a JSON-compatible dictionary."""
+        with self._lock:
+            counts, total, total_ms = list(self.counts), self.total, self.total_ms
+        labels = [f"<={bound}ms" for bound in BUCKET_BOUNDS_MS] + [f">{BUCKET_BOUNDS_MS[-1]}ms"]
+        return {"count": total,
+                "mean_ms": total_ms / total if total else None,
+                "p50_ms": self.percentile(0.5),
+                "p95_ms": self.percentile(0.95),
+                "p99_ms": self.percentile(0.99),
+                "buckets": dict(zip(labels, counts))}
+
+
+class RecommendationService:
+    """
+    Answers recommendation requests on a versioned ReviewNetwork with a bounded pool of workers, and keeps
+    statistics.
+
+    At most workers searches run at once, and at most max_queue more wait for a worker. Requests beyond that are
+    rejected rather than queued, so that a burst cannot make every later request slow.
+
+    Instance Attributes:
+    - networks: the versions of the ReviewNetwork searched
+    - workers: number of searches run at once
+    - max_queue: number of admitted requests allowed to wait for a worker
+    - startup_seconds: time taken to load the network and start the service
+    - started_at: time.time() at which the service started
+    - completed: number of requests answered successfully
+    - rejected: number of requests refused because the service was overloaded
+    - invalid: number of malformed requests
+    - queue_wait: time admitted requests waited for a worker
+    - service_time: time spent searching
+    - latency: total time from admission to answer
+    - slow_queries: the slow query log reported in /stats, if one is installed
+
+    Representation Invariants:
+    - self.workers > 0
+    - self.max_queue >= 0
+    - 0 <= self._running <= self._admitted <= self.workers + self.max_queue
+    """
+    networks: network_versions.VersionedNetwork
+    workers: int
+    max_queue: int
+    startup_seconds: float
+    started_at: float
+    completed: int
+    rejected: int
+    invalid: int
+    queue_wait: LatencyHistogram
+    service_time: LatencyHistogram
+    latency: LatencyHistogram
+    slow_queries: Optional[slow_query_log.SlowQueryLog]
+    _admitted: int
+    _running: int
+    _popular_titles: Optional[list[str]]
+    _executor: ThreadPoolExecutor
+    _lock: threading.Lock
+
+    def __init__(self, networks: network_versions.VersionedNetwork, workers: int = DEFAULT_WORKERS,
+                 max_queue: int = DEFAULT_MAX_QUEUE, startup_seconds: float = 0.0) -> None:
+        """Initialize a service answering requests on the current version of networks."""
+        self.networks = networks
+        self.workers = workers
+        self.max_queue = max_queue
+        self.startup_seconds = startup_seconds
+        self.started_at = time.time()
+        self.completed = 0
+        self.rejected = 0
+        self.invalid = 0
+        self.queue_wait = LatencyHistogram()
+        self.service_time = LatencyHistogram()
+        self.latency = LatencyHistogram()
+        self.slow_queries = None
+        self._admitted = 0
+        self._running = 0
+        self._popular_titles = None
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="recommend")
+        self._lock = threading.Lock()
+        networks.add_listener(self._on_swap)
+
+    def _on_swap(self, old: network_versions.NetworkVersion, new: network_versions.NetworkVersion) -> None:
+        """Drop what was computed from the old version of the network."""
+        self._popular_titles = None
+        print(f"Swapped in network version {new.version} ({len(new.network.movies)} movies) "
+              f"to replace version {old.version}", flush=True)
+
+    def queue_depth(self) -> int:
+        """Return the number of admitted requests waiting for a worker."""
+        with self._lock:
+            return self._admitted - self._running
+
+    def popular_titles(self, limit: int = NUM_TITLES) -> list[str]:
+        """Return up to limit titles of the current network version, most rated first."""
+        titles = self._popular_titles
+        if titles is None:
+            movies = self.networks.current.network.movies
+            titles = sorted(movies, key=lambda t: -len(movies[t].users_rated_by))
+            self._popular_titles = titles
+        return titles[:limit]
+
+    @staticmethod
+    def parse_request(payload: object, network: movie_classes.ReviewNetwork) -> tuple[dict[str, float], int]:
+        """Return the ratings and num_rec of a decoded /recommend request body, checked against network.
+
+        Raise ValueError with a message for the client if the request is malformed."""
+        if not isinstance(payload, dict) or not isinstance(payload.get("ratings"), dict):
+            raise ValueError('expected a JSON object with a "ratings" object mapping titles to ratings')
+        ratings = payload["ratings"]
+        num_rec = payload.get("num_rec", 10)
+        if not isinstance(num_rec, int) or not 0 < num_rec <= MAX_NUM_REC:
+            raise ValueError(f"num_rec must be an integer from 1 to {MAX_NUM_REC}")
+        if not ratings:
+            raise ValueError("ratings must not be empty")
+        unknown = [title for title in ratings if title not in network.movies]
+        if unknown:
+            raise ValueError(f"unknown titles: {unknown}")
+        for title, rating in ratings.items():
+            if isinstance(rating, bool) or not isinstance(rating, (int, float)) or not 0 <= rating <= 5:
+                raise ValueError(f"rating for {title!r} must be a number from 0.0 to 5.0")
+        return {title: float(rating) for title, rating in ratings.items()}, num_rec
+
+    def recommend(self, ratings: dict[str, float], num_rec: int,
+                  network: movie_classes.ReviewNetwork) -> Optional[list[dict]]:
+        """Return the recommendations for ratings on network, or None if the service is overloaded.
+
+        This blocks the calling (connection) thread until a worker has run the search."""
+        with self._lock:
+            if self._admitted >= self.workers + self.max_queue:
+                self.rejected += 1
+                return None
+            self._admitted += 1
+        admitted_at = time.perf_counter()
+        try:
+            return self._executor.submit(self._search, ratings, num_rec, network, admitted_at).result()
+        finally:
+            with self._lock:
+                self._admitted -= 1
+            self.latency.record(time.perf_counter() - admitted_at)
+
+    def _search(self, ratings: dict[str, float], num_rec: int, network: movie_classes.ReviewNetwork,
+                admitted_at: float) -> list[dict]:
+        """Run the search on a worker thread."""
+        start = time.perf_counter()
+        self.queue_wait.record(start - admitted_at)
+        with self._lock:
+            self._running += 1
+        try:
+            results = graph_traversal.run_search_on_all(ratings, num_rec, network)
+        finally:
+            with self._lock:
+                self._running -= 1
+        self.service_time.record(time.perf_counter() - start)
+        with self._lock:
+            self.completed += 1
+        return [{"title": movie.title, "score": score} for movie, score in results]
+
+    def stats(self) -> dict:
+        """Return the service statistics as a JSON-compatible dictionary."""
+        with self._lock:
+            admitted, running = self._admitted, self._running
+            completed, rejected, invalid = self.completed, self.rejected, self.invalid
+        slow_queries = None if self.slow_queries is None else self.slow_queries.snapshot()
+        return {"network_version": self.networks.current.version,
+                "reloading": self.networks.is_reloading(),
+                "reloads": [report.summary() for report in self.networks.reports],
+                "startup_seconds": self.startup_seconds,
+                "uptime_seconds": time.time() - self.started_at,
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "in_flight": admitted,
+                "running": running,
+                "queue_depth": admitted - running,
+                "completed": completed,
+                "rejected": rejected,
+                "invalid": invalid,
+                "latency": self.latency.snapshot(),
+                "queue_wait": self.queue_wait.snapshot(),
+                "service_time": self.service_time.snapshot(),
+                "slow_queries": slow_queries}
+
+    def handle_request(self, handler: BaseHTTPRequestHandler) -> None:
+        """Write the response for the request held by handler."""
+        parsed = urlparse(handler.path)
+        if handler.command == "POST" and parsed.path == "/recommend":
+            self._handle_recommend(handler)
+        elif handler.command == "GET" and parsed.path == "/titles":
+            limit = parse_qs(parsed.query).get("limit", [str(NUM_TITLES)])[0]
+            send_json(handler, 200, {"titles": self.popular_titles(int(limit) if limit.isdigit() else NUM_TITLES)})
+        elif handler.command == "GET" and parsed.path == "/stats":
+            send_json(handler, 200, self.stats())
+        elif handler.command == "POST" and parsed.path == "/reload":
+            if self.networks.reload():
+                send_json(handler, 202, {"status": "reloading", "from_version": self.networks.current.version})
+            else:
+                send_json(handler, 409, {"error": "a reload is already in progress"})
+        elif handler.command == "GET" and parsed.path == "/health":
+            send_json(handler, 200, {"status": "ok"})
+        else:
+            send_json(handler, 404, {"error": f"no such endpoint: {handler.command} {parsed.path}"})
+
+    def _handle_recommend(self, handler: BaseHTTPRequestHandler) -> None:
+        """Answer a POST /recommend request."""
+        try:
+            length = int(handler.headers.get("Content-Length", "0"))
+            if not 0 < length <= MAX_BODY_BYTES:
+                raise ValueError(f"request body must be 1 to {MAX_BODY_BYTES} bytes")
+            payload = json.loads(handler.rfile.read(length))
+        except ValueError as error:
+            with self._lock:
+                self.invalid += 1
+            send_json(handler, 400, {"error": str(error)})
+            return
+
+        # the request runs entirely on the version current now, even if a reload swaps in a newer one meanwhile
+        with self.networks.pin() as version:
+            try:
+                ratings, num_rec = self.parse_request(payload, version.network)
+            except ValueError as error:
+                with self._lock:
+                    self.invalid += 1
+                send_json(handler, 400, {"error": str(error)})
+                return
+
+            start = time.perf_counter()
+            recommendations = self.recommend(ratings, num_rec, version.network)
+        if recommendations is None:
+            send_json(handler, 503, {"error": "overloaded, try again later"}, {"Retry-After": "1"})
+        else:
+            send_json(handler, 200, {"recommendations": recommendations, "network_version": version.version,
+                                     "elapsed_ms": (time.perf_counter() - start) * 1000})
+
+    def shutdown(self) -> None:
+        """Stop the worker threads."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def send_json(handler: BaseHTTPRequestHandler, status: int, body: dict,
+              headers: Optional[dict[str, str]] = None) -> None:
+    """Write a complete JSON response through handler."""
+    data = json.dumps(body).encode()
+    handler.send_response(status)
+    handler.send_header("Content-Type", "application/json")
+    handler.send_header("Content-Length", str(len(data)))
+    for name, value in ({} if headers is None else headers).items():
+        handler.send_header(name, value)
+    handler.end_headers()
+    handler.wfile.write(data)
+
+
+def make_server(service: RecommendationService, host: str = "127.0.0.1",
+                port: int = DEFAULT_PORT) -> ThreadingHTTPServer:
+    """Return an HTTP server that passes every request to service. Port 0 picks a free port."""
+    class _Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self) -> None:
+            """Answer a GET request."""
+            service.handle_request(self)
+
+        def do_POST(self) -> None:
+            """Answer a POST request."""
+            service.handle_request(self)
+
+        def log_message(self, *args: object) -> None:
+            """Keep the server quiet; /stats reports what happened."""
+
+    class _Server(ThreadingHTTPServer):
+        # the default backlog of 5 drops connections under load, which clients see as 1 s+ retransmit stalls
+        request_queue_size = LISTEN_BACKLOG
+        daemon_threads = True
+
+    return _Server((host, port), _Handler)
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    """Load the network and serve recommendations until interrupted."""
+    parser = argparse.ArgumentParser(description="Serve movie recommendations over a local HTTP/JSON API.")
+    parser.add_argument("--csv", default=graph_traversal.DATA_FILE, help="ratings file to load")
+    parser.add_argument("--host", default="127.0.0.1", help="address to listen on")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="port to listen on (0 for any free port)")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="searches run at once")
+    parser.add_argument("--max-queue", type=int, default=DEFAULT_MAX_QUEUE,
+                        help="requests allowed to wait for a worker before new ones get 503")
+    parser.add_argument("--watch", type=float, default=0,
+                        help="reload the ratings file when it changes, checking every this many seconds")
+    parser.add_argument("--slow-query-ms", type=float, default=None,
+                        help="log the searches that take at least this many milliseconds")
+    parser.add_argument("--slow-query-log", default=None, help="JSON lines file to append slow searches to")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    networks = network_versions.VersionedNetwork(args.csv)
+    network = networks.current.network
+    service = RecommendationService(networks, args.workers, args.max_queue)
+    if args.slow_query_ms is not None or args.slow_query_log is not None:
+        threshold_ms = slow_query_log.DEFAULT_THRESHOLD_MS if args.slow_query_ms is None else args.slow_query_ms
+        service.slow_queries = slow_query_log.SlowQueryLog(threshold_ms, args.slow_query_log).install()
+    server = make_server(service, args.host, args.port)
+    service.startup_seconds = time.perf_counter() - start
+    host, port = server.server_address[:2]
+    print(f"Serving {len(network.movies)} movies on http://{host}:{port} "
+          f"(started in {service.startup_seconds:.2f}s)", flush=True)
+    if args.watch > 0:
+        networks.watch(args.watch)
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.shutdown()
+
+
+# Testing code
+if __name__ == "__main__":
+    python_ta.check_all(config={
+        'extra-imports': ["annotations", "concurrent.futures", "http.server", "typing", "urllib.parse", "argparse",
+                          "bisect", "json", "threading", "time", "graph_traversal", "movie_classes",
+                          "network_versions", "slow_query_log"],
+        'allowed-io': ["main", "RecommendationService._on_swap"],
+        'max-line-length': 120
+    })
+
+    main()
@@ -20,19 +20,46 @@ and Raunak Madan.
 """
 # Importing libraries
 from __future__ import annotations
-import io
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Optional
 import sys
+import time
 import webbrowser
-from urllib.request import urlopen
 import pygame
 import python_ta
+import requests
 import api_parser
+import metadata_store
+import poster_cache
+import text_cache
+import tracing
 
 
 # Program constants
 DEFAULT_SIZE = (200, 330)
 POSTER_LOCATIONS = [(100, 20), (350, 20), (600, 20), (850, 20), (1100, 20), (100, 430), (350, 430), (600, 430),
                     (850, 430), (1100, 430)]
+PLACEHOLDER_COLOR = pygame.Color(40, 40, 40)
+LINK_COLOR = pygame.Color('darkgoldenrod')
+POSTER_PIPELINE = poster_cache.PosterPipeline(DEFAULT_SIZE)
+# The movie API search endpoint, or "" for the real one (benchmarks point this at a fake_provider)
+API_URL = ""
+LINK_EXECUTOR = ThreadPoolExecutor(max_workers=10, thread_name_prefix="links")
+
+
+def set_cursor(cursor: int) -> None:
+    """Show the given system cursor, if the video driver has cursors (the dummy driver used headlessly does not)."""
+    try:
+        pygame.mouse.set_cursor(cursor)
+    except pygame.error:
+        pass
+
+
+def get_poster_url(movie_link_result: list[str]) -> str:
+    """Return the downloadable poster URL from the given API result, or "" if it has no poster."""
+    if movie_link_result[2] == "":
+        return ""
+    return "http" + movie_link_result[2][5:]
 
 
 # Defining result scene class
@@ -40,18 +67,30 @@ class ResultScene:
     """
     A result scene class to store the Pygame layout for the movie recommendation results.
 
+    The scene never blocks the render loop: movie links are fetched and posters are loaded in the background,
+    and draw fills in each movie's poster, rent button and IMDb badge as soon as its data arrives. Until then,
+    a placeholder is shown in its place.
+
     Instance Attributes:
     - movie_titles: Stores the movie titles of the movies that will be displayed on screen.
     - trailer_links: Stores a list of strings representing YouTube trailer links for the displayed movies.
     - poster_rects: Stores the pygame Rect objects for the movie posters.
     - rent_rects: Stores the pygame Rect objects for the movie rent buttons.
     - screen: Stores the pygame screen on which all objects and images will be displayed.
-    - posters_drawn: Stores whether the various objects, such as movie posters, have been drawn on screen.
+    - posters_drawn: Stores whether every movie's poster and links have been drawn on screen.
     - link_results: Stores a list of lists, where each inner list contains relevant links for each movie on screen.
+    - links_drawn: Stores whether the rent button and IMDb badge of each movie have been drawn.
+    - poster_drawn: Stores whether the poster of each movie has been drawn (or given up on).
+    - start_time: perf_counter time at which the scene was created.
+    - first_paint_time: Seconds from creation until the first frame was drawn, or None before then.
+    - complete_time: Seconds from creation until every poster and link was drawn, or None before then.
+    - dirty_rects: Stores the screen regions changed since they were last pushed to the display.
+    - hovering: Stores whether a poster or rent button is currently highlighted.
 
     Representation Invariants:
     - len(self.movie_titles) == 10
     - all(len(movie_link_result) == 4 for movie_link_result in self.link_results)
+    - len(self.links_drawn) == len(self.poster_drawn) == len(self.movie_titles)
     """
     movie_titles: list[str]
     trailer_links: list[str]
@@ -61,50 +100,73 @@ class ResultScene:
     screen: pygame.Surface
     posters_drawn: bool
     link_results: list[list[str]]
+    links_drawn: list[bool]
+    poster_drawn: list[bool]
+    start_time: float
+    first_paint_time: Optional[float]
+    complete_time: Optional[float]
+    dirty_rects: list[pygame.Rect]
+    hovering: bool
+    _link_futures: dict[int, Future]
+    _link_font: pygame.font.Font
 
     def __init__(self, movie_titles: list[str]) -> None:
         """
         Initializer for the result scene class.
 
+        Links that are not in the metadata store are requested in the background; this returns immediately.
+
         Preconditions:
         - len(movie_titles) == 10
         """
+        self.start_time = time.perf_counter()
+        self.first_paint_time = None
+        self.complete_time = None
         self.screen = pygame.display.set_mode([1500, 850])
         self.movie_titles = movie_titles
-        self.trailer_links = []
-        self.poster_rects = []
-        self.rent_rects = []
+        self.trailer_links = [""] * len(movie_titles)
+        self.poster_rects = [pygame.Rect(location, DEFAULT_SIZE) for location in POSTER_LOCATIONS]
+        self.rent_rects = [pygame.Rect(x, y + DEFAULT_SIZE[1] + 10, 70, 30) for x, y in POSTER_LOCATIONS]
         self.posters_drawn = False
-        self.link_results = self.get_links_for_movies()
-
-    def get_links_for_movies(self) -> list[list[str]]:
-        """Return the rent, trailer and poster links for the movies contained in self.movie_titles,
-        along with the IMDb rating."""
-        link_results = []
-        for title in self.movie_titles:
-            try:
-                links = api_parser.run_api(title)
-            except KeyError:
-                try:
-                    links = api_parser.run_api(title, "9b0499a6d0msha5373448155f126p1dbc86jsne6e5da63ee3b")
-                except KeyError:
-                    try:
-                        links = api_parser.run_api(title, "45dfa9c982msh748b72a3ace08f7p1f4c84jsn30c598f9d44e")
-                    except KeyError:
-                        try:
-                            links = api_parser.run_api(title, "eff08fa849msh2a5ea7560fe2dfdp118e8bjsnfa6525831061")
-                        except KeyError:
-                            links = ["", "", "", ""]
-            link_results.append(links)
-        return link_results
-
-    def handle_event(self) -> None:
+        self.link_results = [list(api_parser.EMPTY_LINKS) for _ in movie_titles]
+        self.links_drawn = [False] * len(movie_titles)
+        self.poster_drawn = [False] * len(movie_titles)
+        self.dirty_rects = []
+        self.hovering = False
+        self._link_font = text_cache.get_font(25)
+        self._link_futures = {}
+        self.get_links_for_movies()
+
+    def get_links_for_movies(self) -> None:
+        """Look up the rent, trailer and poster links and the IMDb rating of every movie in self.movie_titles.
+
+        Movies found in the metadata store are filled into self.link_results at once; the rest are fetched from
+        the movie API on background threads and collected by draw."""
+        store = metadata_store.get_default_store()
+        for i, title in enumerate(self.movie_titles):
+            links = store.get(title)
+            with tracing.span("metadata_lookup", title=title, cache_hit=links is not None):
+                if links is None:
+                    self._link_futures[i] = LINK_EXECUTOR.submit(fetch_and_store_links, title)
+                else:
+                    self._set_links(i, links)
+
+    def _set_links(self, index: int, links: list[str]) -> None:
+        """Record the links of the movie at index and start loading its poster."""
+        self.link_results[index] = links
+        self.trailer_links[index] = links[1]
+        POSTER_PIPELINE.request(get_poster_url(links))
+
+    def handle_event(self, event_list: Optional[list[pygame.event.Event]] = None) -> None:
         """
         Check for user interaction with the current ResultScene, and update the current ResultScene attributes to
         respond to the user's interactions.
+
+        If event_list is not given, the events are taken from the pygame event queue.
         """
         # Checking program events
-        event_list = pygame.event.get()
+        if event_list is None:
+            event_list = pygame.event.get()
         rent_links = [w[0] for w in self.link_results]
         for event in event_list:
 
@@ -113,6 +175,10 @@ class ResultScene:
                 pygame.quit()
                 sys.exit()
 
+            # Redrawing everything if the window contents were lost
+            elif event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+                self.dirty_rects.append(self.screen.get_rect())
+
             # Checking mouse clicks
             elif event.type == pygame.MOUSEBUTTONDOWN:
                 for poster_rect_index in range(10):
@@ -141,97 +207,156 @@ class ResultScene:
                     poster_location = POSTER_LOCATIONS[i]
                     poster_x, poster_y = poster_location
                     if poster_x <= x <= poster_x + DEFAULT_SIZE[0] and poster_y <= y <= poster_y + DEFAULT_SIZE[1]:
-                        pygame.mouse.set_cursor(pygame.SYSTEM_CURSOR_HAND)
-                        pygame.draw.rect(self.screen, (255, 255, 255), (poster_x, poster_y, DEFAULT_SIZE[0],
-                                                                        DEFAULT_SIZE[1]),
-                                         3, border_radius=1)
+                        set_cursor(pygame.SYSTEM_CURSOR_HAND)
+                        self.dirty_rects.append(
+                            pygame.draw.rect(self.screen, (255, 255, 255), (poster_x, poster_y, DEFAULT_SIZE[0],
+                                                                            DEFAULT_SIZE[1]),
+                                             3, border_radius=1))
                         match = True
                         break
                 for poster_location in POSTER_LOCATIONS:
                     rent_x, rent_y = poster_location
                     rent_y += (DEFAULT_SIZE[1] + 10)
                     if rent_x <= x <= rent_x + 70 and rent_y <= y <= rent_y + 30:
-                        pygame.mouse.set_cursor(pygame.SYSTEM_CURSOR_HAND)
-                        pygame.draw.rect(self.screen, (255, 255, 255), (rent_x - 3, rent_y - 3, 76, 36),
-                                         3, border_radius=1)
+                        set_cursor(pygame.SYSTEM_CURSOR_HAND)
+                        self.dirty_rects.append(
+                            pygame.draw.rect(self.screen, (255, 255, 255), (rent_x - 3, rent_y - 3, 76, 36),
+                                             3, border_radius=1))
                         match = True
                         break
 
-                if not match:
-                    pygame.mouse.set_cursor(pygame.SYSTEM_CURSOR_ARROW)
+                # Erasing highlights only when the mouse has just left a poster or rent button
+                if not match and self.hovering:
+                    set_cursor(pygame.SYSTEM_CURSOR_ARROW)
                     for i in range(10):
                         poster_location = POSTER_LOCATIONS[i]
                         poster_x, poster_y = poster_location
-                        pygame.draw.rect(self.screen, (0, 0, 0), (poster_x, poster_y, DEFAULT_SIZE[0], DEFAULT_SIZE[1]),
-                                         3, border_radius=1)
+                        self.dirty_rects.append(
+                            pygame.draw.rect(self.screen, (0, 0, 0),
+                                             (poster_x, poster_y, DEFAULT_SIZE[0], DEFAULT_SIZE[1]),
+                                             3, border_radius=1))
                     for i in range(10):
                         poster_location = POSTER_LOCATIONS[i]
                         rent_x, rent_y = poster_location
                         rent_y += (DEFAULT_SIZE[1] + 10)
-                        pygame.draw.rect(self.screen, (0, 0, 0), (rent_x - 3, rent_y - 3, 76, 36),
-                                         3, border_radius=1)
+                        self.dirty_rects.append(
+                            pygame.draw.rect(self.screen, (0, 0, 0), (rent_x - 3, rent_y - 3, 76, 36),
+                                             3, border_radius=1))
+                self.hovering = match
+
+    def _collect_links(self) -> None:
+        """Move every finished background link request into self.link_results."""
+        for i, future in list(self._link_futures.items()):
+            if future.done():
+                del self._link_futures[i]
+                self._set_links(i, future.result())
+
+    def take_dirty_rects(self) -> list[pygame.Rect]:
+        """Return the screen regions changed since the last call, and forget them."""
+        dirty_rects, self.dirty_rects = self.dirty_rects, []
+        return dirty_rects
+
+    def needs_update(self) -> bool:
+        """Return whether the scene is still waiting for links or posters, and so must keep drawing even if no
+        new events arrive."""
+        return not self.posters_drawn
+
+    def _draw_placeholder(self, index: int) -> None:
+        """Draw an empty poster, rent button and IMDb badge for the movie at index."""
+        pygame.draw.rect(self.screen, PLACEHOLDER_COLOR, self.poster_rects[index])
+        title_surface = text_cache.TEXT_CACHE.render(self._link_font, f"{index + 1}", LINK_COLOR)
+        self.screen.blit(title_surface, title_surface.get_rect(center=self.poster_rects[index].center))
+        pygame.draw.rect(self.screen, pygame.Color(21, 21, 81), self.rent_rects[index])
+        pygame.draw.rect(self.screen, pygame.Color(21, 21, 81), self._rating_rect(index))
+        self.dirty_rects.extend([self.poster_rects[index], self.rent_rects[index], self._rating_rect(index)])
+
+    def _draw_links(self, index: int) -> None:
+        """Draw the rent button and IMDb badge for the movie at index."""
+        rent_rect = self.rent_rects[index]
+        rent_surface = text_cache.TEXT_CACHE.render(self._link_font, 'Rent', LINK_COLOR)
+        pygame.draw.rect(self.screen, pygame.Color(21, 21, 81), rent_rect)
+        self.screen.blit(rent_surface, (rent_rect.x + 5, rent_rect.y + 5))
+
+        rating_rect = self._rating_rect(index)
+        rating_surface = text_cache.TEXT_CACHE.render(self._link_font, self.link_results[index][3], LINK_COLOR)
+        pygame.draw.rect(self.screen, pygame.Color(21, 21, 81), rating_rect)
+        self.screen.blit(rating_surface, (rating_rect.x + 23, rating_rect.y + 5))
+        self.dirty_rects.extend([rent_rect, rating_rect])
+
+    @staticmethod
+    def _rating_rect(index: int) -> pygame.Rect:
+        """Return the rect of the IMDb badge for the movie at index."""
+        coordinate_x = POSTER_LOCATIONS[index][0] + DEFAULT_SIZE[0] - 70
+        coordinate_y = POSTER_LOCATIONS[index][1] + DEFAULT_SIZE[1] + 10
+        return pygame.Rect(coordinate_x, coordinate_y, 70, 30)
 
     def draw(self) -> None:
         """
         Display movie posters and corresponding trailer/rent links on the current ResultScene's Pygame window,
         given the list of movie data from self.link_results.
-        """
-        link_font = pygame.font.SysFont('trebuchetms', 25)
-        poster_location_index = 0
 
-        # Displaying poster info
-        for movie_link_result in self.link_results:
-            if self.posters_drawn:
+        Only what changed since the previous call is drawn, and the changed regions are added to
+        self.dirty_rects, so this is cheap to call every frame.
+        """
+        if self.posters_drawn:
+            return
+
+        # Drawing placeholders on the first frame
+        if self.first_paint_time is None:
+            self.dirty_rects.append(self.screen.get_rect())
+            for i in range(len(self.movie_titles)):
+                self._draw_placeholder(i)
+
+        # Collecting finished background work
+        self._collect_links()
+        POSTER_PIPELINE.poll()
+
+        # Displaying poster info as it arrives
+        for i, movie_link_result in enumerate(self.link_results):
+            if i in self._link_futures:
                 continue
 
-            # Adding trailer links
-            self.trailer_links.append(movie_link_result[1])
-
-            # Fixing url and converting to image
-            poster_link = "http" + movie_link_result[2][5:]
-            with urlopen(poster_link) as image_str:
-                image_str = image_str.read()
-            image_file = io.BytesIO(image_str)
-            image = pygame.image.load(image_file)
-
-            # Scaling image and drawing on screen
-            image = pygame.transform.scale(image, DEFAULT_SIZE)
-            image_rect = image.get_rect(topleft=POSTER_LOCATIONS[poster_location_index])
-            self.screen.blit(image, image_rect)
-
-            # Adding poster rect object to class attribute
-            self.poster_rects.append(image_rect)
-
-            # Creating rent text
-            coordinate_x = POSTER_LOCATIONS[poster_location_index][0]
-            coordinate_y = POSTER_LOCATIONS[poster_location_index][1] + DEFAULT_SIZE[1] + 10
-            rent_rect = pygame.Rect(coordinate_x, coordinate_y, 70, 30)
-            rent_surface = link_font.render('Rent', True, pygame.Color('darkgoldenrod'))
-            pygame.draw.rect(self.screen, pygame.Color(21, 21, 81), rent_rect)
-            self.screen.blit(rent_surface, (rent_rect.x + 5, rent_rect.y + 5))
-
-            # Updating class attribute
-            self.rent_rects.append(rent_rect)
-
-            # Creating rating text
-            coordinate_x = POSTER_LOCATIONS[poster_location_index][0] + DEFAULT_SIZE[0] - 70
-            coordinate_y = POSTER_LOCATIONS[poster_location_index][1] + DEFAULT_SIZE[1] + 10
-            rating_rect = pygame.Rect(coordinate_x, coordinate_y, 70, 30)
-            rating_surface = link_font.render(movie_link_result[3], True, pygame.Color('darkgoldenrod'))
-            pygame.draw.rect(self.screen, pygame.Color(21, 21, 81), rating_rect)
-            self.screen.blit(rating_surface, (rating_rect.x + 23, rating_rect.y + 5))
-
-            # Updating loop index
-            poster_location_index += 1
-
-        # Updating draw boolean
-        self.posters_drawn = True
+            if not self.links_drawn[i]:
+                self._draw_links(i)
+                self.links_drawn[i] = True
+
+            poster_url = get_poster_url(movie_link_result)
+            if not self.poster_drawn[i] and not POSTER_PIPELINE.is_pending(poster_url):
+                image = POSTER_PIPELINE.get(poster_url)
+                if image is not None:
+                    self.dirty_rects.append(self.screen.blit(image, self.poster_rects[i]))
+                self.poster_drawn[i] = True
+
+        # Updating timings and draw boolean
+        if self.first_paint_time is None:
+            self.first_paint_time = time.perf_counter() - self.start_time
+        if all(self.poster_drawn):
+            self.posters_drawn = True
+            self.complete_time = time.perf_counter() - self.start_time
+            metadata_store.get_default_store().save()
+
+
+def fetch_and_store_links(title: str) -> list[str]:
+    """Return the API result for the given title and add it to the metadata store.
+
+    Only successful lookups are stored: after a network error, or when every API key is rejected, EMPTY_LINKS
+    is returned and the title is fetched again next time it is shown."""
+    try:
+        links = api_parser.fetch_links(title, API_URL)
+    except (requests.RequestException, ValueError):
+        links = None
+    if links is None:
+        return list(api_parser.EMPTY_LINKS)
+    metadata_store.get_default_store().put(title, links)
+    return links
 
 
 # Testing code
 if __name__ == "__main__":
     python_ta.check_all(config={
-        'extra-imports': ["annotations", "io", "sys", "pygame", "webbrowser", "api_parser", "urllib.request"],
+        'extra-imports': ["annotations", "concurrent.futures", "typing", "sys", "time", "pygame", "webbrowser",
+                          "requests", "api_parser", "metadata_store", "poster_cache",
+                          "text_cache", "tracing"],
         'allowed-io': [],
         'disable': ["too-many-branches", "too-many-nested-blocks"],
         'generated-members': ['pygame.*'],
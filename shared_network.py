@@ -0,0 +1,456 @@
+"""
+CSC111 Final Project - Phase 2: Data Parsing - Shared-Memory Review Network
+
+Description
+===============================
+
+This Python module exports a ReviewNetwork into flat, read-only arrays in
+one block of shared memory, so that many recommender processes can attach
+to a single copy of the ratings instead of each loading its own object
+graph. Forked workers would not share the object graph for long anyway:
+updating reference counts writes to every page it touches.
+
+The ratings are stored twice in compressed sparse row (CSR) form: grouped
+by movie (who rated it) and grouped by user (what they rated). Ratings are
+quantized to one byte when they are all whole or half stars. Titles and
+genre names are stored as UTF-8 bytes. run_search_on_all below is the same
+recommender as graph_traversal.run_search_on_all, working on these arrays.
+
+    python -c "import sys, shared_network; shared_network.main(sys.argv[1:])" --workers 4
+
+Copyright and Usage Information
+===============================
+
+This file is provided solely for the TA's and Computer Science Professors
+at the University of Toronto St. George campus. All forms of distribution
+of this code, whether as given or with any changes, are expressly prohibited.
+
+This file is Copyright (c) 2023 Guransh Singh, Nauhar Kapur, Shahbaz Nanda,
+and Raunak Madan.
+"""
+# Importing libraries
+from __future__ import annotations
+from array import array
+from multiprocessing import shared_memory
+from typing import Optional
+import argparse
+import json
+import multiprocessing
+import random
+import struct
+import time
+import python_ta
+import data_parsing
+import graph_traversal
+import movie_classes
+
+
+# Program constants
+MAGIC = b"FLICKNET"
+FORMAT_VERSION = 2
+HEADER = struct.Struct("<8sII")
+ALIGNMENT = 8
+NUM_NEIGHBOURS = 10
+
+QUANTIZED_SCALE = 2
+
+# Name and array typecode of every section of the layout, in the order they are stored. The rating sections are
+# stored as bytes holding rating * QUANTIZED_SCALE when every rating is a whole or half star; rating_scale holds
+# the single number the stored ratings must be divided by.
+SECTIONS = [("movie_offsets", "q"), ("movie_users", "i"), ("movie_ratings", "d"),
+            ("user_offsets", "q"), ("user_movies", "i"), ("user_ratings", "d"), ("user_ids", "q"),
+            ("genre_offsets", "q"), ("genre_ids", "i"),
+            ("title_offsets", "q"), ("title_bytes", "B"),
+            ("genre_name_offsets", "q"), ("genre_name_bytes", "B"),
+            ("rating_scale", "q")]
+
+
+def _encode_strings(strings: list[str]) -> tuple[array, array]:
+    """Return the offsets and concatenated UTF-8 bytes of strings; string i is bytes[offsets[i]:offsets[i + 1]].
+    """
+    offsets = array("q", [0])
+    data = bytearray()
+    for string in strings:
+        data += string.encode("utf-8")
+        offsets.append(len(data))
+    return offsets, array("B", data)
+
+
+def build_arrays(network: movie_classes.ReviewNetwork) -> dict[str, array]:
+    """Return the arrays of every section of the layout for network. Movies and users are numbered in the order
+    of network.movies and network.users."""
+    movies = list(network.movies.values())
+    users = list(network.users.values())
+    movie_numbers = {movie: i for i, movie in enumerate(movies)}
+    user_numbers = {user: i for i, user in enumerate(users)}
+    genre_names = sorted({genre for movie in movies for genre in movie.genre})
+    genre_numbers = {genre: i for i, genre in enumerate(genre_names)}
+
+    arrays = {name: array(typecode) for name, typecode in SECTIONS}
+    arrays["movie_offsets"].append(0)
+    arrays["genre_offsets"].append(0)
+    for movie in movies:
+        for user in movie.users_rated_by:
+            arrays["movie_users"].append(user_numbers[user])
+            arrays["movie_ratings"].append(user.movies_rated[movie].rating)
+        arrays["movie_offsets"].append(len(arrays["movie_users"]))
+        arrays["genre_ids"].extend(genre_numbers[genre] for genre in movie.genre)
+        arrays["genre_offsets"].append(len(arrays["genre_ids"]))
+
+    arrays["user_offsets"].append(0)
+    for user in users:
+        arrays["user_ids"].append(user.user_id)
+        for movie, rating in user.movies_rated.items():
+            arrays["user_movies"].append(movie_numbers[movie])
+            arrays["user_ratings"].append(rating.rating)
+        arrays["user_offsets"].append(len(arrays["user_movies"]))
+
+    arrays["title_offsets"], arrays["title_bytes"] = _encode_strings([movie.title for movie in movies])
+    arrays["genre_name_offsets"], arrays["genre_name_bytes"] = _encode_strings(genre_names)
+
+    if all((rating * QUANTIZED_SCALE).is_integer() for rating in arrays["user_ratings"]):
+        for name in ["movie_ratings", "user_ratings"]:
+            arrays[name] = array("B", (int(rating * QUANTIZED_SCALE) for rating in arrays[name]))
+        arrays["rating_scale"].append(QUANTIZED_SCALE)
+    else:
+        arrays["rating_scale"].append(1)
+    return arrays
+
+
+def _align(offset: int) -> int:
+    """Return offset rounded up to a multiple of ALIGNMENT."""
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def _plan_layout(arrays: dict[str, array]) -> tuple[bytes, dict[str, tuple[int, int, str]], int]:
+    """Return the encoded directory, the (byte offset, item count, typecode) of every section, and the total
+    size."""
+    # the directory's size depends on the offsets written in it, so it is encoded with room to spare
+    placeholder = {name: [0, len(arrays[name]), arrays[name].typecode] for name, _ in SECTIONS}
+    reserved = _align(HEADER.size + len(json.dumps(placeholder)) + 32 * len(SECTIONS))
+    positions = {}
+    offset = reserved
+    for name, _ in SECTIONS:
+        positions[name] = (offset, len(arrays[name]), arrays[name].typecode)
+        offset = _align(offset + arrays[name].itemsize * len(arrays[name]))
+    directory = json.dumps(positions).encode()
+    assert HEADER.size + len(directory) <= reserved
+    return directory, positions, offset
+
+
+def layout_size(arrays: dict[str, array]) -> int:
+    """Return the number of bytes write_layout needs for arrays."""
+    return _plan_layout(arrays)[2]
+
+
+def write_layout(buffer: memoryview, arrays: dict[str, array]) -> None:
+    """Write arrays into buffer (of at least layout_size(arrays) bytes) in the layout read_layout reads."""
+    directory, positions, _ = _plan_layout(arrays)
+    HEADER.pack_into(buffer, 0, MAGIC, FORMAT_VERSION, len(directory))
+    buffer[HEADER.size:HEADER.size + len(directory)] = directory
+    for name, _ in SECTIONS:
+        offset = positions[name][0]
+        data = arrays[name].tobytes()
+        buffer[offset:offset + len(data)] = data
+
+
+def write_layout_file(path: str, arrays: dict[str, array]) -> int:
+    """Write arrays to the file at path in the layout read_layout reads, one section at a time (so no copy of the
+    whole layout is made in memory), and return the size of the file."""
+    directory, positions, size = _plan_layout(arrays)
+    with open(path, "wb") as file:
+        file.write(HEADER.pack(MAGIC, FORMAT_VERSION, len(directory)) + directory)
+        for name, _ in SECTIONS:
+            file.seek(positions[name][0])
+            arrays[name].tofile(file)
+        file.truncate(size)
+    return size
+
+
+def read_layout(buffer: memoryview) -> dict[str, memoryview]:
+    """Return a read-only typed view of every section of the layout in buffer, without copying.
+
+    Raise ValueError if buffer does not hold a layout of this FORMAT_VERSION."""
+    magic, version, directory_length = HEADER.unpack_from(buffer, 0)
+    if magic != MAGIC or version != FORMAT_VERSION:
+        raise ValueError(f"not a version {FORMAT_VERSION} review network layout")
+    positions = json.loads(bytes(buffer[HEADER.size:HEADER.size + directory_length]))
+    read_only = buffer.toreadonly()
+    views = {}
+    for name, _ in SECTIONS:
+        offset, count, typecode = positions[name]
+        views[name] = read_only[offset:offset + count * array(typecode).itemsize].cast(typecode)
+    return views
+
+
+class ArrayNetwork:
+    """
+    A read-only review network stored in flat arrays (see build_arrays), such as views of shared memory.
+
+    Movies and users are referred to by their number: their position in the arrays.
+
+    Instance Attributes:
+    - num_movies: number of movies
+    - num_users: number of users
+    - rating_scale: the number every stored rating must be divided by to get the rating
+    - views: the typed view of every section of the layout
+
+    Representation Invariants:
+    - len(self.views["movie_offsets"]) == self.num_movies + 1
+    - len(self.views["user_offsets"]) == self.num_users + 1
+    """
+    num_movies: int
+    num_users: int
+    rating_scale: int
+    views: dict[str, memoryview]
+    _title_numbers: Optional[dict[str, int]]
+
+    def __init__(self, views: dict[str, memoryview]) -> None:
+        """Initialize a network over the given section views."""
+        self.views = views
+        self.num_movies = len(views["movie_offsets"]) - 1
+        self.num_users = len(views["user_offsets"]) - 1
+        self.rating_scale = views["rating_scale"][0]
+        self._title_numbers = None
+
+    def title(self, movie: int) -> str:
+        """Return the title of the given movie."""
+        offsets = self.views["title_offsets"]
+        return bytes(self.views["title_bytes"][offsets[movie]:offsets[movie + 1]]).decode("utf-8")
+
+    def movie_number(self, title: str) -> int:
+        """Return the number of the movie with the given title, or raise KeyError if there is none.
+
+        The first call builds a title lookup table in this process."""
+        if self._title_numbers is None:
+            self._title_numbers = {self.title(i): i for i in range(self.num_movies)}
+        return self._title_numbers[title]
+
+    def genres(self, movie: int) -> list[int]:
+        """Return the genre numbers of the given movie."""
+        offsets = self.views["genre_offsets"]
+        return list(self.views["genre_ids"][offsets[movie]:offsets[movie + 1]])
+
+    def release(self) -> None:
+        """Release every view, so the memory under them can be closed."""
+        for view in self.views.values():
+            view.release()
+        self.views = {}
+
+
+class SharedNetwork:
+    """
+    A review network exported into a block of shared memory that other processes can attach to by name.
+
+    The process that creates the block owns it and must unlink it when every process is done; every process,
+    owner included, must close its own handle.
+
+    Instance Attributes:
+    - name: the name other processes attach with
+    - network: the ArrayNetwork over the shared block
+    - owner: whether this process created the block
+    """
+    name: str
+    network: ArrayNetwork
+    owner: bool
+    _memory: shared_memory.SharedMemory
+
+    def __init__(self, memory: shared_memory.SharedMemory, owner: bool) -> None:
+        """Initialize a handle on memory. Use create or attach instead."""
+        self._memory = memory
+        self.name = memory.name
+        self.owner = owner
+        self.network = ArrayNetwork(read_layout(memory.buf))
+
+    @staticmethod
+    def create(network: movie_classes.ReviewNetwork, name: Optional[str] = None) -> SharedNetwork:
+        """Export network into a new shared memory block, and return the owning handle."""
+        arrays = build_arrays(network)
+        memory = shared_memory.SharedMemory(name=name, create=True, size=layout_size(arrays))
+        write_layout(memory.buf, arrays)
+        return SharedNetwork(memory, owner=True)
+
+    @staticmethod
+    def attach(name: str) -> SharedNetwork:
+        """Return a handle on the existing shared network with the given name."""
+        return SharedNetwork(shared_memory.SharedMemory(name=name), owner=False)
+
+    def size(self) -> int:
+        """Return the size of the shared block in bytes."""
+        return self._memory.size
+
+    def close(self) -> None:
+        """Close this process's handle, and free the block if this process owns it."""
+        self.network.release()
+        self._memory.close()
+        if self.owner:
+            self._memory.unlink()
+
+
+def run_search_on_all(network: ArrayNetwork, user_movies: dict[str, float],
+                      num_rec: int = 10) -> list[tuple[str, float]]:
+    """Return the best num_rec (title, score) recommendations for the user, given their watch history.
+
+    This scores movies exactly like graph_traversal.run_search_on_all; only the order of users with equally close
+    ratings (who decide between equal candidates) may differ.
+
+    Preconditions:
+    - all(title is the title of a movie in network for title in user_movies)
+    """
+    movie_offsets, movie_users, movie_ratings = (network.views["movie_offsets"], network.views["movie_users"],
+                                                 network.views["movie_ratings"])
+    user_offsets, user_movies_rated, user_ratings = (network.views["user_offsets"], network.views["user_movies"],
+                                                     network.views["user_ratings"])
+    # movie number -> [number of close users who rated it, genre score, total of their stored ratings]
+    accumulator = {}
+    scale = network.rating_scale
+    movie_threshold = graph_traversal.MOVIE_THRESHOLD * scale
+
+    for title, rating in user_movies.items():
+        movie = network.movie_number(title)
+        start, end = movie_offsets[movie], movie_offsets[movie + 1]
+
+        # Finding the closest users
+        closest = sorted(range(start, end), key=lambda k: abs(movie_ratings[k] - rating * scale))[:NUM_NEIGHBOURS]
+        neighbours = [(user_offsets[movie_users[k]], user_offsets[movie_users[k] + 1]) for k in closest]
+
+        # Finding all possible movies
+        possible_movies = {user_movies_rated[k] for first, last in neighbours for k in range(first, last)
+                           if user_ratings[k] >= movie_threshold}
+        possible_movies.discard(movie)
+
+        # Updating accumulator table
+        movie_genres = network.genres(movie)
+        for first, last in neighbours:
+            for k in range(first, last):
+                other = user_movies_rated[k]
+                if other not in possible_movies:
+                    continue
+                if other in accumulator:
+                    accumulator[other][0] += 1
+                    accumulator[other][2] += user_ratings[k]
+                else:
+                    other_genres = network.genres(other)
+                    genre_numerator = len([x for x in movie_genres if x in other_genres])
+                    genre_score = genre_numerator / (len(movie_genres) + len(other_genres) - genre_numerator)
+                    genre_score = 1 - genre_score if rating < graph_traversal.GENRE_THRESHOLD else genre_score
+                    accumulator[other] = [1, genre_score, user_ratings[k]]
+
+    # Computing final scores
+    final_scores = []
+    for other, (frequency, genre_score, total) in accumulator.items():
+        avg_score = total / (frequency * scale)
+        new_avg_score = ((avg_score - graph_traversal.SCORE_THRESHOLD) * frequency
+                         * graph_traversal.ADJUSTMENT_FACTOR) + avg_score
+        final_scores.append((other, new_avg_score * genre_score))
+
+    final_scores.sort(key=lambda x: x[1], reverse=True)
+    return [(network.title(other), score) for other, score in final_scores[:num_rec]]
+
+
+def read_memory_status() -> dict[str, int]:
+    """Return this process's resident memory in bytes: in total (VmRSS), private (RssAnon) and in shared memory
+    (RssShmem), read from /proc/self/status. Fields that cannot be read are left out."""
+    fields = {"VmRSS:": "rss", "RssAnon:": "private", "RssShmem:": "shared"}
+    status = {}
+    try:
+        with open("/proc/self/status", encoding="ascii") as file:
+            for line in file:
+                key = line.split(maxsplit=1)[0]
+                if key in fields:
+                    status[fields[key]] = int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return status
+
+
+def _worker(mode: str, source: str, queries: list[dict[str, float]], results: multiprocessing.Queue) -> None:
+    """Answer queries in a new process, on the shared network named source (mode "shared") or on the object
+    graph loaded from the ratings file source (mode "graph"), and put a report of its memory use in results."""
+    report = {"mode": mode, "before": read_memory_status()}
+    start = time.perf_counter()
+    shared, network = None, None
+    if mode == "shared":
+        shared = SharedNetwork.attach(source)
+    else:
+        network = data_parsing.load_review_network(source)
+    report["startup_s"] = time.perf_counter() - start
+    report["ready"] = read_memory_status()
+
+    start = time.perf_counter()
+    for ratings in queries:
+        if shared is not None:
+            run_search_on_all(shared.network, ratings)
+        else:
+            graph_traversal.run_search_on_all(ratings, 10, network)
+    report["query_s"] = time.perf_counter() - start
+    report["after"] = read_memory_status()
+    if shared is not None:
+        shared.close()
+    results.put(report)
+
+
+def run_workers(mode: str, source: str, queries: list[dict[str, float]], workers: int) -> list[dict]:
+    """Start workers fresh processes that each answer queries (see _worker), and return their reports."""
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    processes = [context.Process(target=_worker, args=(mode, source, queries, results)) for _ in range(workers)]
+    for process in processes:
+        process.start()
+    reports = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+    return reports
+
+
+def make_queries(network: movie_classes.ReviewNetwork, n: int, seed: int = 111) -> list[dict[str, float]]:
+    """Return n watch histories of one to five of the most rated movies in network."""
+    popular = sorted(network.movies, key=lambda t: -len(network.movies[t].users_rated_by))[:200]
+    rng = random.Random(seed)
+    return [{title: rng.choice([1.0, 2.5, 3.5, 4.0, 4.5, 5.0]) for title in rng.sample(popular, rng.randint(1, 5))}
+            for _ in range(n)]
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    """Compare the memory and start-up time of workers using the shared network with workers that each load the
+    object graph, and print the results."""
+    parser = argparse.ArgumentParser(description="Measure worker memory with a shared-memory review network.")
+    parser.add_argument("--csv", default=graph_traversal.DATA_FILE, help="ratings file to load")
+    parser.add_argument("--workers", type=int, default=4, help="worker processes of each kind")
+    parser.add_argument("--queries", type=int, default=200, help="queries answered by each worker")
+    args = parser.parse_args(argv)
+
+    network = data_parsing.load_review_network(args.csv)
+    queries = make_queries(network, args.queries)
+    start = time.perf_counter()
+    shared = SharedNetwork.create(network)
+    print(f"Exported {shared.network.num_movies} movies and {shared.network.num_users} users to shared memory "
+          f"{shared.name!r}: {shared.size() / 2 ** 20:.1f} MB in {time.perf_counter() - start:.2f}s")
+    try:
+        reports = run_workers("graph", args.csv, queries, args.workers) + \
+            run_workers("shared", shared.name, queries, args.workers)
+    finally:
+        shared.close()
+
+    mb = 2 ** -20
+    print(f"{'worker':<8}{'startup':>9}{'queries':>9}{'RSS before':>12}{'RSS ready':>11}{'RSS after':>11}"
+          f"{'private':>9}{'shared':>8}")
+    for report in reports:
+        after = report["after"]
+        print(f"{report['mode']:<8}{report['startup_s']:>8.3f}s{report['query_s']:>8.2f}s"
+              f"{report['before'].get('rss', 0) * mb:>10.1f}MB{report['ready'].get('rss', 0) * mb:>9.1f}MB"
+              f"{after.get('rss', 0) * mb:>9.1f}MB{after.get('private', 0) * mb:>7.1f}MB"
+              f"{after.get('shared', 0) * mb:>6.1f}MB")
+
+
+# Testing code
+if __name__ == "__main__":
+    python_ta.check_all(config={
+        'extra-imports': ["annotations", "array", "multiprocessing", "multiprocessing.shared_memory", "typing",
+                          "argparse", "json", "random", "struct", "time", "data_parsing", "graph_traversal",
+                          "movie_classes"],
+        'allowed-io': ["read_memory_status", "main"],
+        'max-line-length': 120
+    })
+
+    main()
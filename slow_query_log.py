@@ -0,0 +1,162 @@
+"""
+CSC111 Final Project - Phase 2: Data Parsing - Slow Query Log
+
+Description
+===============================
+
+This Python module records every recommendation query slower than a
+threshold, with its full watch history and the counters graph_traversal
+collected for it (raters scanned, neighbours chosen, candidates and
+accumulator entries, and the time of each phase), as one JSON object per
+line. A logged file can be replayed later to reproduce and study the worst
+queries:
+
+    python -c "import sys, slow_query_log; slow_query_log.main(sys.argv[1:])" slow_queries.jsonl --top 5
+
+Copyright and Usage Information
+===============================
+
+This file is provided solely for the TA's and Computer Science Professors
+at the University of Toronto St. George campus. All forms of distribution
+of this code, whether as given or with any changes, are expressly prohibited.
+
+This file is Copyright (c) 2023 Guransh Singh, Nauhar Kapur, Shahbaz Nanda,
+and Raunak Madan.
+"""
+# Importing libraries
+from __future__ import annotations
+from collections import deque
+from typing import Optional
+import argparse
+import json
+import threading
+import time
+import python_ta
+import data_parsing
+import graph_traversal
+import movie_classes
+
+
+# Program constants
+DEFAULT_THRESHOLD_MS = 50.0
+MAX_RECENT = 20
+
+
+class SlowQueryLog:
+    """
+    Receives the QueryStats of every search (as the graph_traversal query observer) and keeps those slower
+    than a threshold, appending them to a file if one is given.
+
+    Instance Attributes:
+    - threshold_seconds: queries that take at least this long are logged
+    - path: the JSON lines file slow queries are appended to, or None to keep them in memory only
+    - recent: the most recent slow queries, as JSON-compatible dictionaries, oldest first
+    - queries_seen: the number of queries observed
+    - slow_queries: the number of queries logged
+
+    Representation Invariants:
+    - self.threshold_seconds >= 0
+    - 0 <= self.slow_queries <= self.queries_seen
+    - len(self.recent) <= MAX_RECENT
+    """
+    threshold_seconds: float
+    path: Optional[str]
+    recent: deque[dict]
+    queries_seen: int
+    slow_queries: int
+    _lock: threading.Lock
+
+    def __init__(self, threshold_ms: float = DEFAULT_THRESHOLD_MS, path: Optional[str] = None) -> None:
+        """Initialize an empty log of the queries that take at least threshold_ms milliseconds."""
+        self.threshold_seconds = threshold_ms / 1000
+        self.path = path
+        self.recent = deque(maxlen=MAX_RECENT)
+        self.queries_seen = 0
+        self.slow_queries = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, stats: graph_traversal.QueryStats) -> None:
+        """Log stats if the query was slow."""
+        with self._lock:
+            self.queries_seen += 1
+            if stats.total_seconds < self.threshold_seconds:
+                return
+            self.slow_queries += 1
+            entry = {"logged_at": time.time(), "thread": threading.current_thread().name, **stats.to_json()}
+            self.recent.append(entry)
+            if self.path is not None:
+                with open(self.path, "a", encoding="utf-8") as file:
+                    file.write(json.dumps(entry) + "\n")
+
+    def install(self) -> SlowQueryLog:
+        """Start observing every query run by graph_traversal, and return this log."""
+        graph_traversal.set_query_observer(self)
+        return self
+
+    @staticmethod
+    def uninstall() -> None:
+        """Stop observing queries."""
+        graph_traversal.set_query_observer(None)
+
+    def snapshot(self) -> dict:
+        """Return the log's counts and its most recent slow queries as a JSON-compatible dictionary."""
+        with self._lock:
+            return {"threshold_ms": self.threshold_seconds * 1000, "queries_seen": self.queries_seen,
+                    "slow_queries": self.slow_queries, "recent": list(self.recent)}
+
+
+def read_log(path: str) -> list[dict]:
+    """Return the entries of the slow query log file at path, skipping lines that are not valid JSON."""
+    entries = []
+    with open(path, encoding="utf-8") as file:
+        for line in file:
+            try:
+                entries.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+    return entries
+
+
+def replay(entries: list[dict], review_network: movie_classes.ReviewNetwork) -> list[graph_traversal.QueryStats]:
+    """Run the query of every entry again on review_network and return their new statistics.
+
+    Entries with a title that is not in review_network are skipped."""
+    replayed = []
+    for entry in entries:
+        user_movies = entry["user_movies"]
+        if any(title not in review_network.movies for title in user_movies):
+            continue
+        stats = graph_traversal.QueryStats(dict(user_movies), entry["num_rec"])
+        graph_traversal.run_search_on_all(user_movies, entry["num_rec"], review_network, stats)
+        replayed.append(stats)
+    return replayed
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    """Replay a slow query log and print the slowest queries with their counters."""
+    parser = argparse.ArgumentParser(description="Replay the queries of a slow query log.")
+    parser.add_argument("log", help="slow query log to replay")
+    parser.add_argument("--csv", default=graph_traversal.DATA_FILE, help="ratings file to replay the queries on")
+    parser.add_argument("--top", type=int, default=10, help="number of slowest queries to show")
+    args = parser.parse_args(argv)
+
+    entries = read_log(args.log)
+    replayed = replay(entries, data_parsing.load_review_network(args.csv))
+    print(f"Replayed {len(replayed)} of {len(entries)} logged queries")
+    for stats in sorted(replayed, key=lambda s: -s.total_seconds)[:args.top]:
+        print(stats.summary())
+        for title, rating in stats.user_movies.items():
+            print(f"    {title} ({rating}): {stats.raters_scanned[title]} raters, {stats.neighbours[title]} "
+                  f"neighbours, {stats.candidates[title]} candidates")
+
+
+# Testing code
+if __name__ == "__main__":
+    python_ta.check_all(config={
+        'extra-imports': ["annotations", "collections", "typing", "argparse", "json", "threading", "time",
+                          "data_parsing", "graph_traversal", "movie_classes"],
+        'allowed-io': ["SlowQueryLog.__call__", "read_log", "main"],
+        'max-line-length': 120
+    })
+
+    main()
@@ -0,0 +1,217 @@
+"""
+CSC111 Final Project - Phase 3: UI Design and Implementation - Speculative Prefetching
+
+Description
+===============================
+
+This Python module contains the SpeculativePrefetcher class, which uses the
+idle time while the user fills in the MenuScene to compute recommendations
+for the rows entered so far, and to fetch the metadata and posters of the
+likely results before the user presses 'GO'.
+
+Copyright and Usage Information
+===============================
+
+This file is provided solely for the TA's and Computer Science Professors
+at the University of Toronto St. George campus. All forms of distribution
+of this code, whether as given or with any changes, are expressly prohibited.
+
+This file is Copyright (c) 2023 Guransh Singh, Nauhar Kapur, Shahbaz Nanda,
+and Raunak Madan.
+"""
+# Importing libraries
+from __future__ import annotations
+from typing import Optional
+import sys
+import threading
+import time
+import traceback
+import python_ta
+import graph_traversal
+import metadata_store
+import movie_classes
+import result_scene
+
+
+# Program constants
+DEBOUNCE_SECONDS = 0.4
+MAX_CACHED_SEARCHES = 8
+
+
+class SpeculativePrefetcher:
+    """
+    A background worker that runs the recommendation search on the user's current input once it has stopped
+    changing for debounce seconds, then prefetches the metadata and posters of the top results.
+
+    Work for inputs that have since changed is abandoned between steps, so the worker never spends long on
+    stale input.
+
+    Instance Attributes:
+    - debounce: seconds the input must stay unchanged before it is searched
+    - num_rec: number of recommendations computed per search
+    - searches_run: number of speculative searches completed
+    - searches_cancelled: number of speculative searches abandoned because the input changed
+    - metadata_prefetched: number of titles whose metadata was fetched speculatively
+    - errors: number of inputs whose search or prefetch raised an error
+    - recommendation_hits: number of recommend calls answered from a speculative search
+    - recommendation_misses: number of recommend calls that had to run the search
+    - metadata_hits: number of recommended titles whose metadata was already stored when recommend was called
+    - metadata_lookups: number of recommended titles checked for stored metadata
+
+    Representation Invariants:
+    - self.debounce >= 0
+    - self.num_rec > 0
+    - len(self._results) <= MAX_CACHED_SEARCHES
+    """
+    debounce: float
+    num_rec: int
+    searches_run: int
+    searches_cancelled: int
+    metadata_prefetched: int
+    errors: int
+    recommendation_hits: int
+    recommendation_misses: int
+    metadata_hits: int
+    metadata_lookups: int
+    _inputs: dict[str, float]
+    _generation: int
+    _searched_generation: int
+    _changed_at: float
+    _results: dict[frozenset, list[tuple[movie_classes.Movie, float]]]
+    _condition: threading.Condition
+    _thread: Optional[threading.Thread]
+
+    def __init__(self, debounce: float = DEBOUNCE_SECONDS, num_rec: int = 10) -> None:
+        """Initialize an idle prefetcher. Its worker thread starts on the first call to update."""
+        self.debounce = debounce
+        self.num_rec = num_rec
+        self.searches_run = 0
+        self.searches_cancelled = 0
+        self.metadata_prefetched = 0
+        self.errors = 0
+        self.recommendation_hits = 0
+        self.recommendation_misses = 0
+        self.metadata_hits = 0
+        self.metadata_lookups = 0
+        self._inputs = {}
+        self._generation = 0
+        self._searched_generation = 0
+        self._changed_at = 0.0
+        self._results = {}
+        self._condition = threading.Condition()
+        self._thread = None
+
+    def update(self, user_movies: dict[str, float]) -> None:
+        """
+        Tell the worker the user's current valid input, mapping movie titles to ratings.
+
+        This is cheap when the input has not changed, so it can be called every frame.
+        """
+        with self._condition:
+            if user_movies == self._inputs:
+                return
+            self._inputs = dict(user_movies)
+            self._generation += 1
+            self._changed_at = time.monotonic()
+            self._condition.notify()
+
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True, name="speculative-prefetch")
+            self._thread.start()
+
+    def recommend(self, user_movies: dict[str, float]) -> list[tuple[movie_classes.Movie, float]]:
+        """Return graph_traversal.run_search_on_all(user_movies, self.num_rec), reusing the speculative result
+        for the same input if there is one."""
+        with self._condition:
+            results = self._results.get(frozenset(user_movies.items()))
+        if results is None:
+            self.recommendation_misses += 1
+            results = graph_traversal.run_search_on_all(user_movies, self.num_rec)
+        else:
+            self.recommendation_hits += 1
+
+        store = metadata_store.get_default_store()
+        self.metadata_lookups += len(results)
+        self.metadata_hits += sum(1 for movie, _ in results if movie.title in store)
+        return results
+
+    def report(self) -> str:
+        """Return a one-line summary of how much speculative work was done and how much of it was used."""
+        total = self.recommendation_hits + self.recommendation_misses
+        search_rate = self.recommendation_hits / total if total else 0.0
+        metadata_rate = self.metadata_hits / self.metadata_lookups if self.metadata_lookups else 0.0
+        with self._condition:
+            counts = (f"{self.searches_run} searches run, {self.searches_cancelled} cancelled, "
+                      f"{self.metadata_prefetched} titles prefetched, {self.errors} failed")
+        return (f"Speculative prefetch: {counts}; search hit rate {search_rate:.0%}, "
+                f"metadata hit rate {metadata_rate:.0%}")
+
+    def _next_inputs(self) -> tuple[int, dict[str, float]]:
+        """Block until there is input that has not been searched and has been stable for self.debounce seconds,
+        then return its generation and a copy of it."""
+        with self._condition:
+            while True:
+                if self._searched_generation == self._generation or not self._inputs:
+                    self._condition.wait()
+                    continue
+                remaining = self._changed_at + self.debounce - time.monotonic()
+                if remaining > 0:
+                    self._condition.wait(remaining)
+                    continue
+                self._searched_generation = self._generation
+                return self._generation, dict(self._inputs)
+
+    def _run(self) -> None:
+        """Search and prefetch each stable input, forever.
+
+        An error while working on one input is reported on stderr and counted, and the worker moves on to the next
+        input, so speculation keeps running for the rest of the session."""
+        while True:
+            generation, inputs = self._next_inputs()
+            try:
+                self._search_and_prefetch(generation, inputs)
+            except Exception:  # pylint: disable=broad-exception-caught
+                with self._condition:
+                    self.errors += 1
+                print(f"Speculative prefetch failed for {inputs}:", file=sys.stderr)
+                traceback.print_exc(file=sys.stderr)
+
+    def _search_and_prefetch(self, generation: int, inputs: dict[str, float]) -> None:
+        """Search for the input of the given generation, cache the results and prefetch their metadata, unless
+        the input changes first."""
+        results = graph_traversal.run_search_on_all(inputs, self.num_rec)
+        with self._condition:
+            if generation != self._generation:
+                self.searches_cancelled += 1
+                return
+            if len(self._results) >= MAX_CACHED_SEARCHES:
+                self._results.pop(next(iter(self._results)))
+            self._results[frozenset(inputs.items())] = results
+            self.searches_run += 1
+        self._prefetch([movie.title for movie, _ in results], generation)
+
+    def _prefetch(self, titles: list[str], generation: int) -> None:
+        """Fetch the metadata and start loading the posters of titles, stopping early if the input changes."""
+        store = metadata_store.get_default_store()
+        for title in titles:
+            with self._condition:
+                if generation != self._generation:
+                    self.searches_cancelled += 1
+                    return
+            links = store.get(title)
+            if links is None:
+                links = result_scene.fetch_and_store_links(title)
+                with self._condition:
+                    self.metadata_prefetched += 1
+            result_scene.POSTER_PIPELINE.request(result_scene.get_poster_url(links))
+        store.save()
+
+
+# Testing code
+if __name__ == "__main__":
+    python_ta.check_all(config={
+        'extra-imports': ["annotations", "typing", "sys", "threading", "time", "traceback", "graph_traversal",
+                          "metadata_store", "movie_classes", "result_scene"],
+        'allowed-io': ["SpeculativePrefetcher._run"],
+        'max-line-length': 120
+    })
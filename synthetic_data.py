@@ -0,0 +1,162 @@
+"""
+CSC111 Final Project - Phase 2: Data Parsing - Synthetic Review Networks
+
+Description
+===============================
+
+This Python module generates seeded, synthetic rating data shaped like the
+bundled dataset, at any size, for benchmarks. Movie popularity follows a
+Zipf-like law whose skew can be changed, the number of ratings per user is
+log-normal (a few heavy raters and many light ones, as in the real data),
+and ratings are half stars around each movie's quality and each user's
+leniency.
+
+The same seed always gives the same ratings, in the same order.
+
+Copyright and Usage Information
+===============================
+
+This file is provided solely for the TA's and Computer Science Professors
+at the University of Toronto St. George campus. All forms of distribution
+of this code, whether as given or with any changes, are expressly prohibited.
+
+This file is Copyright (c) 2023 Guransh Singh, Nauhar Kapur, Shahbaz Nanda,
+and Raunak Madan.
+"""
+# Importing libraries
+from __future__ import annotations
+from dataclasses import dataclass, replace
+from itertools import accumulate
+from typing import Iterator
+import csv
+import math
+import random
+import python_ta
+import movie_classes
+
+
+# Program constants
+GENRES = ["Drama", "Comedy", "Thriller", "Action", "Romance", "Crime", "Adventure", "Science Fiction", "Horror",
+          "Fantasy", "Mystery", "Family", "History", "Documentary", "Music", "War", "Foreign", "Animation",
+          "Western", "TV Movie"]
+# How often each genre appears in the bundled dataset, in the same order as GENRES
+GENRE_WEIGHTS = [1514, 839, 666, 530, 525, 426, 348, 309, 267, 221, 211, 144, 130, 106, 100, 87, 81, 71, 60, 23]
+RATINGS_SPREAD = 1.1
+
+
+@dataclass(frozen=True)
+class SyntheticSpec:
+    """
+    The shape of a synthetic dataset. The defaults match the bundled dataset.
+
+    Instance Attributes:
+    - num_users: number of users
+    - num_movies: number of movies
+    - ratings_per_user: average number of ratings per user
+    - skew: exponent of the popularity law; 0 makes every movie equally popular, higher values concentrate
+      ratings on fewer movies
+    - seed: seed of the random generator
+
+    Representation Invariants:
+    - self.num_users > 0
+    - self.num_movies > 0
+    - 1 <= self.ratings_per_user <= self.num_movies
+    - self.skew >= 0
+    """
+    num_users: int = 671
+    num_movies: int = 2794
+    ratings_per_user: float = 66.8
+    skew: float = 0.7
+    seed: int = 111
+
+    @staticmethod
+    def for_rows(num_rows: int, skew: float = 0.7, seed: int = 111) -> SyntheticSpec:
+        """Return a spec shaped like the bundled dataset with about num_rows ratings in total."""
+        default = SyntheticSpec(skew=skew, seed=seed)
+        return default.scaled(num_rows / (default.num_users * default.ratings_per_user))
+
+    def scaled(self, factor: float) -> SyntheticSpec:
+        """Return this spec with factor times as many users and movies."""
+        return replace(self, num_users=max(1, round(self.num_users * factor)),
+                       num_movies=max(1, round(self.num_movies * factor)))
+
+    def label(self) -> str:
+        """Return a short description of the spec."""
+        return (f"{self.num_users}u/{self.num_movies}m/{self.ratings_per_user:g}rpu/skew{self.skew:g}"
+                f"/seed{self.seed}")
+
+
+def movie_title(movie: int) -> str:
+    """Return the title of the synthetic movie with the given number."""
+    return f"Synthetic Movie {movie:07d}"
+
+
+def iter_ratings(spec: SyntheticSpec) -> Iterator[tuple[int, str, list[str], float]]:
+    """Yield (user id, title, genres, rating) for every rating of the synthetic dataset described by spec, user
+    by user. Movie number 0 is the most popular.
+
+    Users are numbered from 1, like in the bundled dataset."""
+    rng = random.Random(spec.seed)
+    genres = [rng.choices(GENRES, GENRE_WEIGHTS, k=rng.randint(1, 4)) for _ in range(spec.num_movies)]
+    genres = [list(dict.fromkeys(movie_genres)) for movie_genres in genres]
+    quality = [rng.gauss(3.4, 0.5) for _ in range(spec.num_movies)]
+    cumulative = list(accumulate(1 / (rank + 1) ** spec.skew for rank in range(spec.num_movies)))
+    mu = math.log(spec.ratings_per_user) - RATINGS_SPREAD ** 2 / 2
+    movies = range(spec.num_movies)
+
+    for user_id in range(1, spec.num_users + 1):
+        count = min(spec.num_movies, max(3, round(rng.lognormvariate(mu, RATINGS_SPREAD))))
+        leniency = rng.gauss(0, 0.4)
+        rated = set()
+        while len(rated) < count:
+            rated.update(rng.choices(movies, cum_weights=cumulative, k=count - len(rated)))
+        for movie in sorted(rated):
+            stars = round((quality[movie] + leniency + rng.gauss(0, 0.8)) * 2) / 2
+            yield user_id, movie_title(movie), genres[movie], min(5.0, max(0.5, stars))
+
+
+def write_csv(spec: SyntheticSpec, csv_file: str) -> int:
+    """Write the synthetic dataset described by spec to csv_file in the format of the bundled ratings file (index,
+    userId, rating, MovieTitle and hyphen-joined Genre columns), and return the number of rows written."""
+    rows = 0
+    with open(csv_file, "w", newline="", encoding="utf-8") as file:
+        writer = csv.writer(file)
+        writer.writerow(["", "userId", "rating", "MovieTitle", "Genre"])
+        for user_id, title, genres, rating in iter_ratings(spec):
+            writer.writerow([rows, user_id, rating, title, "-".join(genres)])
+            rows += 1
+    return rows
+
+
+def generate_network(spec: SyntheticSpec) -> movie_classes.ReviewNetwork:
+    """Return the ReviewNetwork of the synthetic dataset described by spec."""
+    review_network = movie_classes.ReviewNetwork()
+    for user_id, title, genres, rating in iter_ratings(spec):
+        review_network.add_rating(user_id, title, genres, rating)
+    return review_network
+
+
+def make_queries(review_network: movie_classes.ReviewNetwork, n: int, seed: int = 111) -> list[dict[str, float]]:
+    """Return a fixed mix of n watch histories on review_network: one to five movies each, mostly popular ones
+    (from the top 5%) with some from the rest of the catalog, with both high and low ratings."""
+    rng = random.Random(seed)
+    ranked = sorted(review_network.movies, key=lambda t: (-len(review_network.movies[t].users_rated_by), t))
+    popular = ranked[:max(5, len(ranked) // 20)]
+    queries = []
+    for _ in range(n):
+        size = rng.randint(1, 5)
+        titles = set()
+        while len(titles) < min(size, len(ranked)):
+            titles.add(rng.choice(popular if rng.random() < 0.8 else ranked))
+        queries.append({title: rng.choice([1.0, 2.0, 3.0, 3.5, 4.0, 4.5, 5.0]) for title in sorted(titles)})
+    return queries
+
+
+# Testing code
+if __name__ == "__main__":
+    python_ta.check_all(config={
+        'extra-imports': ["annotations", "dataclasses", "itertools", "typing", "csv", "math", "random",
+                          "movie_classes"],
+        'allowed-io': ["write_csv"],
+        'max-line-length': 120
+    })
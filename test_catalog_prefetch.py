@@ -0,0 +1,73 @@
+"""
+CSC111 Final Project - Phase 3: UI Design and Implementation - Catalog Prefetcher Tests
+
+Description
+===============================
+
+This Python module tests catalog_prefetch.prefetch_catalog end to end
+against a local fake_provider, with a metadata store in a temporary
+directory.
+
+    python -m pytest test_catalog_prefetch.py
+
+Copyright and Usage Information
+===============================
+
+This file is provided solely for the TA's and Computer Science Professors
+at the University of Toronto St. George campus. All forms of distribution
+of this code, whether as given or with any changes, are expressly prohibited.
+
+This file is Copyright (c) 2023 Guransh Singh, Nauhar Kapur, Shahbaz Nanda,
+and Raunak Madan.
+"""
+# Importing libraries
+from __future__ import annotations
+from pathlib import Path
+import os
+import pytest
+import api_parser
+import catalog_prefetch
+import fake_provider
+import metadata_store
+
+
+# Program constants
+TITLES = ["Toy Story", "Heat", "Jumanji", "Casino", "Sabrina", "Othello"]
+MISSING_TITLES = {"Jumanji", "Othello"}
+
+
+def test_prefetch_resumes_and_stores_missing_titles(tmp_path: Path) -> None:
+    """Test that an interrupted run is resumed by the next one, and that titles the provider does not know are
+    stored as EMPTY_LINKS."""
+    store_path = os.path.join(tmp_path, "metadata_store.json")
+    with fake_provider.FakeProvider(missing_titles=MISSING_TITLES) as provider:
+        first = catalog_prefetch.prefetch_catalog(TITLES, metadata_store.MetadataStore(store_path), 0,
+                                                  provider.search_url, limit=3)
+        second = catalog_prefetch.prefetch_catalog(TITLES, metadata_store.MetadataStore(store_path), 0,
+                                                   provider.search_url)
+
+    assert (first.fetched, first.skipped, first.failed) == (3, 0, [])
+    assert (second.fetched, second.skipped, second.failed) == (3, 3, [])
+
+    store = metadata_store.MetadataStore(store_path)
+    assert len(store) == len(TITLES)
+    for title in TITLES:
+        if title in MISSING_TITLES:
+            assert store.get(title) == api_parser.EMPTY_LINKS
+        else:
+            assert store.get(title) != api_parser.EMPTY_LINKS
+
+
+def test_prefetch_does_not_store_failed_lookups(tmp_path: Path) -> None:
+    """Test that titles whose every request fails are reported as failed and not stored."""
+    store_path = os.path.join(tmp_path, "metadata_store.json")
+    with fake_provider.FakeProvider(error_rate=1.0) as provider:
+        report = catalog_prefetch.prefetch_catalog(TITLES, metadata_store.MetadataStore(store_path), 0,
+                                                   provider.search_url)
+
+    assert (report.fetched, report.skipped, report.failed) == (0, 0, TITLES)
+    assert len(metadata_store.MetadataStore(store_path)) == 0
+
+
+if __name__ == "__main__":
+    pytest.main(["test_catalog_prefetch.py"])
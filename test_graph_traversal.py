@@ -0,0 +1,65 @@
+"""
+CSC111 Final Project - Phase 2: Data Parsing - Recommendation Tests
+
+Description
+===============================
+
+This Python module tests graph_traversal.run_search_on_all on the bundled
+ratings file, with the movie statistics set so that short search results
+are topped up from the genre lists.
+
+    python -m pytest test_graph_traversal.py
+
+Copyright and Usage Information
+===============================
+
+This file is provided solely for the TA's and Computer Science Professors
+at the University of Toronto St. George campus. All forms of distribution
+of this code, whether as given or with any changes, are expressly prohibited.
+
+This file is Copyright (c) 2023 Guransh Singh, Nauhar Kapur, Shahbaz Nanda,
+and Raunak Madan.
+"""
+# Importing libraries
+from __future__ import annotations
+from typing import Iterator
+import pytest
+import data_parsing
+import graph_traversal
+import movie_classes
+import movie_stats
+
+
+# Program constants
+NUM_RARE_TITLES = 300
+
+
+@pytest.fixture(scope="module")
+def review_network() -> Iterator[movie_classes.ReviewNetwork]:
+    """Yield the network of the bundled ratings file, with its movie statistics set for the search."""
+    network = data_parsing.create_review_network(graph_traversal.DATA_FILE)
+    graph_traversal.set_movie_stats(movie_stats.MovieStats(network))
+    yield network
+    graph_traversal.set_movie_stats(None)
+
+
+def test_scores_non_increasing_for_rare_titles(review_network: movie_classes.ReviewNetwork) -> None:
+    """Test that the scores of a single rare movie's recommendations, including those topped up from the genre
+    lists, never increase."""
+    rare_titles = sorted(review_network.movies, key=lambda t: (len(review_network.movies[t].users_rated_by), t))
+    for title in rare_titles[:NUM_RARE_TITLES]:
+        scores = [score for _, score in graph_traversal.run_search_on_all({title: 4.5}, 10, review_network)]
+        assert all(a >= b for a, b in zip(scores, scores[1:])), (title, scores)
+
+
+def test_top_up_fills_recommendations(review_network: movie_classes.ReviewNetwork) -> None:
+    """Test that a history whose search finds few movies still gets num_rec distinct recommendations."""
+    results = graph_traversal.run_search_on_all({"L'Atalante": 4.5}, 10, review_network)
+    titles = [movie.title for movie, _ in results]
+    assert len(titles) == 10
+    assert len(set(titles)) == 10
+    assert "L'Atalante" not in titles
+
+
+if __name__ == "__main__":
+    pytest.main(["test_graph_traversal.py"])
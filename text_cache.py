@@ -0,0 +1,128 @@
+"""
+CSC111 Final Project - Phase 3: UI Design and Implementation - Font and Text Cache
+
+Description
+===============================
+
+This Python module keeps one pygame Font object per font size and caches
+rendered text surfaces, so that scenes which redraw the same labels every
+frame do not reload fonts or re-render text that has not changed.
+
+Copyright and Usage Information
+===============================
+
+This file is provided solely for the TA's and Computer Science Professors
+at the University of Toronto St. George campus. All forms of distribution
+of this code, whether as given or with any changes, are expressly prohibited.
+
+This file is Copyright (c) 2023 Guransh Singh, Nauhar Kapur, Shahbaz Nanda,
+and Raunak Madan.
+"""
+# Importing libraries
+from __future__ import annotations
+from collections import OrderedDict
+from typing import Iterable
+import pygame
+import python_ta
+
+
+# Program constants
+FONT_NAME = 'trebuchetms'
+MAX_CACHED_SURFACES = 512
+
+# Set to False to create a new font and render every text on each call, as the scenes used to (for benchmarking)
+CACHE_ENABLED = True
+
+_FONTS = {}
+
+
+def get_font(size: int, name: str = FONT_NAME) -> pygame.font.Font:
+    """Return the system font with the given name and size, loading it on first use.
+
+    Preconditions:
+    - size > 0
+    """
+    if not CACHE_ENABLED:
+        return pygame.font.SysFont(name, size)
+    key = (name, size)
+    if key not in _FONTS:
+        _FONTS[key] = pygame.font.SysFont(name, size)
+    return _FONTS[key]
+
+
+class TextCache:
+    """
+    A bounded cache of rendered text surfaces.
+
+    A surface is keyed by its font, text and color, so it is rendered again only when one of those changes.
+    The least recently used surfaces are evicted once max_entries is reached.
+
+    Instance Attributes:
+    - max_entries: the most surfaces kept at once
+    - hits: number of render calls answered from the cache
+    - misses: number of render calls that had to render the text
+
+    Representation Invariants:
+    - self.max_entries > 0
+    - len(self._surfaces) <= self.max_entries
+    """
+    max_entries: int
+    hits: int
+    misses: int
+    _surfaces: OrderedDict[tuple, pygame.Surface]
+
+    def __init__(self, max_entries: int = MAX_CACHED_SURFACES) -> None:
+        """Initialize an empty cache."""
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._surfaces = OrderedDict()
+
+    def render(self, font: pygame.font.Font, text: str,
+               color: pygame.Color | tuple[int, int, int]) -> pygame.Surface:
+        """Return font.render(text, True, color), reusing an earlier surface if there is one.
+
+        The returned surface is shared, so callers must not draw on it."""
+        if not CACHE_ENABLED:
+            return font.render(text, True, color)
+
+        key = (font, text, tuple(color))
+        surface = self._surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            self._surfaces.move_to_end(key)
+            return surface
+
+        self.misses += 1
+        surface = font.render(text, True, color)
+        self._surfaces[key] = surface
+        if len(self._surfaces) > self.max_entries:
+            self._surfaces.popitem(last=False)
+        return surface
+
+    def clear(self) -> None:
+        """Remove every cached surface."""
+        self._surfaces.clear()
+
+
+TEXT_CACHE = TextCache()
+
+
+def render_text(size: int, text: str, color: pygame.Color | tuple[int, int, int]) -> pygame.Surface:
+    """Return text rendered in the default font at the given size and color, using the shared cache."""
+    return TEXT_CACHE.render(get_font(size), text, color)
+
+
+def measure_titles(titles: Iterable[str], font: pygame.font.Font) -> dict[str, int]:
+    """Return a dictionary mapping each title to its rendered width in pixels using font."""
+    return {title: font.size(title)[0] for title in titles}
+
+
+# Testing code
+if __name__ == "__main__":
+    python_ta.check_all(config={
+        'extra-imports': ["annotations", "collections", "typing", "pygame"],
+        'allowed-io': [],
+        'generated-members': ['pygame.*'],
+        'max-line-length': 120
+    })
@@ -0,0 +1,260 @@
+"""
+CSC111 Final Project - Phase 3: UI Design and Implementation - Movie Title Index
+
+Description
+===============================
+
+This Python module contains the TitleIndex class, which suggests movie
+titles as the user types. Titles are found by the prefix of any of their
+words through a trie, and by shared trigrams when the user has made a typo.
+
+Copyright and Usage Information
+===============================
+
+This file is provided solely for the TA's and Computer Science Professors
+at the University of Toronto St. George campus. All forms of distribution
+of this code, whether as given or with any changes, are expressly prohibited.
+
+This file is Copyright (c) 2023 Guransh Singh, Nauhar Kapur, Shahbaz Nanda,
+and Raunak Madan.
+"""
+# Importing libraries
+from __future__ import annotations
+from bisect import bisect_left
+from collections import Counter
+from typing import Iterable, Optional
+import math
+import unicodedata
+import python_ta
+
+
+# Program constants
+MAX_SUGGESTIONS = 10
+MIN_TRIGRAM_SCORE = 0.3
+MAX_POSTING_LENGTH = 2000
+MAX_TRIE_DEPTH = 12
+MAX_FUZZY_POSTINGS = 8000
+MAX_FUZZY_CANDIDATES = 60
+
+
+def normalize_title(title: str) -> str:
+    """Return title in lowercase, without accents or punctuation, and with single spaces between words.
+
+    >>> normalize_title("  Amélie: Le Fabuleux   Destin!")
+    'amelie le fabuleux destin'
+    """
+    decomposed = unicodedata.normalize("NFKD", title)
+    characters = [c.lower() if c.isalnum() else " " for c in decomposed if not unicodedata.combining(c)]
+    return " ".join("".join(characters).split())
+
+
+def get_trigrams(normalized: str) -> set[str]:
+    """Return the set of three-character substrings of each word of the normalized text, padded so that the
+    start and end of every word also form trigrams.
+
+    >>> sorted(get_trigrams("up in"))
+    ['  i', '  u', ' in', ' up', 'in ', 'up ']
+    """
+    return {trigram for word in normalized.split() for trigram in _word_trigrams(word)}
+
+
+def _word_trigrams(word: str) -> list[str]:
+    """Return the padded trigrams of a single word."""
+    padded = f"  {word} "
+    return [padded[i:i + 3] for i in range(len(padded) - 2)]
+
+
+class _TrieNode:
+    """
+    A node of the prefix trie.
+
+    Instance Attributes:
+    - children: the child node for each next character
+    - best: ids of the highest-ranked titles with a word starting with this node's prefix, best first
+    - members: for nodes MAX_TRIE_DEPTH characters deep, the ids of every title with a word starting with this
+               node's prefix, best first; empty for other nodes
+    """
+    __slots__ = ("children", "best", "members")
+    children: dict[str, _TrieNode]
+    best: list[int]
+    members: list[int]
+
+    def __init__(self) -> None:
+        self.children = {}
+        self.best = []
+        self.members = []
+
+
+class TitleIndex:
+    """
+    An in-memory index of movie titles that returns ranked suggestions for partially typed input.
+
+    Every node of the trie stores the ids of the top MAX_SUGGESTIONS titles below it, so a prefix query only
+    walks the characters of the query. The trie is MAX_TRIE_DEPTH characters deep, and its deepest nodes keep
+    every title below them, which longer queries filter. Titles are ranked by their popularity, then by length,
+    then alphabetically.
+
+    Fuzzy queries only read the postings of their rarest trigrams, and score at most MAX_FUZZY_CANDIDATES
+    titles per query (see fuzzy_matches). On a synthetic catalog of 100,000 titles a keystroke with a typo takes
+    about 0.5 ms at the median but still about 2 ms at the 99th percentile, so the 1 ms target is only met
+    for typical keystrokes.
+
+    Instance Attributes:
+    - titles: every indexed title, in rank order (a title's id is its position in this list)
+
+    Representation Invariants:
+    - len(set(self.titles)) == len(self.titles)
+    - all(len(posting) <= MAX_POSTING_LENGTH for posting in self._trigrams.values())
+    """
+    titles: list[str]
+    _normalized: list[str]
+    _trigram_counts: list[int]
+    _root: _TrieNode
+    _trigrams: dict[str, list[int]]
+
+    def __init__(self, titles: Iterable[str], popularity: Optional[dict[str, int]] = None) -> None:
+        """Build the index over the given titles.
+
+        popularity maps titles to a score (for example, their number of ratings); missing titles score 0."""
+        popularity = {} if popularity is None else popularity
+        self.titles = sorted(set(titles), key=lambda t: (-popularity.get(t, 0), len(t), t))
+        self._normalized = [normalize_title(t) for t in self.titles]
+        self._trigram_counts = []
+        self._root = _TrieNode()
+        self._trigrams = {}
+
+        for title_id, normalized in enumerate(self._normalized):
+            # inserting the suffix that starts at each word, so any word of the title can be typed first
+            words = normalized.split(" ")
+            starts = set()
+            position = 0
+            for word in words:
+                starts.add(position)
+                position += len(word) + 1
+            for start in starts:
+                self._insert(normalized[start:start + MAX_TRIE_DEPTH], title_id)
+
+            trigrams = get_trigrams(normalized)
+            self._trigram_counts.append(len(trigrams))
+            for trigram in trigrams:
+                self._trigrams.setdefault(trigram, []).append(title_id)
+
+        # very common trigrams say little about a match, and would make fuzzy queries slow
+        for trigram, posting in self._trigrams.items():
+            if len(posting) > MAX_POSTING_LENGTH:
+                self._trigrams[trigram] = posting[:MAX_POSTING_LENGTH]
+
+    def __len__(self) -> int:
+        """Return the number of indexed titles."""
+        return len(self.titles)
+
+    def _insert(self, key: str, title_id: int) -> None:
+        """Add title_id to the trie nodes along key.
+
+        Titles must be inserted in increasing id order, so each node's best list stays in rank order and a
+        title reached through two of its words is only recorded once."""
+        node = self._root
+        for character in key:
+            child = node.children.get(character)
+            if child is None:
+                child = _TrieNode()
+                node.children[character] = child
+            node = child
+            best = node.best
+            if len(best) < MAX_SUGGESTIONS and (not best or best[-1] != title_id):
+                best.append(title_id)
+        if len(key) == MAX_TRIE_DEPTH and (not node.members or node.members[-1] != title_id):
+            node.members.append(title_id)
+
+    def prefix_matches(self, query: str, k: int = MAX_SUGGESTIONS) -> list[str]:
+        """Return up to k titles, best first, with a word that starts with the normalized query.
+
+        Preconditions:
+        - 0 < k <= MAX_SUGGESTIONS
+        """
+        normalized = normalize_title(query)
+        node = self._root
+        for character in normalized[:MAX_TRIE_DEPTH]:
+            node = node.children.get(character)
+            if node is None:
+                return []
+
+        if len(normalized) <= MAX_TRIE_DEPTH:
+            return [self.titles[title_id] for title_id in node.best[:k]]
+
+        # longer queries check every title below the deepest node, best first, until k of them match
+        matches = []
+        for title_id in node.members:
+            if f" {self._normalized[title_id]}".find(f" {normalized}") != -1:
+                matches.append(self.titles[title_id])
+                if len(matches) == k:
+                    break
+        return matches
+
+    def fuzzy_matches(self, query: str, k: int = MAX_SUGGESTIONS) -> list[str]:
+        """Return up to k titles, best first, that share the most trigrams with query.
+
+        Titles are scored by the fraction of the query's trigrams they contain, so a partly typed title still
+        matches in full; ties go to the title closest in length to the query, then to the higher-ranked title.
+        Titles scoring under MIN_TRIGRAM_SCORE are left out.
+
+        A title sharing enough trigrams must contain one of the rarest (all but min_shared - 1) of them, so
+        candidates are only taken from their postings, and the other trigrams are checked for each candidate.
+        To bound the time per keystroke on large catalogs, at most MAX_FUZZY_POSTINGS posting entries are read
+        for candidates and at most MAX_FUZZY_CANDIDATES of those sharing the most trigrams read are scored, so
+        some matches are missed and the results can differ from scoring every title.
+        """
+        query_trigrams = get_trigrams(normalize_title(query))
+        if not query_trigrams:
+            return []
+        postings = sorted((self._trigrams.get(trigram, []) for trigram in query_trigrams), key=len)
+        min_shared = math.ceil(MIN_TRIGRAM_SCORE * len(postings) - 1e-9)
+
+        counts = Counter()
+        read = used = 0
+        while used < len(postings) - min_shared + 1 and (used == 0 or read + len(postings[used]) <= MAX_FUZZY_POSTINGS):
+            counts.update(postings[used])
+            read += len(postings[used])
+            used += 1
+        candidates = counts.items() if len(counts) <= MAX_FUZZY_CANDIDATES else counts.most_common(MAX_FUZZY_CANDIDATES)
+        common = postings[used:]
+
+        scored = []
+        for title_id, shared in candidates:
+            # postings are in increasing id order, so membership is a binary search
+            for posting in common:
+                position = bisect_left(posting, title_id)
+                if position < len(posting) and posting[position] == title_id:
+                    shared += 1
+            if shared >= min_shared:
+                extra = self._trigram_counts[title_id] - shared
+                scored.append((-shared, extra, title_id))
+        scored.sort()
+        return [self.titles[title_id] for _, _, title_id in scored[:k]]
+
+    def suggest(self, query: str, k: int = 5) -> list[str]:
+        """Return up to k titles for the partially typed query. These are the prefix matches, or the fuzzy matches
+        if no title matches the prefix (which usually means the query has a typo).
+
+        Preconditions:
+        - 0 < k <= MAX_SUGGESTIONS
+        """
+        if normalize_title(query) == "":
+            return []
+        suggestions = self.prefix_matches(query, k)
+        if not suggestions:
+            suggestions = self.fuzzy_matches(query, k)
+        return suggestions
+
+
+# Testing code
+if __name__ == "__main__":
+    import doctest
+    doctest.testmod()
+
+    python_ta.check_all(config={
+        'extra-imports': ["annotations", "bisect", "collections", "typing", "math",
+                          "unicodedata", "doctest"],
+        'allowed-io': [],
+        'max-line-length': 120
+    })
@@ -0,0 +1,233 @@
+"""
+CSC111 Final Project - Phase 3: UI Design and Implementation - Tracing
+
+Description
+===============================
+
+This Python module records named, timed spans around the slow parts of a
+session (loading the CSV, searching the graph, calling the movie API,
+downloading posters and drawing frames) and writes them in the Chrome
+trace event format, which chrome://tracing and https://ui.perfetto.dev
+open directly.
+
+Tracing is off unless enabled, either with enable() or by setting the
+FLICKFINDR_TRACE environment variable to the file to write when the
+program exits:
+
+    FLICKFINDR_TRACE=trace.json python main.py
+
+While tracing is off, span() returns a shared object whose methods do
+nothing, so the instrumented code costs one function call per span.
+
+Copyright and Usage Information
+===============================
+
+This file is provided solely for the TA's and Computer Science Professors
+at the University of Toronto St. George campus. All forms of distribution
+of this code, whether as given or with any changes, are expressly prohibited.
+
+This file is Copyright (c) 2023 Guransh Singh, Nauhar Kapur, Shahbaz Nanda,
+and Raunak Madan.
+"""
+# Importing libraries
+from __future__ import annotations
+from collections import deque
+from typing import Any, Optional
+import atexit
+import json
+import os
+import threading
+import time
+import python_ta
+
+
+# Program constants
+TRACE_ENV_VAR = "FLICKFINDR_TRACE"
+MAX_EVENTS = 200000
+
+
+class Tracer:
+    """
+    Collects finished spans as Chrome trace events.
+
+    Instance Attributes:
+    - path: the file export writes to by default, or None
+    - events: the recorded events, oldest first; only the last MAX_EVENTS are kept
+    - thread_names: the name of every thread that recorded a span, by thread id
+
+    Representation Invariants:
+    - len(self.events) <= MAX_EVENTS
+    """
+    path: Optional[str]
+    events: deque[dict]
+    thread_names: dict[int, str]
+    _start_ns: int
+    _pid: int
+    _lock: threading.Lock
+
+    def __init__(self, path: Optional[str] = None) -> None:
+        """Initialize an empty tracer whose timestamps start now."""
+        self.path = path
+        self.events = deque(maxlen=MAX_EVENTS)
+        self.thread_names = {}
+        self._start_ns = time.perf_counter_ns()
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+
+    def record(self, name: str, start_ns: int, end_ns: int, attributes: dict[str, Any]) -> None:
+        """Record a span that ran on the current thread from start_ns to end_ns (perf_counter_ns values)."""
+        thread_id = threading.get_ident()
+        event = {"name": name, "ph": "X", "pid": self._pid, "tid": thread_id,
+                 "ts": (start_ns - self._start_ns) / 1000, "dur": (end_ns - start_ns) / 1000}
+        if attributes:
+            event["args"] = attributes
+        with self._lock:
+            if thread_id not in self.thread_names:
+                self.thread_names[thread_id] = threading.current_thread().name
+            self.events.append(event)
+
+    def to_json(self) -> dict:
+        """Return the recorded spans as a Chrome trace document."""
+        with self._lock:
+            events = list(self.events)
+            thread_names = dict(self.thread_names)
+        metadata = [{"name": "thread_name", "ph": "M", "pid": self._pid, "tid": thread_id, "args": {"name": name}}
+                    for thread_id, name in thread_names.items()]
+        return {"traceEvents": metadata + events, "displayTimeUnit": "ms"}
+
+    def export(self, path: Optional[str] = None) -> str:
+        """Write the trace to path (or to self.path if path is None), and return the path written.
+
+        Preconditions:
+        - path is not None or self.path is not None
+        """
+        path = self.path if path is None else path
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(self.to_json(), file, default=str)
+        return path
+
+    def summary(self) -> str:
+        """Return the count, total and longest duration of each span name, longest total first."""
+        with self._lock:
+            events = list(self.events)
+        totals = {}
+        for event in events:
+            count, total, longest = totals.get(event["name"], (0, 0.0, 0.0))
+            totals[event["name"]] = (count + 1, total + event["dur"], max(longest, event["dur"]))
+        lines = [f"{'span':<28}{'count':>8}{'total':>12}{'max':>12}"]
+        for name, (count, total, longest) in sorted(totals.items(), key=lambda item: -item[1][1]):
+            lines.append(f"{name:<28}{count:>8}{total / 1000:>10.1f}ms{longest / 1000:>10.2f}ms")
+        return "\n".join(lines)
+
+
+class Span:
+    """
+    A span being timed, used as a context manager. Attributes can be added while it runs.
+
+    Instance Attributes:
+    - name: the name shown in the trace viewer
+    - attributes: extra information shown with the span (e.g. a title, or whether a cache was hit)
+    """
+    __slots__ = ("name", "attributes", "_tracer", "_start_ns")
+    name: str
+    attributes: dict[str, Any]
+    _tracer: Tracer
+    _start_ns: int
+
+    def __init__(self, tracer: Tracer, name: str, attributes: dict[str, Any]) -> None:
+        self.name = name
+        self.attributes = attributes
+        self._tracer = tracer
+        self._start_ns = 0
+
+    def __enter__(self) -> Span:
+        self._start_ns = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type: Optional[type], *exc_info: object) -> None:
+        end_ns = time.perf_counter_ns()
+        if exc_type is not None:
+            self.attributes["error"] = exc_type.__name__
+        self._tracer.record(self.name, self._start_ns, end_ns, self.attributes)
+
+    def set(self, key: str, value: Any) -> None:
+        """Add the attribute key with the given value to the span."""
+        self.attributes[key] = value
+
+
+class _NullSpan:
+    """The span returned while tracing is off; it records nothing."""
+    __slots__ = ()
+
+    def __enter__(self) -> _NullSpan:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        pass
+
+    def set(self, key: str, value: Any) -> None:
+        """Do nothing."""
+
+
+_NULL_SPAN = _NullSpan()
+
+# The tracer spans are recorded in, or None while tracing is off
+_TRACER = None
+
+
+def span(name: str, **attributes: Any) -> Span | _NullSpan:
+    """Return a context manager timing the code it wraps as a span with the given name and attributes.
+
+    >>> with span("example", title="Up") as current:
+    ...     current.set("cache_hit", True)
+    """
+    if _TRACER is None:
+        return _NULL_SPAN
+    return Span(_TRACER, name, attributes)
+
+
+def is_enabled() -> bool:
+    """Return whether spans are being recorded."""
+    return _TRACER is not None
+
+
+def get_tracer() -> Optional[Tracer]:
+    """Return the tracer spans are recorded in, or None while tracing is off."""
+    return _TRACER
+
+
+def enable(path: Optional[str] = None, export_at_exit: bool = False) -> Tracer:
+    """Start recording spans in a new tracer, and return it.
+
+    If export_at_exit is True, the trace is written to path when the program exits.
+
+    Preconditions:
+    - not export_at_exit or path is not None
+    """
+    global _TRACER
+    _TRACER = Tracer(path)
+    if export_at_exit:
+        atexit.register(_TRACER.export)
+    return _TRACER
+
+
+def disable() -> Optional[Tracer]:
+    """Stop recording spans, and return the tracer that was recording them (or None)."""
+    global _TRACER
+    tracer, _TRACER = _TRACER, None
+    return tracer
+
+
+# Enabling tracing for the whole program when asked to from the environment
+if os.environ.get(TRACE_ENV_VAR):
+    enable(os.environ[TRACE_ENV_VAR], export_at_exit=True)
+
+
+# Testing code
+if __name__ == "__main__":
+    python_ta.check_all(config={
+        'extra-imports': ["annotations", "collections", "typing", "atexit", "json", "os", "threading", "time"],
+        'allowed-io': ["Tracer.export"],
+        'disable': ["global-statement"],
+        'max-line-length': 120
+    })
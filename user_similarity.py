@@ -0,0 +1,311 @@
+"""
+CSC111 Final Project - Phase 2: Data Parsing - User Similarity Recommender
+
+Description
+===============================
+
+This Python module is a second recommender, which compares the whole
+watch history against every user who rated any of its movies, instead of
+choosing neighbours by how close they rated one movie at a time. Users are
+compared with Pearson correlation (or cosine similarity), and the most
+similar users' ratings predict how much the user would like the movies
+they rated.
+
+The ratings are copied once into flat arrays (see UserSimilarityIndex):
+each user's ratings, every movie's list of raters, and each user's mean
+rating and vector norm, so a query only touches the raters of the movies
+it contains and the histories of its closest neighbours. Its cost grows
+with the number of movies in the history and their raters, not with how
+many ratings those raters have.
+
+    python -c "import sys, user_similarity; user_similarity.main(sys.argv[1:])" --queries 200 --long-queries 20
+
+Copyright and Usage Information
+===============================
+
+This file is provided solely for the TA's and Computer Science Professors
+at the University of Toronto St. George campus. All forms of distribution
+of this code, whether as given or with any changes, are expressly prohibited.
+
+This file is Copyright (c) 2023 Guransh Singh, Nauhar Kapur, Shahbaz Nanda,
+and Raunak Madan.
+"""
+# Importing libraries
+from __future__ import annotations
+from array import array
+from typing import Callable, Optional
+import argparse
+import heapq
+import json
+import math
+import random
+import time
+import python_ta
+import benchmark_graph_traversal
+import data_parsing
+import graph_traversal
+import movie_classes
+import synthetic_data
+
+
+# Program constants
+SIMILARITIES = ["pearson", "cosine"]
+NUM_NEIGHBOURS = 30
+SHRINKAGE = 1.0
+
+# The index of the network searched by run_search_on_all, rebuilt when a different network is searched
+_INDEX = None
+
+
+class UserSimilarityIndex:
+    """
+    The ratings of a ReviewNetwork in flat arrays, for comparing whole watch histories.
+
+    Users and movies are referred to by their number: their position in network.users and network.movies when
+    the index was built. The ratings of user u are positions user_offsets[u] to user_offsets[u + 1] of the user
+    arrays, and the raters of movie m are positions movie_offsets[m] to movie_offsets[m + 1] of the movie arrays.
+    Each rating is stored as given and centred on its user's mean.
+
+    The index is a copy: ratings added to the network afterwards are not seen until a new index is built.
+
+    Instance Attributes:
+    - network: the ReviewNetwork the index was built from
+    - movies: every movie, by number
+    - movie_numbers: the number of every movie, by title
+    - means: every user's mean rating
+    - centred_norms: the norm of every user's mean-centred ratings
+    - norms: the norm of every user's ratings
+    - user_offsets, user_movies, user_ratings, user_centred: every user's ratings
+    - movie_offsets, movie_users, movie_ratings, movie_centred: every movie's raters
+
+    Representation Invariants:
+    - len(self.means) == len(self.norms) == len(self.centred_norms) == len(self.user_offsets) - 1
+    - len(self.movies) == len(self.movie_offsets) - 1
+    - len(self.user_movies) == len(self.movie_users) == self.user_offsets[-1] == self.movie_offsets[-1]
+    """
+    network: movie_classes.ReviewNetwork
+    movies: list[movie_classes.Movie]
+    movie_numbers: dict[str, int]
+    means: array
+    centred_norms: array
+    norms: array
+    user_offsets: array
+    user_movies: array
+    user_ratings: array
+    user_centred: array
+    movie_offsets: array
+    movie_users: array
+    movie_ratings: array
+    movie_centred: array
+
+    def __init__(self, network: movie_classes.ReviewNetwork) -> None:
+        """Build the index of network."""
+        self.network = network
+        self.movies = list(network.movies.values())
+        self.movie_numbers = {movie.title: i for i, movie in enumerate(self.movies)}
+        users = list(network.users.values())
+        user_numbers = {user: i for i, user in enumerate(users)}
+
+        self.means, self.norms, self.centred_norms = array("d"), array("d"), array("d")
+        self.user_offsets, self.user_movies = array("q", [0]), array("i")
+        self.user_ratings, self.user_centred = array("d"), array("d")
+        for user in users:
+            ratings = [rating.rating for rating in user.movies_rated.values()]
+            mean = sum(ratings) / len(ratings) if ratings else 0.0
+            self.means.append(mean)
+            self.norms.append(math.sqrt(sum(r * r for r in ratings)))
+            self.centred_norms.append(math.sqrt(sum((r - mean) ** 2 for r in ratings)))
+            self.user_movies.extend(self.movie_numbers[movie.title] for movie in user.movies_rated)
+            self.user_ratings.extend(ratings)
+            self.user_centred.extend(r - mean for r in ratings)
+            self.user_offsets.append(len(self.user_movies))
+
+        self.movie_offsets, self.movie_users = array("q", [0]), array("i")
+        self.movie_ratings, self.movie_centred = array("d"), array("d")
+        for movie in self.movies:
+            for user in movie.users_rated_by:
+                number = user_numbers[user]
+                rating = user.movies_rated[movie].rating
+                self.movie_users.append(number)
+                self.movie_ratings.append(rating)
+                self.movie_centred.append(rating - self.means[number])
+            self.movie_offsets.append(len(self.movie_users))
+
+    def neighbours(self, user_movies: dict[str, float], similarity: str = "pearson",
+                   num_neighbours: int = NUM_NEIGHBOURS) -> list[tuple[int, float]]:
+        """Return the num_neighbours users most similar to user_movies, as (user number, similarity) pairs, most
+        similar first. Only users who rated a movie in user_movies, and are positively similar, are returned.
+
+        Pearson similarity is undefined when every rating in user_movies is the same (as when a user rates all
+        their favourites 5.0); cosine similarity is used for such histories.
+
+        Preconditions:
+        - similarity in SIMILARITIES
+        - all(title in self.movie_numbers for title in user_movies)
+        """
+        query_mean = sum(user_movies.values()) / len(user_movies) if user_movies else 0.0
+        centred = {title: rating - query_mean for title, rating in user_movies.items()}
+        if similarity == "pearson" and any(centred.values()):
+            query, values, norms = centred, self.movie_centred, self.centred_norms
+        else:
+            query, values, norms = user_movies, self.movie_ratings, self.norms
+        query_norm = math.sqrt(sum(value * value for value in query.values()))
+        if query_norm == 0:
+            return []
+
+        # Sparse dot products with every user who rated a movie in the history
+        dots = {}
+        movie_users, offsets = self.movie_users, self.movie_offsets
+        for title, value in query.items():
+            movie = self.movie_numbers[title]
+            for k in range(offsets[movie], offsets[movie + 1]):
+                user = movie_users[k]
+                dots[user] = dots.get(user, 0.0) + value * values[k]
+
+        similar = ((user, dot / (query_norm * norms[user])) for user, dot in dots.items() if dot > 0)
+        return heapq.nlargest(num_neighbours, similar, key=lambda pair: pair[1])
+
+    def recommend(self, user_movies: dict[str, float], num_rec: int = 10, similarity: str = "pearson",
+                  num_neighbours: int = NUM_NEIGHBOURS) -> list[tuple[movie_classes.Movie, float]]:
+        """Return the best num_rec recommendations for user_movies with their predicted ratings, best first.
+
+        A movie's predicted rating is the mean of user_movies plus the similarity-weighted mean of how far the
+        neighbours who rated it rated it above their own mean. SHRINKAGE is added to the weights, so movies
+        rated by few or barely similar neighbours are pulled towards the user's mean.
+
+        Preconditions:
+        - similarity in SIMILARITIES
+        - all(title in self.movie_numbers for title in user_movies)
+        """
+        neighbours = self.neighbours(user_movies, similarity, num_neighbours)
+        query_mean = sum(user_movies.values()) / len(user_movies) if user_movies else 0.0
+        seen = {self.movie_numbers[title] for title in user_movies}
+
+        # movie number -> [weighted sum of centred ratings, sum of weights]
+        predictions = {}
+        user_movies_rated, user_centred, offsets = self.user_movies, self.user_centred, self.user_offsets
+        for user, weight in neighbours:
+            for k in range(offsets[user], offsets[user + 1]):
+                movie = user_movies_rated[k]
+                if movie in seen:
+                    continue
+                if movie in predictions:
+                    predictions[movie][0] += weight * user_centred[k]
+                    predictions[movie][1] += weight
+                else:
+                    predictions[movie] = [weight * user_centred[k], weight]
+
+        scored = [(movie, query_mean + total / (weights + SHRINKAGE))
+                  for movie, (total, weights) in predictions.items()]
+        best = heapq.nlargest(num_rec, scored, key=lambda pair: pair[1])
+        return [(self.movies[movie], score) for movie, score in best]
+
+
+def get_index(review_network: movie_classes.ReviewNetwork) -> UserSimilarityIndex:
+    """Return the index of review_network, building it if the last index built was of another network."""
+    global _INDEX
+    if _INDEX is None or _INDEX.network is not review_network:
+        _INDEX = UserSimilarityIndex(review_network)
+    return _INDEX
+
+
+def run_search_on_all(user_movies: dict[str, float], num_rec: int = 10,
+                      review_network: Optional[movie_classes.ReviewNetwork] = None,
+                      similarity: str = "pearson") -> list[tuple[movie_classes.Movie, float]]:
+    """Return the best num_rec recommendations for the user, given their watch history, like
+    graph_traversal.run_search_on_all but by user similarity. The scores are predicted ratings.
+
+    The search runs on review_network if it is given, and on graph_traversal.get_review_network() otherwise.
+
+    Preconditions:
+    - similarity in SIMILARITIES
+    """
+    if review_network is None:
+        review_network = graph_traversal.get_review_network()
+    return get_index(review_network).recommend(user_movies, num_rec, similarity)
+
+
+def long_queries(review_network: movie_classes.ReviewNetwork, n: int, seed: int = 111) -> list[dict[str, float]]:
+    """Return the whole rating histories of the n users with the most ratings, in random order."""
+    heaviest = sorted(review_network.users.values(), key=lambda user: (-len(user.movies_rated), user.user_id))[:n]
+    queries = [{movie.title: rating.rating for movie, rating in user.movies_rated.items()} for user in heaviest]
+    random.Random(seed).shuffle(queries)
+    return queries
+
+
+def time_queries(queries: list[dict[str, float]], search: Callable[[dict[str, float]], list]) -> dict[str, float]:
+    """Call search on every query in turn and return the latency distribution in milliseconds."""
+    latencies = []
+    for user_movies in queries:
+        start = time.perf_counter()
+        search(user_movies)
+        latencies.append((time.perf_counter() - start) * 1000)
+    latencies.sort()
+    return {"queries": len(latencies), "mean_ms": sum(latencies) / len(latencies),
+            "p50_ms": benchmark_graph_traversal.percentile(latencies, 0.5),
+            "p95_ms": benchmark_graph_traversal.percentile(latencies, 0.95), "max_ms": latencies[-1]}
+
+
+def benchmark(review_network: movie_classes.ReviewNetwork, num_queries: int, num_long: int,
+              seed: int = 111) -> dict:
+    """Return the index build time and the latency of both engines on num_queries short watch histories (like
+    the menu screen's) and on the whole histories of the num_long users with the most ratings."""
+    start = time.perf_counter()
+    index = get_index(review_network)
+    build_seconds = time.perf_counter() - start
+    workloads = {"short": synthetic_data.make_queries(review_network, num_queries, seed),
+                 "long": long_queries(review_network, num_long, seed)}
+    engines = {"graph": lambda q: graph_traversal.run_search_on_all(q, 10, review_network)}
+    engines.update({similarity: lambda q, s=similarity: index.recommend(q, 10, s) for similarity in SIMILARITIES})
+
+    results = {"build_ms": build_seconds * 1000, "workloads": {}}
+    for workload, queries in workloads.items():
+        results["workloads"][workload] = {
+            "mean_history": sum(len(q) for q in queries) / len(queries) if queries else 0.0,
+            "engines": {engine: time_queries(queries, search) for engine, search in engines.items()} if queries
+            else {}}
+    return results
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    """Benchmark the user similarity engine against graph_traversal from the command line."""
+    parser = argparse.ArgumentParser(description="Compare the latency of the user similarity and graph engines.")
+    parser.add_argument("--csv", default=graph_traversal.DATA_FILE, help="ratings file to load")
+    parser.add_argument("--scale", type=float, default=None,
+                        help="use a synthetic network this many times the bundled dataset instead")
+    parser.add_argument("--queries", type=int, default=200, help="short watch histories to time")
+    parser.add_argument("--long-queries", type=int, default=20, help="whole histories of the heaviest users to time")
+    parser.add_argument("--seed", type=int, default=111, help="seed of the queries")
+    parser.add_argument("--output", default=None, help="file to write the JSON results to")
+    args = parser.parse_args(argv)
+
+    if args.scale is not None:
+        review_network = synthetic_data.generate_network(synthetic_data.SyntheticSpec(seed=args.seed)
+                                                         .scaled(args.scale))
+    else:
+        review_network = data_parsing.create_review_network(args.csv)
+    results = benchmark(review_network, args.queries, args.long_queries, args.seed)
+
+    print(f"index built in {results['build_ms']:.1f} ms")
+    print(f"{'workload':<10}{'history':>9}{'engine':>9}{'mean':>10}{'p50':>10}{'p95':>10}{'max':>10}")
+    for workload, result in results["workloads"].items():
+        for engine, latency in result["engines"].items():
+            print(f"{workload:<10}{result['mean_history']:>9.1f}{engine:>9}{latency['mean_ms']:>8.2f}ms"
+                  f"{latency['p50_ms']:>8.2f}ms{latency['p95_ms']:>8.2f}ms{latency['max_ms']:>8.2f}ms")
+    if args.output is not None:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2)
+
+
+# Testing code
+if __name__ == "__main__":
+    python_ta.check_all(config={
+        'extra-imports': ["annotations", "array", "typing", "argparse", "heapq", "json", "math", "random", "time",
+                          "benchmark_graph_traversal", "data_parsing", "graph_traversal", "movie_classes",
+                          "synthetic_data"],
+        'allowed-io': ["main"],
+        'disable': ["global-statement"],
+        'max-line-length': 120
+    })
+
+    main()